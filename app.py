@@ -1,10 +1,21 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory, session
+from flask import Flask, Response, stream_with_context, stream_template, render_template, request, jsonify, redirect, url_for, send_from_directory, session, g
 import os
 import datetime
-import shutil
+import hmac
+import time
+import threading
+import uuid
 from werkzeug.utils import secure_filename
 from config import Config
 from processor import StockProcessor
+from history_store import HistoryStore, file_hash
+from backup_store import BackupStore
+from ingest import UploadIngestor
+from payload_cache import PayloadCache
+from profiler import RequestProfiler
+from thumbnails import ThumbnailPipeline, SIZES as THUMBNAIL_SIZES
+from product_store import LIST_FIELDS, column, numbers, records, row, select_fields
+import metrics
 from functools import wraps
 from dotenv import load_dotenv
 
@@ -19,7 +30,123 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['IMAGES_FOLDER'], exist_ok=True)
 
 # Instância do processador
-processor = StockProcessor(app.config['DATA_FILE'], app.config['IMAGES_FOLDER'])
+processor = StockProcessor(app.config['DATA_FILE'], app.config['IMAGES_FOLDER'],
+                           row_memo_size=app.config['ROW_MEMO_SIZE'],
+                           description_memo_size=app.config['DESCRIPTION_MEMO_SIZE'],
+                           parallel=app.config['PARALLEL_ENRICHMENT'],
+                           workers=app.config['PARALLEL_WORKERS'],
+                           chunk_size=app.config['PARALLEL_CHUNK_SIZE'],
+                           min_parallel_rows=app.config['PARALLEL_MIN_ROWS'],
+                           snapshot_folder=app.config['SNAPSHOT_FOLDER'],
+                           low_stock_threshold=app.config['LOW_STOCK_THRESHOLD'])
+
+# Histórico de preço/estoque/custo por SKU, alimentado a cada upload
+history = HistoryStore(app.config['HISTORY_DB'])
+
+# Backups dos CSVs enviados (comprimidos, deduplicados, com deltas por linha)
+backups = BackupStore(app.config['BACKUP_FOLDER'], keyframe_interval=app.config['BACKUP_KEYFRAME_INTERVAL'],
+                      keep_last=app.config['BACKUP_KEEP_LAST'], keep_days=app.config['BACKUP_KEEP_DAYS'])
+
+# Uploads de estoque processados em segundo plano (o catálogo anterior segue no ar)
+def backup_current_file():
+    if os.path.exists(app.config['DATA_FILE']):
+        snapshot = backups.snapshot(app.config['DATA_FILE'])
+        backups.prune()
+        print(f"Backup criado: {snapshot['id']}")
+
+# O estado dos jobs fica em arquivos ao lado do estoque: qualquer worker responde o status
+ingestor = UploadIngestor(processor, before_swap=backup_current_file, after_swap=lambda: record_history_snapshot(),
+                          status_folder=os.path.join(os.path.dirname(app.config['DATA_FILE']), '.ingest'))
+
+# Miniaturas/WebP das imagens, geradas em segundo plano (requer Pillow)
+thumbnails = ThumbnailPipeline(app.config['IMAGES_FOLDER'], workers=app.config['THUMBNAIL_WORKERS'],
+                               max_pending=app.config['THUMBNAIL_QUEUE_SIZE'])
+
+# Respostas JSON do catálogo já serializadas/comprimidas, por versão dos dados
+payload_cache = PayloadCache(app.json.dumps, maxsize=app.config['PAYLOAD_CACHE_SIZE'])
+
+# Métricas por rota (o padrão da rota, não a URL, para não explodir as séries)
+REQUEST_SECONDS = metrics.histogram('estoque_http_request_seconds', 'Tempo de resposta por rota',
+                                    ('route', 'method'))
+RESPONSES = metrics.counter('estoque_http_responses_total', 'Respostas por rota e status',
+                            ('route', 'method', 'status'))
+RESPONSE_BYTES = metrics.histogram('estoque_http_response_bytes', 'Tamanho das respostas por rota',
+                                   ('route',), buckets=metrics.SIZE_BUCKETS)
+
+def collect_caches():
+    stats = processor.cache_stats()
+    samples = {}
+    for name, cache in (('row_memo', stats['row_memo']), ('descriptions', stats['descriptions']),
+                        ('payloads', payload_cache.stats())):
+        samples[(name, 'hit')] = cache['hits']
+        samples[(name, 'miss')] = cache['misses']
+    # Catálogo: acerto pelo mtime, reprocessamento, versão anterior servida ou espera
+    for result, key in (('hit', 'hits'), ('rebuild', 'rebuilds'), ('stale', 'served_stale'), ('wait', 'waited')):
+        samples[('catalog', result)] = stats['rebuilds'][key]
+    return samples
+
+def collect_catalog():
+    data = processor._base
+    return {('products',): len(data) if data is not None else 0,
+            ('payload_entries',): payload_cache.stats()['size'],
+            ('last_rebuild_seconds',): processor.rebuild_stats['last_seconds']}
+
+# Lidas só quando /api/metrics é consultado
+metrics.collected('estoque_cache_requests_total', 'Acertos e faltas dos caches', ('cache', 'result'),
+                  collect_caches, kind='counter')
+metrics.collected('estoque_catalog', 'Estado do catálogo em memória', ('item',), collect_catalog)
+
+# Perfis de requisições sob demanda (desligado até o admin ligar)
+profiler = RequestProfiler(keep=app.config['PROFILE_KEEP'], max_sample_rate=app.config['PROFILE_MAX_SAMPLE_RATE'])
+
+# Campos usados no relatório de reposição
+REPOSICAO_FIELDS = ('SKU', 'Name', 'Categories', 'Stock')
+
+# Parâmetros que ativam a resposta paginada de /api/produtos
+PRODUCT_QUERY_ARGS = {'page', 'page_size', 'category', 'low_stock', 'q', 'sort', 'sku'}
+
+def requested_fields():
+    """Campos pedidos em ?fields= (lista separada por vírgula; 'all' traz tudo).
+
+    Sem o parâmetro, a listagem não leva as descrições em HTML.
+    """
+    fields = request.args.get('fields', '').strip()
+    if not fields:
+        return LIST_FIELDS
+    if fields == 'all':
+        return None
+    return select_fields(name.strip() for name in fields.split(','))
+
+def cached_json(name, build):
+    """Resposta JSON servida do cache da versão atual, com ETag/304 e gzip.
+
+    build(produtos) monta o dict da resposta a partir do catálogo da versão lida
+    aqui; só roda na primeira requisição de cada versão dos dados e combinação
+    de parâmetros.
+    """
+    produtos, version = processor.current()
+    payload = payload_cache.get(version, (name, request.query_string), lambda: build(produtos))
+
+    headers = {'ETag': f'"{payload.etag}"', 'Cache-Control': 'private, no-cache', 'Vary': 'Accept-Encoding'}
+    if request.if_none_match.contains(payload.etag):
+        return Response(status=304, headers=headers)
+
+    if payload.gzipped is not None and request.accept_encodings['gzip']:
+        headers['Content-Encoding'] = 'gzip'
+        return Response(payload.gzipped, mimetype='application/json', headers=headers)
+    return Response(payload.body, mimetype='application/json', headers=headers)
+
+def record_history_snapshot():
+    """Grava o catálogo recém-enviado no histórico (usa o processamento já em cache)"""
+    produtos = processor.process()
+    if not len(produtos):
+        return None
+    return history.record_snapshot(
+        column(produtos, 'SKU'), numbers(produtos, 'Regular price'),
+        numbers(produtos, 'Stock'), numbers(produtos, 'Meta: _custo'),
+        source=os.path.basename(app.config['DATA_FILE']),
+        content_hash=file_hash(app.config['DATA_FILE'])
+    )
 
 def login_required(f):
     @wraps(f)
@@ -29,6 +156,51 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def start_request_profile():
+    if not profiler.active or request.path.startswith('/api/profiling'):
+        return
+    route = request.url_rule.rule if request.url_rule is not None else None
+    handle = profiler.start(route, request.path)
+    if handle is not None:
+        g.profile = (handle, route or request.path)
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    route = request.url_rule.rule if request.url_rule is not None else 'nao_encontrada'
+    # Em respostas em streaming conta até o envio dos cabeçalhos
+    REQUEST_SECONDS.labels(route, request.method).observe(time.perf_counter() - started)
+    RESPONSES.labels(route, request.method, str(response.status_code)).inc()
+    if not response.is_streamed and response.content_length is not None:
+        RESPONSE_BYTES.labels(route).observe(response.content_length)
+    return response
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        # Fecha ao fim do envio: respostas em streaming entram inteiras no perfil
+        handle, route = profile
+        method, path, query = request.method, request.path, request.query_string.decode('latin-1')
+        status = response.status_code
+        response.call_on_close(lambda: profiler.finish(handle, route, method, path, query, status))
+    return response
+
+@app.teardown_request
+def discard_request_profile(exc):
+    # Erro antes do after_request: o perfil ainda é guardado, com status 500
+    profile = g.pop('profile', None)
+    if profile is not None:
+        handle, route = profile
+        profiler.finish(handle, route, request.method, request.path, request.query_string.decode('latin-1'), 500)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
@@ -61,42 +233,167 @@ def index():
 @login_required
 def get_produtos():
     try:
-        produtos = processor.process()
-        stats = processor.get_stats(produtos)
-        
-        data_atual = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
-        if os.path.exists(app.config['DATA_FILE']):
-            timestamp = os.path.getmtime(app.config['DATA_FILE'])
-            data_atual = datetime.datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M")
-            
-        return jsonify({
-            'produtos': produtos,
-            'stats': stats,
-            'ultima_atualizacao': data_atual
-        })
+        return cached_json('produtos', build_produtos_response)
     except Exception as e:
         print(f"Erro crítico na API: {e}")
         return jsonify({'error': 'Erro ao processar dados do estoque', 'details': str(e)}), 500
 
+def build_produtos_response(produtos):
+    """Resposta de /api/produtos (catálogo inteiro, página filtrada ou um SKU)"""
+    stats = processor.get_stats(produtos)
+    
+    data_atual = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
+    if os.path.exists(app.config['DATA_FILE']):
+        timestamp = os.path.getmtime(app.config['DATA_FILE'])
+        data_atual = datetime.datetime.fromtimestamp(timestamp).strftime("%d/%m/%Y %H:%M")
+
+    fields = requested_fields()
+    response = {
+        'stats': stats,
+        'ultima_atualizacao': data_atual,
+        'leitura': processor.last_read_info
+    }
+
+    # Sem parâmetros de paginação/filtro devolve o catálogo inteiro (compatibilidade)
+    if not PRODUCT_QUERY_ARGS.intersection(request.args):
+        # O catálogo fica em colunas; os dicts só são montados aqui, para o JSON
+        response['produtos'] = records(produtos, fields)
+        return response
+
+    sku = request.args.get('sku', '').strip()
+    if sku:
+        produto = processor.get_index(produtos).find_sku(sku, fields)
+        response.update({'produtos': [produto] if produto else [], 'total': 1 if produto else 0,
+                         'page': 1, 'pages': 1, 'page_size': 1})
+        return response
+
+    page_size = request.args.get('page_size', 24, type=int)
+    result = processor.get_index(produtos).query(
+        category=request.args.get('category', ''),
+        low_stock=request.args.get('low_stock', '').lower() in ('1', 'true', 'yes'),
+        search=request.args.get('q', ''),
+        sort=request.args.get('sort', ''),
+        page=request.args.get('page', 1, type=int),
+        page_size=min(page_size or 24, app.config['MAX_PAGE_SIZE']),
+        fields=fields
+    )
+    response['produtos'] = result.pop('items')
+    response.update(result)
+    return response
+
+@app.route('/api/produtos/<sku>')
+@login_required
+def get_produto(sku):
+    """Produto completo, com as descrições (geradas sob demanda)"""
+    try:
+        processor.process()
+        produto = processor.get_index().find_sku(sku, requested_fields() if 'fields' in request.args else None)
+        if produto is None:
+            return jsonify({'error': 'Produto não encontrado'}), 404
+        return jsonify(produto)
+    except Exception as e:
+        print(f"Erro ao buscar produto: {e}")
+        return jsonify({'error': 'Erro ao buscar produto', 'details': str(e)}), 500
+
+@app.route('/api/search')
+@login_required
+def search_produtos():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'produtos': [], 'total': 0, 'page': 1, 'pages': 1, 'query': query})
+
+        page_size = request.args.get('limit', 20, type=int)
+        result = processor.get_index().query(
+            search=query,
+            category=request.args.get('category', ''),
+            page=request.args.get('page', 1, type=int),
+            page_size=min(page_size or 20, app.config['MAX_PAGE_SIZE']),
+            fields=requested_fields()
+        )
+        result['produtos'] = result.pop('items')
+        result['query'] = query
+        return jsonify(result)
+    except Exception as e:
+        print(f"Erro na busca: {e}")
+        return jsonify({'error': 'Erro ao buscar produtos', 'details': str(e)}), 500
+
 @app.route('/api/historico/<sku>')
 @login_required
 def get_historico(sku):
     try:
-        history = processor.get_product_history(sku)
-        return jsonify(history)
+        # Busca indexada por SKU; ?limit= restringe às mudanças mais recentes
+        return jsonify(history.history(sku, limit=request.args.get('limit', type=int)))
     except Exception as e:
+        print(f"Erro ao buscar histórico: {e}")
         return jsonify([])
 
 @app.route('/api/dashboard')
 @login_required
 def get_dashboard():
     try:
-        produtos = processor.process()
-        stats = processor.get_dashboard_stats(produtos)
-        return jsonify(stats)
+        return cached_json('dashboard', processor.get_dashboard_stats)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats')
+@login_required
+def get_cache_stats():
+    stats = processor.cache_stats()
+    stats['payloads'] = payload_cache.stats()
+    stats['thumbnails'] = thumbnails.stats()
+    stats['history'] = history.stats()
+    return jsonify(stats)
+
+@app.route('/api/metrics')
+def get_metrics():
+    # Prometheus com o token configurado, ou o admin logado
+    token = app.config['METRICS_TOKEN']
+    authorization = request.headers.get('Authorization', '')
+    authorized = bool(token) and hmac.compare_digest(authorization.encode(), f'Bearer {token}'.encode())
+    if not authorized and not session.get('logged_in'):
+        return jsonify({'error': 'Acesso não autorizado'}), 401
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/profiling', methods=['GET', 'POST', 'DELETE'])
+@login_required
+def profiling():
+    """Liga/desliga os perfis e lista os guardados.
+
+    POST {"route": "/api/produtos", "count": 5} perfila as próximas 5 requisições da
+    rota; {"sample_rate": 0.05} perfila 5% de todas; {"enabled": false} desliga.
+    DELETE apaga os perfis guardados.
+    """
+    if request.method == 'DELETE':
+        profiler.clear()
+    elif request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            return jsonify(profiler.configure(sample_rate=data.get('sample_rate'), route=data.get('route'),
+                                              count=data.get('count'), enabled=data.get('enabled')))
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Parâmetros inválidos: {e}'}), 400
+    return jsonify(profiler.status())
+
+@app.route('/api/profiling/<profile_id>')
+@login_required
+def download_profile(profile_id):
+    """?format=pstats (padrão), collapsed (gráfico de chamas) ou text"""
+    entry = profiler.get(profile_id)
+    if entry is None:
+        return jsonify({'error': 'Perfil não encontrado'}), 404
+    fmt = request.args.get('format', 'pstats')
+    if fmt == 'pstats':
+        body, mimetype, extension = entry.pstats_bytes(), 'application/octet-stream', 'pstats'
+    elif fmt == 'collapsed':
+        body, mimetype, extension = entry.collapsed(), 'text/plain; charset=utf-8', 'folded'
+    elif fmt == 'text':
+        return Response(entry.text(), mimetype='text/plain; charset=utf-8')
+    else:
+        return jsonify({'error': 'Formato inválido (pstats, collapsed ou text)'}), 400
+    headers = {'Content-Disposition': f'attachment; filename={entry.id}.{extension}'}
+    return Response(body, mimetype=mimetype, headers=headers)
+
 @app.route('/api/upload-image/<sku>', methods=['POST'])
 @login_required
 def upload_image(sku):
@@ -112,7 +409,10 @@ def upload_image(sku):
         filename = f"{sku}.jpg"
         filepath = os.path.join(app.config['IMAGES_FOLDER'], filename)
         file.save(filepath)
-        return jsonify({'success': True, 'message': 'Imagem atualizada com sucesso!'})
+        # has_image e a ordem do catálogo mudam sem reprocessar o CSV
+        version = processor.image_index.add(sku) if processor.image_index is not None else 0
+        thumbnails.submit(filename)
+        return jsonify({'success': True, 'message': 'Imagem atualizada com sucesso!', 'version': version})
         
     return jsonify({'success': False, 'message': 'Erro ao salvar imagem'}), 400
 
@@ -120,21 +420,34 @@ def upload_image(sku):
 @login_required
 def print_reposicao():
     try:
-        produtos = processor.process()
-        # Filtra produtos com estoque baixo (<= 3) ou zerado
-        # Convertendo para int para garantir
-        def get_stock(p):
-            try: return float(p.get('Stock', 0))
-            except: return 0
-            
-        reposicao = [p for p in produtos if get_stock(p) <= 3]
-        # Ordena por fornecedor/categoria se possível, ou nome
-        reposicao.sort(key=lambda x: (x.get('Categories', ''), x.get('Name', '')))
-        
-        return render_template('print_reposicao.html', produtos=reposicao, date=datetime.datetime.now())
+        # Estoque baixo (até LOW_STOCK_THRESHOLD) ou zerado, por categoria e nome:
+        # lista montada uma vez por versão dos dados, junto do índice
+        index = processor.get_index()
+        positions = index.replenishment()
+        produtos = index.products
     except Exception as e:
         return f"Erro ao gerar relatório: {e}", 500
 
+    # Página enviada em pedaços: as linhas são montadas conforme a tabela é escrita
+    reposicao = (row(produtos, pos, REPOSICAO_FIELDS) for pos in positions)
+    html = stream_template('print_reposicao.html', produtos=reposicao, total=len(positions),
+                           threshold=processor.low_stock_threshold, date=datetime.datetime.now())
+    return Response(stream_with_context(buffered(html)), mimetype='text/html')
+
+def buffered(chunks, size=16 * 1024):
+    """Junta os pedaços do template em blocos maiores (menos escritas no socket)"""
+    pending = []
+    length = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(pending)
+            pending = []
+            length = 0
+    if pending:
+        yield ''.join(pending)
+
 @app.route('/upload', methods=['POST'])
 @login_required
 def upload_file():
@@ -147,30 +460,93 @@ def upload_file():
         return jsonify({'success': False, 'message': 'Nenhum arquivo selecionado'}), 400
         
     if file and allowed_file(file.filename):
-        # Backup automático
-        if os.path.exists(app.config['DATA_FILE']):
-            try:
-                backup_dir = os.path.join(app.config['BASE_DIR'], 'backups')
-                os.makedirs(backup_dir, exist_ok=True)
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-                backup_path = os.path.join(backup_dir, f'estoque_{timestamp}.csv')
-                shutil.copy2(app.config['DATA_FILE'], backup_path)
-                print(f"Backup criado em: {backup_path}")
-            except Exception as e:
-                print(f"Erro ao criar backup: {e}")
-
-        file.save(app.config['DATA_FILE'])
-        return jsonify({'success': True, 'message': 'Estoque atualizado com sucesso!'})
+        # Grava em um temporário na mesma pasta (a troca final é um os.replace atômico)
+        tmp_path = os.path.join(os.path.dirname(app.config['DATA_FILE']), f".upload_{uuid.uuid4().hex}.csv.tmp")
+        file.save(tmp_path)
+
+        error = processor.validate(tmp_path)
+        if error:
+            os.remove(tmp_path)
+            return jsonify({'success': False, 'message': error}), 400
+
+        # Backup, leitura, troca e histórico rodam no worker
+        job = ingestor.submit(tmp_path, secure_filename(file.filename))
+        return jsonify({'success': True, 'message': 'Arquivo recebido. Processando o estoque...',
+                        'job': job.to_dict()}), 202
     
     return jsonify({'success': False, 'message': 'Tipo de arquivo não permitido. Use CSV.'}), 400
 
+@app.route('/api/upload/status')
+@app.route('/api/upload/status/<job_id>')
+@login_required
+def upload_status(job_id=None):
+    job = ingestor.get(job_id) if job_id else ingestor.latest()
+    if job is None:
+        return jsonify({'error': 'Processamento não encontrado'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/backups')
+@login_required
+def list_backups():
+    return jsonify({'backups': backups.snapshots()[::-1], 'stats': backups.stats()})
+
+@app.route('/api/backups/<snapshot_id>/download')
+@login_required
+def download_backup(snapshot_id):
+    if backups.get(snapshot_id) is None:
+        return jsonify({'error': 'Backup não encontrado'}), 404
+    headers = {'Content-Disposition': f'attachment; filename=estoque_{snapshot_id}.csv'}
+    return Response(stream_with_context(backups.export(snapshot_id)), mimetype='text/csv', headers=headers)
+
+@app.route('/api/backups/<snapshot_id>/restore', methods=['POST'])
+@login_required
+def restore_backup(snapshot_id):
+    if backups.get(snapshot_id) is None:
+        return jsonify({'success': False, 'message': 'Backup não encontrado'}), 404
+    try:
+        # Mesmo caminho de um upload: o arquivo atual vira backup e a troca é feita pelo worker
+        tmp_path = os.path.join(os.path.dirname(app.config['DATA_FILE']), f".upload_{uuid.uuid4().hex}.csv.tmp")
+        backups.restore(snapshot_id, tmp_path)
+        job = ingestor.submit(tmp_path, f'backup {snapshot_id}')
+        return jsonify({'success': True, 'message': f'Restaurando o estoque do backup {snapshot_id}...',
+                        'job': job.to_dict()}), 202
+    except Exception as e:
+        print(f"Erro ao restaurar backup: {e}")
+        return jsonify({'success': False, 'message': 'Erro ao restaurar backup', 'details': str(e)}), 500
+
 @app.route('/imagens/<path:filename>')
 def serve_image(filename):
-    return send_from_directory(app.config['IMAGES_FOLDER'], filename)
+    # ?size=grid|detail serve a variante redimensionada (WebP se o navegador aceitar)
+    size = request.args.get('size', '')
+    variant = None
+    if size in THUMBNAIL_SIZES:
+        fmt = 'webp' if 'image/webp' in request.accept_mimetypes.values() else 'jpeg'
+        variant = thumbnails.variant(filename, size, fmt)
+
+    if variant:
+        response = send_from_directory(thumbnails.variants_folder, variant)
+        response.headers['Vary'] = 'Accept'
+    else:
+        response = send_from_directory(app.config['IMAGES_FOLDER'], filename)
+
+    # URL com versão (?v=) nunca muda de conteúdo: cache longo. A original servida
+    # no lugar de uma variante ainda não gerada não entra nesse cache.
+    if request.args.get('v') and (variant or not size or not thumbnails.enabled):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 if __name__ == '__main__':
     print("🚀 Servidor AquaFlora Estoque rodando!")
     print("👉 Acesse localmente: http://127.0.0.1:8000")
     print("👉 Acesse na rede: http://0.0.0.0:8000 (Use o IP do computador)")
+    # Tarefas de subida (catálogo/índices, migração dos backups antigos) só no processo
+    # que atende, nunca no import: no modo debug o reloader roda este script duas vezes
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        # Backups antigos (cópias inteiras) migram para o store em segundo plano
+        threading.Thread(target=backups.import_legacy, daemon=True).start()
+        if app.config['WARM_ON_START']:
+            threading.Thread(target=processor.warm, daemon=True).start()
     # host='0.0.0.0' permite que outros computadores na rede acessem o sistema
     app.run(host='0.0.0.0', debug=True, port=8000)
@@ -0,0 +1,367 @@
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Ops de um delta: copia linhas do snapshot anterior ou insere linhas novas
+OP_COPY = 0
+OP_INSERT = 1
+
+MANIFEST = 'snapshots.json'
+OBJECTS_DIR = 'objects'
+LOCK = '.manifest.lock'
+
+
+def _split_lines(content):
+    return content.splitlines(keepends=True)
+
+
+def make_delta(base_lines, lines):
+    """Ops que reconstroem `lines` a partir de `base_lines`.
+
+    Guloso e linear: continua a cópia enquanto a próxima linha segue a do
+    snapshot anterior; senão procura a linha (primeira ocorrência) e começa
+    uma nova cópia, ou a insere literalmente.
+    """
+    positions = {}
+    for i, line in enumerate(base_lines):
+        positions.setdefault(line, i)
+
+    ops = []
+    cursor = None
+    for line in lines:
+        if cursor is not None and cursor < len(base_lines) and base_lines[cursor] == line:
+            ops[-1][2] += 1
+            cursor += 1
+            continue
+        pos = positions.get(line)
+        if pos is not None:
+            ops.append([OP_COPY, pos, 1])
+            cursor = pos + 1
+        else:
+            if ops and ops[-1][0] == OP_INSERT:
+                ops[-1][1].append(line)
+            else:
+                ops.append([OP_INSERT, [line]])
+            cursor = None
+    return ops
+
+
+def _write_atomic(path, data):
+    """Grava via temporário único na mesma pasta + os.replace"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def apply_delta(base_lines, ops):
+    for op in ops:
+        if op[0] == OP_COPY:
+            yield from base_lines[op[1]:op[1] + op[2]]
+        else:
+            yield from op[1]
+
+
+class BackupStore:
+    """Backups dos CSVs de estoque, endereçados por conteúdo e comprimidos.
+
+    Cada snapshot aponta para o hash (sha256) do conteúdo; conteúdo repetido
+    não é gravado de novo. O objeto de um conteúdo é o arquivo inteiro em gzip
+    (keyframe) ou um delta por linhas contra o snapshot anterior, também em
+    gzip. A cada `keyframe_interval` snapshots (ou quando o delta não compensa)
+    grava-se um keyframe, o que limita a cadeia lida em uma restauração.
+
+    A pasta pode ser usada por vários processos (workers do servidor): toda
+    leitura-alteração-gravação do manifesto roda com uma trava em arquivo.
+    """
+
+    def __init__(self, folder, keyframe_interval=10, keep_last=50, keep_days=90, compress_level=6,
+                 lock_timeout=120):
+        self.folder = folder
+        self.objects = os.path.join(folder, OBJECTS_DIR)
+        self.keyframe_interval = keyframe_interval
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self.compress_level = compress_level
+        self.lock_timeout = lock_timeout
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        os.makedirs(self.objects, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """Trava do manifesto entre threads e entre processos (reentrante no mesmo thread)"""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            lock = os.path.join(self.folder, LOCK)
+            deadline = time.time() + self.lock_timeout
+            while True:
+                try:
+                    os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                    break
+                except FileExistsError:
+                    try:
+                        stale = time.time() - os.path.getmtime(lock) > self.lock_timeout
+                    except OSError:
+                        stale = False
+                    if stale or time.time() > deadline:
+                        # Processo que segurava a trava morreu: assume a trava
+                        try:
+                            os.remove(lock)
+                        except OSError:
+                            pass
+                        continue
+                    time.sleep(0.05)
+
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                try:
+                    os.remove(lock)
+                except OSError:
+                    pass
+
+    # Manifesto -------------------------------------------------------------
+
+    def _manifest_path(self):
+        return os.path.join(self.folder, MANIFEST)
+
+    def _load(self):
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'snapshots': [], 'objects': {}}
+
+    def _save(self, manifest):
+        _write_atomic(self._manifest_path(), json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+
+    def snapshots(self):
+        """Snapshots, do mais antigo para o mais novo"""
+        with self._locked():
+            manifest = self._load()
+        return [dict(snapshot, kind=manifest['objects'][snapshot['hash']]['kind'])
+                for snapshot in manifest['snapshots']]
+
+    def get(self, snapshot_id):
+        for snapshot in self.snapshots():
+            if snapshot['id'] == snapshot_id:
+                return snapshot
+        return None
+
+    # Objetos ---------------------------------------------------------------
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.objects, content_hash[:2], f"{content_hash}.gz")
+
+    def _write_object(self, content_hash, data):
+        path = self._object_path(content_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_atomic(path, gzip.compress(data, compresslevel=self.compress_level, mtime=0))
+        return os.path.getsize(path)
+
+    def _read_object(self, content_hash):
+        with gzip.open(self._object_path(content_hash), 'rb') as f:
+            return f.read()
+
+    def _content(self, manifest, content_hash):
+        """Conteúdo completo (bytes) de um objeto, aplicando a cadeia de deltas"""
+        chain = []
+        while True:
+            info = manifest['objects'][content_hash]
+            if info['kind'] == 'full':
+                content = self._read_object(content_hash)
+                break
+            chain.append(content_hash)
+            content_hash = info['base']
+
+        for delta_hash in reversed(chain):
+            ops = json.loads(self._read_object(delta_hash).decode('ascii'))
+            base_lines = _split_lines(content.decode('utf-8', 'surrogateescape'))
+            content = ''.join(apply_delta(base_lines, ops)).encode('utf-8', 'surrogateescape')
+        return content
+
+    # Operações -------------------------------------------------------------
+
+    def snapshot(self, path, taken_at=None):
+        """Guarda o arquivo como um novo snapshot; devolve o snapshot gravado"""
+        taken_at = taken_at or datetime.datetime.now()
+        with open(path, 'rb') as f:
+            content = f.read()
+        content_hash = hashlib.sha256(content).hexdigest()
+
+        with self._locked():
+            manifest = self._load()
+            objects = manifest['objects']
+
+            if content_hash not in objects:
+                objects[content_hash] = self._store_object(manifest, content_hash, content)
+
+            snapshot_id = taken_at.strftime("%Y-%m-%d_%H-%M-%S")
+            existing = {snapshot['id'] for snapshot in manifest['snapshots']}
+            suffix = 2
+            while snapshot_id in existing:
+                snapshot_id = f"{taken_at.strftime('%Y-%m-%d_%H-%M-%S')}-{suffix}"
+                suffix += 1
+
+            snapshot = {
+                'id': snapshot_id,
+                'taken_at': taken_at.isoformat(timespec='seconds'),
+                'hash': content_hash,
+                'size': len(content)
+            }
+            manifest['snapshots'].append(snapshot)
+            # Backups antigos importados entram na posição certa da linha do tempo
+            manifest['snapshots'].sort(key=lambda item: item['taken_at'])
+            self._save(manifest)
+        return snapshot
+
+    def _store_object(self, manifest, content_hash, content):
+        previous = manifest['snapshots'][-1]['hash'] if manifest['snapshots'] else None
+        depth = manifest['objects'][previous].get('depth', 0) + 1 if previous else 0
+
+        if previous and depth < self.keyframe_interval:
+            base = self._content(manifest, previous)
+            ops = make_delta(_split_lines(base.decode('utf-8', 'surrogateescape')),
+                             _split_lines(content.decode('utf-8', 'surrogateescape')))
+            delta = json.dumps(ops, separators=(',', ':')).encode('ascii')
+            # Delta só compensa se for bem menor que o arquivo
+            if len(delta) < len(content) // 2:
+                stored = self._write_object(content_hash, delta)
+                return {'kind': 'delta', 'base': previous, 'depth': depth, 'stored': stored}
+
+        stored = self._write_object(content_hash, content)
+        return {'kind': 'full', 'depth': 0, 'stored': stored}
+
+    def content(self, snapshot_id):
+        """Conteúdo completo de um snapshot (bytes)"""
+        with self._locked():
+            manifest = self._load()
+            for snapshot in manifest['snapshots']:
+                if snapshot['id'] == snapshot_id:
+                    return self._content(manifest, snapshot['hash'])
+        raise KeyError(snapshot_id)
+
+    def export(self, snapshot_id, chunk_size=64 * 1024):
+        """Gera o CSV do snapshot em blocos (para respostas em streaming)"""
+        content = self.content(snapshot_id)
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+
+    def restore(self, snapshot_id, target):
+        """Reescreve `target` com o conteúdo do snapshot (troca atômica)"""
+        content = self.content(snapshot_id)
+        _write_atomic(target, content)
+        return len(content)
+
+    def prune(self, now=None):
+        """Aplica a retenção: os `keep_last` mais novos e um por dia nos últimos `keep_days`.
+
+        Objetos usados como base de deltas mantidos não são apagados.
+        """
+        now = now or datetime.datetime.now()
+        with self._locked():
+            manifest = self._load()
+            snapshots = manifest['snapshots']
+            keep = set(snapshot['id'] for snapshot in snapshots[-self.keep_last:]) if self.keep_last else set()
+
+            cutoff = now - datetime.timedelta(days=self.keep_days)
+            days = set()
+            for snapshot in reversed(snapshots):
+                taken_at = datetime.datetime.fromisoformat(snapshot['taken_at'])
+                day = taken_at.date()
+                if taken_at >= cutoff and day not in days:
+                    days.add(day)
+                    keep.add(snapshot['id'])
+
+            kept = [snapshot for snapshot in snapshots if snapshot['id'] in keep]
+            needed = set()
+            for snapshot in kept:
+                content_hash = snapshot['hash']
+                while content_hash and content_hash not in needed:
+                    needed.add(content_hash)
+                    content_hash = manifest['objects'][content_hash].get('base')
+
+            removed = [content_hash for content_hash in manifest['objects'] if content_hash not in needed]
+            for content_hash in removed:
+                del manifest['objects'][content_hash]
+            manifest['snapshots'] = kept
+            self._save(manifest)
+
+            # Apaga os arquivos só depois de o manifesto novo estar gravado, ainda com a
+            # trava: outro processo poderia regravar o mesmo conteúdo no meio da limpeza
+            for content_hash in removed:
+                try:
+                    os.remove(self._object_path(content_hash))
+                except OSError:
+                    pass
+        return {'snapshots_removed': len(snapshots) - len(kept), 'objects_removed': len(removed)}
+
+    def import_legacy(self, pattern_prefix='estoque_'):
+        """Move os backups antigos (estoque_AAAA-MM-DD_HH-MM-SS.csv) para o store.
+
+        O arquivo original só é apagado depois de conferir que a restauração
+        devolve exatamente os mesmos bytes. Cada arquivo é importado com a trava
+        do manifesto: um segundo processo importando ao mesmo tempo encontra o
+        arquivo já importado (ou o snapshot já no manifesto) e não o duplica.
+        """
+        names = sorted(name for name in os.listdir(self.folder)
+                       if name.startswith(pattern_prefix) and name.endswith('.csv'))
+        imported = 0
+        for name in names:
+            path = os.path.join(self.folder, name)
+            try:
+                stamp = name[len(pattern_prefix):-len('.csv')]
+                taken_at = datetime.datetime.strptime(stamp, "%Y-%m-%d_%H-%M-%S")
+                with self._locked():
+                    if not os.path.exists(path):
+                        continue
+                    with open(path, 'rb') as f:
+                        original = hashlib.sha256(f.read()).hexdigest()
+                    # Importação anterior interrompida antes de apagar o original
+                    snapshot = next((item for item in self._load()['snapshots']
+                                     if item['taken_at'] == taken_at.isoformat(timespec='seconds')
+                                     and item['hash'] == original), None)
+                    if snapshot is None:
+                        snapshot = self.snapshot(path, taken_at=taken_at)
+                    if hashlib.sha256(self.content(snapshot['id'])).hexdigest() != original:
+                        raise ValueError('conteúdo restaurado diferente do original')
+                    os.remove(path)
+                imported += 1
+            except Exception as e:
+                print(f"Erro ao importar backup {name}: {e}")
+        return imported
+
+    def stats(self):
+        with self._locked():
+            manifest = self._load()
+        objects = manifest['objects'].values()
+        return {
+            'snapshots': len(manifest['snapshots']),
+            'objects': len(manifest['objects']),
+            'keyframes': sum(1 for info in objects if info['kind'] == 'full'),
+            'stored_bytes': sum(info.get('stored', 0) for info in objects),
+            'original_bytes': sum(snapshot['size'] for snapshot in manifest['snapshots'])
+        }
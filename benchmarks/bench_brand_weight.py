@@ -0,0 +1,72 @@
+"""Compara detect_brand/extract_weight antigos (um regex por chave) com os
+matchers pré-compilados (Aho-Corasick + varredura de unidades).
+
+Uso: python benchmarks/bench_brand_weight.py [--rows 5000]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor import StockProcessor
+from normalizer import WEIGHT_PATTERNS
+from bench_fix_text import make_rows
+
+
+def legacy_detect_brand(brands, name):
+    name_lower = name.lower()
+    for key, value in brands.items():
+        if re.search(r'\b' + re.escape(key) + r'\b', name_lower):
+            return value
+    for key, value in brands.items():
+        if key in name_lower and len(key) > 3:
+            return value
+    return None
+
+
+def legacy_extract_weight(name):
+    for pattern in WEIGHT_PATTERNS:
+        match = re.search(pattern, name, re.IGNORECASE)
+        if match:
+            val = float(match.group(1).replace(',', '.'))
+            if 'g' in pattern and 'kg' not in pattern:
+                val /= 1000
+            elif 'ml' in pattern:
+                val /= 1000
+            if 0.001 < val <= 50:
+                return f"{val:.3f}"
+    return None
+
+
+def run(label, brand, weight, names):
+    start = time.perf_counter()
+    out = [(brand(name), weight(name)) for name in names]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(names) / elapsed:>12,.0f} linhas/s  ({elapsed:.3f}s)")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    processor = StockProcessor('')
+    names = [name for name, _ in make_rows(args.rows)]
+
+    old = run('antigo', lambda n: legacy_detect_brand(processor.marcas_conhecidas, n),
+              legacy_extract_weight, names)
+    new = run('novo', processor.detect_brand, processor.extract_weight, names)
+
+    if old != new:
+        print("ERRO: saídas diferentes entre as implementações")
+        sys.exit(1)
+    print("Saídas idênticas.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Compara o fix_text antigo (um re.sub por regra) com o TextNormalizer.
+
+Uso: python benchmarks/bench_fix_text.py [--rows 300]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor import StockProcessor
+
+NOMES = [
+    'Racao Royal Canin Golden Retriever 15kg Ad',
+    'Bravecto 20 a 40kg Transdermal',
+    'Areia Sanitaria Pipicat 4kg',
+    'Shampoo Pet Society 500ml Pelos Claros',
+    'Racao Premier Fil Rp Frg 1kg',
+    'Aquario Boyu Acrilico 40 Lts Led',
+    'Bebedouro Automatico Plastico 2 Lt',
+    'Coleira Nylon Pq Seresto Cães',
+    'Mangueira Cb. Madeira 1,5 Mts',
+    'Semente Grama Nat. 500g Jardim',
+]
+CATEGORIAS = ['Racao Caes', 'Acessorio', 'Medicamento', 'Aquario', 'Jardinagem', 'Geral']
+
+
+def legacy_fix_text(replacements, text):
+    for pattern, replacement in replacements.items():
+        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+    if text:
+        text = text[0].upper() + text[1:]
+    return text
+
+
+def make_rows(count, seed=42):
+    rnd = random.Random(seed)
+    return [(rnd.choice(NOMES), rnd.choice(CATEGORIAS)) for _ in range(count)]
+
+
+def run(label, fix, rows):
+    start = time.perf_counter()
+    out = [(fix(name), fix(category)) for name, category in rows]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {len(rows) / elapsed:>12,.0f} linhas/s  ({elapsed:.3f}s)")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=300)
+    args = parser.parse_args()
+
+    processor = StockProcessor('')
+    rows = make_rows(args.rows)
+
+    old = run('antigo', lambda t: legacy_fix_text(processor.replacements, t), rows)
+    new = run('novo', processor.fix_text, rows)
+
+    if old != new:
+        print("ERRO: saídas diferentes entre as implementações")
+        sys.exit(1)
+    print("Saídas idênticas.")
+
+
+if __name__ == '__main__':
+    main()
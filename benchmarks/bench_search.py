@@ -0,0 +1,71 @@
+"""Latência de busca no SearchIndex com um catálogo sintético.
+
+Uso: python benchmarks/bench_search.py [--products 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+
+TIPOS = ['Ração', 'Areia Sanitária', 'Shampoo', 'Coleira', 'Aquário', 'Bebedouro', 'Petisco',
+         'Brinquedo', 'Vermífugo', 'Antipulgas', 'Comedouro', 'Semente', 'Adubo', 'Filtro']
+MARCAS = ['Royal Canin', 'Premier', 'Golden', 'Pedigree', 'Whiskas', 'Bravecto', 'Sera', 'Tetra',
+          'Boyu', 'Vitalab', 'Guabi Natural', 'Pet Society', 'Nutrópica', '']
+DETALHES = ['Adulto', 'Filhote', 'Castrado', 'Frango', 'Carne', 'Salmão', 'Cordeiro', 'Light',
+            'Raças Pequenas', 'Sênior', 'Neutro', 'Plástico', 'Acrílico', 'Azul', 'Rosa']
+CATEGORIAS = ['Rações', 'Higiene', 'Acessórios', 'Medicamentos', 'Aquarismo', 'Jardinagem', 'Geral']
+QUERIES = ['racao', 'ração golden', 'royal adulto', 'sham', 'aqua boyu', 'sku00012', 'frango 15kg',
+           'vermifugo filhote', 'xyz inexistente', 'pet']
+
+
+def make_products(count, seed=42):
+    rnd = random.Random(seed)
+    products = []
+    for i in range(count):
+        brand = rnd.choice(MARCAS)
+        name = f"{rnd.choice(TIPOS)} {brand} {rnd.choice(DETALHES)} {rnd.randint(1, 20)}kg".replace('  ', ' ')
+        products.append({
+            'SKU': f'SKU{i:06d}',
+            'Name': name,
+            'Meta: _marca': brand,
+            'Categories': rnd.choice(CATEGORIAS),
+        })
+    return products
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    products = make_products(args.products)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    index = SearchIndex(products)
+    build = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{args.products:,} produtos: índice em {build:.2f}s, {memory / 2**20:.1f} MB")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = index.search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"{query!r:<24} {len(hits):>7,} resultados  p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
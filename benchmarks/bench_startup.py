@@ -0,0 +1,76 @@
+"""Mede o tempo de importar o app (subida do servidor) e confere o orçamento.
+
+Cada medição roda em um processo Python novo, como na subida do serviço. O
+pandas não pode ser importado junto com o app: ele só entra quando um CSV
+padrão é lido.
+
+Uso: python benchmarks/bench_startup.py [--runs 5] [--budget 1.5]
+Sai com código 1 se a mediana passar do orçamento (em segundos).
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda no processo filho: importa o app com as pastas apontando para um diretório temporário
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+sys.path.insert(0, {root!r})
+import config
+base = {base!r}
+config.Config.UPLOAD_FOLDER = os.path.join(base, 'uploads')
+config.Config.DATA_FILE = os.path.join(base, 'uploads', 'estoque_atual.csv')
+config.Config.IMAGES_FOLDER = os.path.join(base, 'images')
+config.Config.BACKUP_FOLDER = os.path.join(base, 'backups')
+config.Config.HISTORY_DB = os.path.join(base, 'historico.db')
+config.Config.SNAPSHOT_FOLDER = os.path.join(base, 'snapshots')
+import app
+print(json.dumps({{'seconds': time.perf_counter() - started, 'pandas': 'pandas' in sys.modules}}))
+"""
+
+
+def measure(base):
+    code = CHILD.format(root=ROOT, base=base)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, ADMIN_PASSWORD='bench'))
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.5)
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        os.makedirs(os.path.join(base, 'uploads'))
+        results = [measure(base) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    times = [result['seconds'] for result in results]
+    median = statistics.median(times)
+    print(f"import app: mediana {median:.3f}s  (mín {min(times):.3f}s, máx {max(times):.3f}s, {args.runs} execuções)")
+
+    failed = False
+    if any(result['pandas'] for result in results):
+        print("ERRO: pandas importado na subida")
+        failed = True
+    if median > args.budget:
+        print(f"ERRO: subida acima do orçamento de {args.budget:.2f}s")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"OK: dentro do orçamento de {args.budget:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Memória do catálogo: lista de dicts (formato antigo) x ProductStore em colunas.
+
+SKU e nome são os mesmos objetos nas duas medições; a diferença vem dos
+números em texto, das descrições e do dict de cada produto.
+
+Uso: python benchmarks/bench_store_memory.py [--products 100000]
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor import StockProcessor
+from product_store import ProductStoreBuilder
+from bench_search import TIPOS, MARCAS, DETALHES, CATEGORIAS
+
+
+def make_raw_rows(count, seed=42):
+    """Linhas como saem do CSV bruto: (sku, descrição, estoque, preço, custo, categoria)"""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        name = f"{rnd.choice(TIPOS)} {rnd.choice(MARCAS)} {rnd.choice(DETALHES)} {rnd.randint(1, 20)}kg"
+        price = rnd.uniform(5, 500)
+        rows.append((
+            f'{i:06d}', name.replace('  ', ' '), str(rnd.randint(-2, 80)),
+            f'{price:.2f}'.replace('.', ','), f'{price * 0.6:.2f}'.replace('.', ','),
+            rnd.choice(CATEGORIAS)
+        ))
+    return rows
+
+
+def measure(label, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label:<16} {memory / 2**20:8.1f} MB  ({elapsed:.2f}s)")
+    return value, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--products', type=int, default=100000)
+    args = parser.parse_args()
+
+    processor = StockProcessor('')
+    rows = make_raw_rows(args.products)
+    fields = [processor.enrich_fields(*row) for row in rows]
+
+    def build_store():
+        builder = ProductStoreBuilder(processor.describe)
+        for item in fields:
+            builder.add_fields(*item)
+        return builder.build()
+
+    store, store_memory = measure('ProductStore', build_store)
+    records, records_memory = measure('lista de dicts', store.to_records)
+
+    # As linhas montadas pelo store devem ser iguais às de create_smart_product
+    by_sku = {record['SKU']: record for record in records}
+    if any(processor.create_smart_product(*row) != by_sku[row[0]] for row in rows[:1000]):
+        print("ERRO: linhas do ProductStore diferentes de create_smart_product")
+        sys.exit(1)
+    print(f"{args.products:,} produtos: {records_memory / max(store_memory, 1):.1f}x menos memória")
+
+
+if __name__ == '__main__':
+    main()
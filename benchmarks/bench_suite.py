@@ -0,0 +1,298 @@
+"""Suite de benchmarks com catálogos sintéticos (offline e reprodutível).
+
+Para cada tamanho e formato (bruto do ERP e padrão) mede process() frio, quente
+e a partir do snapshot em disco, get_stats/get_dashboard_stats, as regras de
+texto (fix_text, detect_brand, extract_weight), backups e histórico de uma
+série de versões e os endpoints do Flask pelo test client.
+
+Os tempos (em segundos, menor é melhor) vão para um JSON; com --baseline a
+execução é comparada com um resultado salvo e sai com código 1 se algum tempo
+piorar mais que a tolerância.
+
+Uso:
+  python benchmarks/bench_suite.py --sizes 1000,10000,100000 --output resultados.json
+  python benchmarks/bench_suite.py --sizes 1000000 --skip-flask
+  python benchmarks/bench_suite.py --baseline resultados.json --tolerance 0.25
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_gen import make_raw_rows, make_versions, write_raw_csv, write_standard_csv
+from processor import StockProcessor
+from backup_store import BackupStore
+from history_store import HistoryStore
+from product_store import column, numbers
+
+# Diferenças abaixo disso são ruído de medição, não regressão
+NOISE_FLOOR = 0.005
+# Quantos nomes entram na medição das regras de texto
+RULE_SAMPLE = 20000
+FLASK_REQUESTS = 20
+
+
+def best_of(fn, repeat):
+    """Menor tempo de `repeat` execuções (devolve também o último resultado)"""
+    best = None
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, value
+
+
+def bench_processing(path, workdir, repeat):
+    results = {}
+    results['process_cold'], data = best_of(lambda: StockProcessor(path).process(), repeat)
+
+    processor = StockProcessor(path)
+    data = processor.process()
+    calls = 1000
+    start = time.perf_counter()
+    for _ in range(calls):
+        processor.process()
+    results['process_warm'] = (time.perf_counter() - start) / calls
+
+    snapshots = os.path.join(workdir, 'snapshots')
+    StockProcessor(path, snapshot_folder=snapshots).process()
+    results['process_snapshot'], _ = best_of(
+        lambda: StockProcessor(path, snapshot_folder=snapshots).process(), repeat)
+
+    def cold(method):
+        def run():
+            # Sem os derivados da versão: mede o cálculo, não o cache
+            processor._derived.clear()
+            return method(data)
+        return run
+
+    results['get_stats'], _ = best_of(cold(processor.get_stats), repeat)
+    results['get_dashboard_stats'], _ = best_of(cold(processor.get_dashboard_stats), repeat)
+    return results, len(data)
+
+
+def bench_rules(rows, repeat):
+    processor = StockProcessor('')
+    names = [row[1] for row in rows[:RULE_SAMPLE]]
+    results = {}
+    for name in ('fix_text', 'detect_brand', 'extract_weight'):
+        method = getattr(processor, name)
+        elapsed, _ = best_of(lambda: [method(text) for text in names], repeat)
+        # Tempo por chamada
+        results[name] = elapsed / len(names)
+    return results
+
+
+def bench_backups(rows, workdir, versions, repeat):
+    """Backups e histórico de `versions` uploads sucessivos do mesmo catálogo"""
+    os.makedirs(workdir, exist_ok=True)
+    series = make_versions(rows, versions)
+    paths = []
+    for i, version in enumerate(series):
+        path = os.path.join(workdir, f"versao_{i:02d}.csv")
+        write_raw_csv(path, version)
+        paths.append(path)
+
+    store = BackupStore(os.path.join(workdir, 'backups'))
+    start = time.perf_counter()
+    taken_at = datetime.datetime(2024, 1, 1)
+    for i, path in enumerate(paths):
+        store.snapshot(path, taken_at=taken_at + datetime.timedelta(days=i))
+    results = {'backup_snapshot': (time.perf_counter() - start) / len(paths)}
+
+    last = store.snapshots()[-1]['id']
+    target = os.path.join(workdir, 'restaurado.csv')
+    results['backup_restore'], _ = best_of(lambda: store.restore(last, target), repeat)
+
+    history = HistoryStore(os.path.join(workdir, 'historico.db'))
+    processor = StockProcessor('')
+    start = time.perf_counter()
+    for i, path in enumerate(paths):
+        data = processor.load(path)
+        history.record_snapshot(column(data, 'SKU'), numbers(data, 'Regular price'), numbers(data, 'Stock'),
+                                numbers(data, 'Meta: _custo'), taken_at=taken_at + datetime.timedelta(days=i))
+    results['history_record'] = (time.perf_counter() - start) / len(paths)
+
+    skus = [row[0] for row in random.Random(7).sample(rows, min(200, len(rows)))]
+    elapsed, _ = best_of(lambda: [history.history(sku) for sku in skus], repeat)
+    results['history_lookup'] = elapsed / len(skus)
+
+    stats = store.stats()
+    info = {'backup_ratio': round(stats['stored_bytes'] / max(stats['original_bytes'], 1), 4),
+            'versions': len(paths)}
+    return results, info
+
+
+class FlaskBench:
+    """App importado uma vez, com todas as pastas em um diretório temporário"""
+
+    ENDPOINTS = [
+        ('produtos_pagina', '/api/produtos?page=1&page_size=24'),
+        ('produtos_busca', '/api/produtos?q=racao+golden&page=1'),
+        ('produtos_categoria', '/api/produtos?category=Higiene&sort=-price'),
+        ('produtos_todos', '/api/produtos'),
+        ('search', '/api/search?q=shampoo'),
+        ('dashboard', '/api/dashboard'),
+        ('historico', '/api/historico/{sku}'),
+        ('produto', '/api/produtos/{sku}'),
+    ]
+
+    def __init__(self, workdir):
+        os.environ['ADMIN_PASSWORD'] = 'bench'
+        import config
+        base = os.path.join(workdir, 'app')
+        os.makedirs(os.path.join(base, 'uploads'))
+        config.Config.UPLOAD_FOLDER = os.path.join(base, 'uploads')
+        config.Config.DATA_FILE = os.path.join(base, 'uploads', 'estoque_atual.csv')
+        config.Config.IMAGES_FOLDER = os.path.join(base, 'images')
+        config.Config.BACKUP_FOLDER = os.path.join(base, 'backups')
+        config.Config.HISTORY_DB = os.path.join(base, 'historico.db')
+        config.Config.SNAPSHOT_FOLDER = os.path.join(base, 'snapshots')
+        config.Config.ADMIN_PASSWORD = 'bench'
+
+        import app as appmod
+        self.app = appmod
+        self.client = appmod.app.test_client()
+        self.client.post('/api/login', json={'password': 'bench'})
+
+    def run(self, path):
+        shutil.copy(path, self.app.app.config['DATA_FILE'])
+        # Arquivo novo: garante um mtime diferente do anterior
+        os.utime(self.app.app.config['DATA_FILE'], None)
+        self.app.processor.warm()
+        self.app.record_history_snapshot()
+        sku = column(self.app.processor.process(), 'SKU')[0]
+
+        results = {}
+        first = {}
+        for name, url in self.ENDPOINTS:
+            url = url.format(sku=sku)
+            times = []
+            for _ in range(FLASK_REQUESTS):
+                start = time.perf_counter()
+                response = self.client.get(url)
+                times.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{url}: HTTP {response.status_code}")
+            # A primeira chamada (monta o payload) é uma amostra só: vai para info, sem comparação
+            first[f"flask_{name}_first"] = round(times[0], 6)
+            results[f"flask_{name}"] = statistics.median(times[1:])
+        return results, first
+
+
+def compare(results, baseline, tolerance):
+    """Imprime a comparação com o baseline; devolve as chaves que pioraram"""
+    regressions = []
+    print(f"\n{'medição':<48} {'baseline':>11} {'atual':>11} {'razão':>7}")
+    for key in sorted(set(results) & set(baseline)):
+        old, new = baseline[key], results[key]
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance and new - old > NOISE_FLOOR:
+            regressions.append(key)
+            flag = '  <-- pior'
+        print(f"{key:<48} {old:>11.6f} {new:>11.6f} {ratio:>7.2f}{flag}")
+    missing = set(baseline) - set(results)
+    if missing:
+        print(f"{len(missing)} medições do baseline não foram feitas nesta execução")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='tamanhos do catálogo, separados por vírgula (até 1000000)')
+    parser.add_argument('--formats', default='raw,standard')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--versions', type=int, default=8, help='versões na série de backups/histórico')
+    parser.add_argument('--skip-flask', action='store_true')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    formats = [fmt for fmt in args.formats.split(',') if fmt]
+    results = {}
+    info = {}
+
+    workdir = tempfile.mkdtemp(prefix='bench_suite_')
+    try:
+        flask = None if args.skip_flask else FlaskBench(workdir)
+        for size in sizes:
+            raw_rows = make_raw_rows(size)
+            for fmt in formats:
+                prefix = f"{fmt}.{size}"
+                casedir = os.path.join(workdir, prefix)
+                os.makedirs(casedir)
+                path = os.path.join(casedir, 'estoque.csv')
+                if fmt == 'raw':
+                    write_raw_csv(path, raw_rows)
+                else:
+                    write_standard_csv(path, size)
+
+                timings, products = bench_processing(path, casedir, args.repeat)
+                info[prefix] = {'products': products, 'bytes': os.path.getsize(path)}
+                if flask is not None:
+                    endpoints, first = flask.run(path)
+                    timings.update(endpoints)
+                    info[prefix].update(first)
+                for key, value in timings.items():
+                    results[f"{prefix}.{key}"] = value
+                print(f"{prefix:<18} cold {timings['process_cold']:.3f}s  warm {timings['process_warm'] * 1e6:.1f}µs"
+                      f"  snapshot {timings['process_snapshot']:.3f}s  dashboard {timings['get_dashboard_stats']:.4f}s")
+
+            for key, value in bench_rules(raw_rows, args.repeat).items():
+                results[f"rules.{size}.{key}"] = value
+
+            backups, backup_info = bench_backups(raw_rows, os.path.join(workdir, f"backups.{size}"),
+                                                 args.versions, args.repeat)
+            info[f"backups.{size}"] = backup_info
+            for key, value in backups.items():
+                results[f"backups.{size}.{key}"] = value
+            print(f"backups.{size:<10} snapshot {backups['backup_snapshot']:.3f}s  "
+                  f"restore {backups['backup_restore']:.3f}s  razão {backup_info['backup_ratio']:.3f}  "
+                  f"histórico {backups['history_lookup'] * 1000:.2f}ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+            'formats': formats,
+            'repeat': args.repeat
+        },
+        'info': info,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=1)
+    print(f"\nResultados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} medições pioraram mais que {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNenhuma regressão acima da tolerância.")
+
+
+if __name__ == '__main__':
+    main()
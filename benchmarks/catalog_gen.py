@@ -0,0 +1,124 @@
+"""Gera catálogos sintéticos (reprodutíveis, pela semente) nos dois formatos aceitos.
+
+- bruto: exportação do ERP, com linhas de relatório antes do cabeçalho
+  "Valor Custo", preços com vírgula, nomes abreviados e a coluna
+  "Departamento: ..." de onde sai a categoria;
+- padrão: CSV no formato WooCommerce (o mesmo que o sistema exporta).
+
+Também gera uma série de versões de um mesmo catálogo bruto (preços e estoques
+mudando entre uploads) para os benchmarks de backup e histórico.
+
+Uso: python benchmarks/catalog_gen.py --rows 100000 --format raw --output estoque.csv
+"""
+import argparse
+import csv
+import random
+
+# Nomes como vêm do ERP: abreviados e sem acento (o enriquecimento corrige)
+TIPOS_ERP = ['Racao', 'Racao Umida Sach', 'Areia Sanitaria', 'Shampoo', 'Coleira Nylon Pq', 'Aquario',
+             'Bebedouro Automatico Plastico', 'Petisco', 'Brinquedo Mordedor', 'Vermifugo', 'Antipulgas',
+             'Comedouro Inox', 'Semente Grama', 'Adubo', 'Filtro Externo', 'Mangueira Cb. Madeira']
+MARCAS_ERP = ['Royal Canin', 'Premier Pet', 'Golden', 'Pedigree', 'Whiskas', 'Bravecto', 'Sera', 'Tetra',
+              'Boyu', 'Vitalab', 'Guabi Natural', 'Pet Society', 'Nutropica', 'Pipicat', 'Tramontina', '']
+DETALHES_ERP = ['Ad', 'Fil', 'Cast', 'Frg', 'Carne', 'Salm', 'Cord', 'Lig', 'Rp', 'Rmg', 'Sen', 'Nat.',
+                'Prem', 'Mini', 'Acrilico', 'Azul', '']
+MEDIDAS = ['15kg', '10,1kg', '1kg', '2,5 Kg', '500g', '85g', '4 Lts', '500ml', '1,5 Mts', '']
+DEPARTAMENTOS = ['Racao Caes', 'Racao Gatos', 'Higiene', 'Acessorios', 'Medicamentos', 'Aquarismo',
+                 'Jardinagem', 'Ferramentas']
+
+# Formato padrão: nomes já tratados
+CATEGORIAS = ['Rações', 'Higiene', 'Acessórios', 'Medicamentos', 'Aquarismo', 'Jardinagem', 'Geral']
+
+RAW_HEADER = ['Ignorado', 'Valor Custo', 'SKU', 'Nome do Produto', 'Estoque', 'Unidade', 'Preco Venda',
+              'Custo Real', 'Departamento']
+STANDARD_HEADER = ['SKU', 'Name', 'Regular price', 'Categories', 'Meta: _marca', 'Stock',
+                   'Description', 'Short description', 'Weight (kg)', 'Meta: _custo']
+
+
+def _money(value):
+    return f"{value:.2f}".replace('.', ',')
+
+
+def make_raw_rows(count, seed=42):
+    """Produtos do ERP: [sku, nome, estoque, preço, custo, departamento]"""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(count):
+        name = ' '.join(part for part in (rnd.choice(TIPOS_ERP), rnd.choice(MARCAS_ERP),
+                                          rnd.choice(DETALHES_ERP), rnd.choice(MEDIDAS)) if part)
+        price = round(rnd.uniform(5, 600), 2)
+        rows.append([f"{i:07d}", name, rnd.randint(-3, 120), price, round(price * rnd.uniform(0.45, 0.8), 2),
+                     rnd.choice(DEPARTAMENTOS) if rnd.random() < 0.9 else ''])
+    return rows
+
+
+def write_raw_csv(path, rows):
+    """Grava as linhas como a exportação do ERP (preâmbulo, cabeçalho e vírgula decimal)"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write('Relatorio de Estoque\r\nEmpresa AquaFlora,,\r\n')
+        writer = csv.writer(f)
+        writer.writerow(RAW_HEADER)
+        for sku, name, stock, price, cost, department in rows:
+            writer.writerow(['x', '', sku, name, stock, 'UN', _money(price), _money(cost),
+                             f"Departamento: {department}" if department else ''])
+
+
+def write_standard_csv(path, count, seed=42):
+    """CSV no formato WooCommerce, com descrições HTML como as geradas pelo sistema"""
+    rnd = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(STANDARD_HEADER)
+        for i in range(count):
+            brand = rnd.choice(MARCAS_ERP)
+            name = ' '.join(part for part in (rnd.choice(TIPOS_ERP), brand, rnd.choice(DETALHES_ERP)) if part)
+            weight = rnd.choice(['15.000', '1.000', '0.500', '0.085', '4.000', ''])
+            price = rnd.uniform(5, 600)
+            category = rnd.choice(CATEGORIAS)
+            writer.writerow([
+                f"P{i:07d}", name, f"{price:.2f}", category, brand, rnd.randint(-3, 120),
+                f"<div class='product-description'><h2>{name}</h2><p>{name} da linha {category}.</p></div>",
+                f"{name} - {category}", weight, f"{price * rnd.uniform(0.45, 0.8):.2f}"
+            ])
+
+
+def make_versions(rows, versions, seed=42, changed=0.03, added=0.005):
+    """Versões sucessivas do catálogo, como uploads diários.
+
+    A cada versão uma fração dos produtos muda de preço/estoque e alguns
+    produtos novos entram no fim. Devolve uma lista de listas de linhas.
+    """
+    rnd = random.Random(seed)
+    current = [list(row) for row in rows]
+    series = [current]
+    next_sku = len(rows)
+    for _ in range(versions - 1):
+        current = [list(row) for row in current]
+        for row in rnd.sample(current, max(1, int(len(current) * changed))):
+            row[2] = rnd.randint(-3, 120)
+            row[3] = round(row[3] * rnd.uniform(0.9, 1.15), 2)
+        for extra in make_raw_rows(max(1, int(len(current) * added)), seed=rnd.randint(0, 10**6)):
+            extra[0] = f"{next_sku:07d}"
+            next_sku += 1
+            current.append(extra)
+        series.append(current)
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--format', choices=('raw', 'standard'), default='raw')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+
+    if args.format == 'raw':
+        write_raw_csv(args.output, make_raw_rows(args.rows, args.seed))
+    else:
+        write_standard_csv(args.output, args.rows, args.seed)
+    print(f"{args.rows:,} produtos ({args.format}) em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+import math
+from array import array
+
+from product_store import NUMERIC_FIELDS, column, numbers, row
+from search_index import SearchIndex
+
+
+class CatalogIndex:
+    """Índices de uma versão do catálogo para filtrar, ordenar e paginar.
+
+    Trabalha com posições na lista de produtos (já na ordem padrão: com
+    imagem primeiro, depois por nome). Cada combinação de filtros/ordenação é montada uma vez e
+    reaproveitada, então uma página custa O(tamanho da página).
+    """
+
+    # Campos usados em cada ordenação (em ordem de desempate)
+    SORT_KEYS = {
+        'name': ('Name',),
+        'sku': ('SKU',),
+        'price': ('Regular price',),
+        'stock': ('Stock',),
+        'category': ('Categories', 'Name'),
+    }
+    MAX_VIEWS = 256
+
+    def __init__(self, products, low_stock_threshold=3):
+        self.products = products
+        self.low_stock_threshold = low_stock_threshold
+
+        self._by_category = {}
+        self._by_sku = {}
+        self._low_stock = []
+        # Lê as colunas direto, sem montar um dict por produto
+        stocks = numbers(products, 'Stock')
+        for pos, (category, sku) in enumerate(zip(column(products, 'Categories'), column(products, 'SKU'))):
+            self._by_category.setdefault(category, []).append(pos)
+            self._by_sku.setdefault(str(sku).strip(), pos)
+            # Mesmo critério do front: estoque vazio conta como zero
+            if stocks[pos] <= low_stock_threshold:
+                self._low_stock.append(pos)
+
+        self._low_stock_set = set(self._low_stock)
+        self._replenishment = None
+        self._search = None
+        self._ranks = {}
+        self._views = {}
+
+    def categories(self):
+        return sorted(self._by_category)
+
+    def find_sku(self, sku, fields=None):
+        pos = self._by_sku.get(str(sku).strip())
+        return None if pos is None else row(self.products, pos, fields)
+
+    def _rank(self, sort):
+        """Posição de cada produto na ordenação pedida (permutação inversa)"""
+        rank = self._ranks.get(sort)
+        if rank is None:
+            columns = [numbers(self.products, field) if field in NUMERIC_FIELDS else column(self.products, field)
+                       for field in self.SORT_KEYS[sort]]
+            if len(columns) == 1:
+                key = columns[0].__getitem__
+            else:
+                key = lambda pos: tuple(values[pos] for values in columns)
+            order = sorted(range(len(self.products)), key=key)
+            rank = [0] * len(order)
+            for position, pos in enumerate(order):
+                rank[pos] = position
+            self._ranks[sort] = rank
+        return rank
+
+    def warm(self):
+        """Monta de antemão o índice de busca e todas as ordenações"""
+        self.search_index()
+        for sort in self.SORT_KEYS:
+            self._rank(sort)
+        self.replenishment()
+
+    def __getstate__(self):
+        # Gravado junto do snapshot: sem o catálogo (religado ao carregar) nem as consultas em cache
+        state = self.__dict__.copy()
+        state['products'] = None
+        state['_views'] = {}
+        state['_ranks'] = {sort: array('i', rank) for sort, rank in self._ranks.items()}
+        return state
+
+    def replenishment(self):
+        """Posições com estoque baixo, por categoria e nome (relatório de reposição)"""
+        if self._replenishment is None:
+            self._replenishment = array('i', sorted(self._low_stock, key=self._rank('category').__getitem__))
+        return self._replenishment
+
+    def search_index(self):
+        # Índice invertido montado na primeira busca desta versão
+        if self._search is None:
+            self._search = SearchIndex(self.products)
+        return self._search
+
+    def search_positions(self, text):
+        """Produtos que casam com todos os termos (nome, SKU, marca, categoria), por relevância"""
+        return self.search_index().search(text)
+
+    def _view(self, category, low_stock, search, sort, descending):
+        view_key = (category, low_stock, search, sort, descending)
+        positions = self._views.get(view_key)
+        if positions is not None:
+            return positions
+
+        if search:
+            positions = self.search_positions(search)
+            if category:
+                in_category = set(self._by_category.get(category, []))
+                positions = [pos for pos in positions if pos in in_category]
+            if low_stock:
+                positions = [pos for pos in positions if pos in self._low_stock_set]
+        elif category:
+            positions = self._by_category.get(category, [])
+            if low_stock:
+                positions = [pos for pos in positions if pos in self._low_stock_set]
+        else:
+            positions = self._low_stock if low_stock else range(len(self.products))
+
+        positions = list(positions)
+        if sort:
+            positions.sort(key=self._rank(sort).__getitem__)
+        if descending:
+            positions.reverse()
+
+        if len(self._views) >= self.MAX_VIEWS:
+            self._views.clear()
+        self._views[view_key] = positions
+        return positions
+
+    def query(self, category='', low_stock=False, search='', sort='', page=1, page_size=24, fields=None):
+        descending = sort.startswith('-')
+        sort = sort.lstrip('-')
+        if sort and sort not in self.SORT_KEYS:
+            sort = ''
+
+        positions = self._view(category or '', bool(low_stock), (search or '').strip().lower(), sort, descending)
+        total = len(positions)
+        page_size = max(1, page_size)
+        pages = max(1, math.ceil(total / page_size))
+        page = min(max(1, page), pages)
+        start = (page - 1) * page_size
+
+        return {
+            'items': [row(self.products, pos, fields) for pos in positions[start:start + page_size]],
+            'total': total,
+            'page': page,
+            'pages': pages,
+            'page_size': page_size
+        }
@@ -0,0 +1,94 @@
+import numpy as np
+
+from product_store import column, numbers
+
+
+class CatalogStats:
+    """Colunas numéricas (estoque, preço, custo) de uma versão do catálogo.
+
+    Montadas uma vez por versão; as estatísticas da listagem e do dashboard
+    são calculadas de forma vetorizada na primeira chamada e reaproveitadas.
+    """
+
+    def __init__(self, products, low_stock_threshold=3):
+        count = len(products)
+        self.count = count
+        self.low_stock_threshold = low_stock_threshold
+
+        self.stock = np.asarray(numbers(products, 'Stock'), dtype=np.float64)
+        self.price = np.asarray(numbers(products, 'Regular price'), dtype=np.float64)
+        self.cost = np.asarray(numbers(products, 'Meta: _custo'), dtype=np.float64)
+
+        # Categorias como códigos inteiros, na ordem em que aparecem
+        codes = {}
+        self.category_codes = np.fromiter(
+            (codes.setdefault(category, len(codes)) for category in column(products, 'Categories')),
+            dtype=np.int64, count=count
+        )
+        self.category_names = list(codes)
+
+        self._summary = None
+        self._dashboard = None
+
+    def summary(self):
+        """Resumo usado em /api/produtos"""
+        if self._summary is None:
+            if not self.count:
+                self._summary = {'total': 0, 'in_stock': 0, 'out_of_stock': 0, 'categories': []}
+            else:
+                in_stock = int(np.count_nonzero(self.stock > 0))
+                self._summary = {
+                    'total': self.count,
+                    'in_stock': in_stock,
+                    'out_of_stock': self.count - in_stock,
+                    'categories': sorted(self.category_names)
+                }
+        return self._summary
+
+    def _by_category(self, values):
+        return np.bincount(self.category_codes, weights=values, minlength=len(self.category_names))
+
+    def dashboard(self):
+        """Métricas do dashboard gerencial"""
+        if self._dashboard is not None:
+            return self._dashboard
+        if not self.count:
+            self._dashboard = {}
+            return self._dashboard
+
+        stock = self.stock
+        low_mask = (stock > 0) & (stock <= self.low_stock_threshold)
+        positive_stock = np.clip(stock, 0, None)
+
+        # Top Categorias (empate: a que aparece primeiro)
+        counts = np.bincount(self.category_codes, minlength=len(self.category_names))
+        top = sorted(range(len(counts)), key=lambda code: (-counts[code], code))[:5]
+
+        # Margem por categoria sobre o estoque disponível
+        value_by_cat = self._by_category(positive_stock * self.price)
+        cost_by_cat = self._by_category(positive_stock * self.cost)
+        low_by_cat = np.bincount(self.category_codes[low_mask], minlength=len(self.category_names))
+
+        margin_by_category = {}
+        for code, name in enumerate(self.category_names):
+            value = float(value_by_cat[code])
+            margin_by_category[name] = {
+                'value': round(value, 2),
+                'cost_value': round(float(cost_by_cat[code]), 2),
+                'margin_pct': round((value - float(cost_by_cat[code])) / value * 100, 2) if value else 0.0
+            }
+
+        self._dashboard = {
+            'total_items': self.count,
+            'total_stock_count': int(stock.sum()),
+            'total_value': float((stock * self.price).sum()),
+            'total_cost_value': float((stock * self.cost).sum()),
+            'low_stock': int(np.count_nonzero(low_mask)),
+            'out_of_stock': int(np.count_nonzero(stock <= 0)),
+            'top_categories': {self.category_names[code]: int(counts[code]) for code in top},
+            'margin_by_category': margin_by_category,
+            'low_stock_by_category': {
+                self.category_names[code]: int(n) for code, n in enumerate(low_by_cat) if n
+            }
+        }
+        return self._dashboard
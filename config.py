@@ -14,10 +14,62 @@ class Config:
     # Mapeando para a pasta static/images como solicitado
     IMAGES_FOLDER = os.path.join(BASE_DIR, 'static', 'images')
     
+    # Miniaturas (grid/detalhe) geradas em segundo plano após cada upload
+    THUMBNAIL_WORKERS = int(os.environ.get('THUMBNAIL_WORKERS', 2))
+    THUMBNAIL_QUEUE_SIZE = int(os.environ.get('THUMBNAIL_QUEUE_SIZE', 64))
+    
     # Caminho do arquivo de dados
     DATA_FILE = os.path.join(UPLOAD_FOLDER, 'estoque_atual.csv')
 
+    # Backups dos CSVs enviados: keyframe completo a cada N snapshots (os demais são deltas),
+    # mantendo os últimos BACKUP_KEEP_LAST e um por dia nos últimos BACKUP_KEEP_DAYS dias
+    BACKUP_FOLDER = os.path.join(BASE_DIR, 'backups')
+    BACKUP_KEYFRAME_INTERVAL = int(os.environ.get('BACKUP_KEYFRAME_INTERVAL', 10))
+    BACKUP_KEEP_LAST = int(os.environ.get('BACKUP_KEEP_LAST', 50))
+    BACKUP_KEEP_DAYS = int(os.environ.get('BACKUP_KEEP_DAYS', 90))
+
+    # Catálogo processado (colunas mapeadas em memória), compartilhado entre workers;
+    # SHARED_SNAPSHOTS=0 volta a processar o CSV em cada processo
+    SNAPSHOT_FOLDER = (os.path.join(BASE_DIR, 'snapshots')
+                       if os.environ.get('SHARED_SNAPSHOTS', '1').lower() in ('1', 'true', 'yes') else None)
+
+    # production_server.py (e python app.py) monta catálogo e índices antes de atender
+    WARM_ON_START = os.environ.get('WARM_ON_START', '1').lower() in ('1', 'true', 'yes')
+
+    # Histórico de preço/estoque/custo (SQLite, alimentado a cada upload)
+    HISTORY_DB = os.path.join(BASE_DIR, 'historico.db')
+
+    # Processamento
+    # Máximo de linhas enriquecidas mantidas em memória entre reprocessamentos
+    ROW_MEMO_SIZE = int(os.environ.get('ROW_MEMO_SIZE', 100000))
+    # Descrições HTML geradas sob demanda e mantidas em memória
+    DESCRIPTION_MEMO_SIZE = int(os.environ.get('DESCRIPTION_MEMO_SIZE', 20000))
+
+    # Enriquecimento paralelo de exportações grandes (desligado por padrão)
+    PARALLEL_ENRICHMENT = os.environ.get('PARALLEL_ENRICHMENT', '0').lower() in ('1', 'true', 'yes')
+    PARALLEL_WORKERS = int(os.environ.get('PARALLEL_WORKERS', os.cpu_count() or 1))
+    PARALLEL_CHUNK_SIZE = int(os.environ.get('PARALLEL_CHUNK_SIZE', 2000))
+    # Abaixo disso o custo de subir os processos não compensa
+    PARALLEL_MIN_ROWS = int(os.environ.get('PARALLEL_MIN_ROWS', 10000))
+
+    # Respostas JSON serializadas mantidas em memória (por versão e parâmetros)
+    PAYLOAD_CACHE_SIZE = int(os.environ.get('PAYLOAD_CACHE_SIZE', 128))
+
+    # Maior página aceita em /api/produtos
+    MAX_PAGE_SIZE = 200
+
+    # Estoque até esse valor (inclusive) conta como baixo: filtro, dashboard e relatório de reposição
+    LOW_STOCK_THRESHOLD = int(os.environ.get('LOW_STOCK_THRESHOLD', 3))
+
     # Segurança
     SECRET_KEY = os.environ.get('SECRET_KEY', 'chave-secreta-padrao-dev')
     # Tenta pegar a senha do ambiente, se não tiver, usa a padrão
     ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin')
+    # Token (Authorization: Bearer ...) para o Prometheus ler /api/metrics sem login;
+    # vazio = só com a sessão do admin
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+    # Perfis (cProfile) de requisições, ligados pelo admin em /api/profiling:
+    # quantos ficam em memória e a maior fração amostrada aceita
+    PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 20))
+    PROFILE_MAX_SAMPLE_RATE = float(os.environ.get('PROFILE_MAX_SAMPLE_RATE', 0.25))
@@ -0,0 +1,131 @@
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    content_hash TEXT UNIQUE,
+    rows INTEGER NOT NULL DEFAULT 0,
+    changed INTEGER NOT NULL DEFAULT 0
+);
+-- Um registro por SKU sempre que preço, estoque ou custo mudam
+CREATE TABLE IF NOT EXISTS history (
+    sku TEXT NOT NULL,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+    price REAL NOT NULL,
+    stock REAL NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (sku, snapshot_id)
+) WITHOUT ROWID;
+-- Último valor conhecido de cada SKU (para detectar mudanças no próximo upload)
+CREATE TABLE IF NOT EXISTS latest (
+    sku TEXT PRIMARY KEY,
+    price REAL NOT NULL,
+    stock REAL NOT NULL,
+    cost REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def file_hash(path):
+    """blake2b do conteúdo do arquivo (identifica uploads repetidos)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class HistoryStore:
+    """Histórico de preço, estoque e custo por SKU, em SQLite.
+
+    Cada upload vira um snapshot; só as linhas que mudaram em relação ao
+    snapshot anterior são gravadas, e nada é reescrito depois. A consulta de um
+    SKU é uma busca pela chave primária (sku, snapshot).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # Uma conexão por operação (o servidor atende em várias threads); commit ao sair
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_snapshot(self, skus, prices, stocks, costs, taken_at=None, source='', content_hash=None):
+        """Grava um snapshot do catálogo; devolve o id, ou None se o conteúdo já foi gravado"""
+        taken_at = taken_at or datetime.datetime.now()
+        with self._write_lock, self._connect() as conn:
+            if content_hash and conn.execute('SELECT 1 FROM snapshots WHERE content_hash = ?',
+                                             (content_hash,)).fetchone():
+                return None
+
+            latest = {sku: (price, stock, cost) for sku, price, stock, cost
+                      in conn.execute('SELECT sku, price, stock, cost FROM latest')}
+            changed = []
+            seen = set()
+            for sku, price, stock, cost in zip(skus, prices, stocks, costs):
+                sku = str(sku).strip()
+                if not sku or sku in seen:
+                    continue
+                seen.add(sku)
+                values = (float(price), float(stock), float(cost))
+                if latest.get(sku) != values:
+                    changed.append((sku,) + values)
+
+            cursor = conn.execute(
+                'INSERT INTO snapshots (taken_at, source, content_hash, rows, changed) VALUES (?, ?, ?, ?, ?)',
+                (taken_at.isoformat(timespec='seconds'), source, content_hash, len(seen), len(changed))
+            )
+            snapshot_id = cursor.lastrowid
+            conn.executemany('INSERT INTO history (sku, snapshot_id, price, stock, cost) VALUES (?, ?, ?, ?, ?)',
+                             [(sku, snapshot_id, price, stock, cost) for sku, price, stock, cost in changed])
+            conn.executemany('INSERT OR REPLACE INTO latest (sku, price, stock, cost) VALUES (?, ?, ?, ?)', changed)
+            return snapshot_id
+
+    def history(self, sku, limit=None):
+        """Mudanças de preço/estoque/custo do SKU, da mais antiga para a mais nova"""
+        query = ('SELECT s.taken_at, h.price, h.stock, h.cost FROM history h '
+                 'JOIN snapshots s ON s.id = h.snapshot_id WHERE h.sku = ? ORDER BY h.snapshot_id DESC')
+        params = [str(sku).strip()]
+        if limit:
+            query += ' LIMIT ?'
+            params.append(int(limit))
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        history = []
+        for taken_at, price, stock, cost in reversed(rows):
+            date = datetime.datetime.fromisoformat(taken_at)
+            history.append({
+                'date': date.strftime("%d/%m/%Y"),
+                'timestamp': taken_at,
+                'price': price,
+                'stock': stock,
+                'cost': cost
+            })
+        return history
+
+    def stats(self):
+        with self._connect() as conn:
+            snapshots, last = conn.execute('SELECT COUNT(*), MAX(taken_at) FROM snapshots').fetchone()
+            entries = conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+        return {'snapshots': snapshots, 'entries': entries, 'last_snapshot': last}
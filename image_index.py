@@ -0,0 +1,96 @@
+import os
+import threading
+from array import array
+
+
+def image_version(path):
+    """Versão de uma imagem: mtime em milissegundos (0 = não existe)"""
+    try:
+        return max(1, os.stat(path).st_mtime_ns // 1_000_000)
+    except OSError:
+        return 0
+
+
+class ImageIndex:
+    """Quais SKUs têm imagem (SKU.jpg) na pasta de imagens, e a versão de cada uma.
+
+    A pasta é lida com um único os.scandir e relida só quando o mtime do
+    diretório muda. Uploads feitos pela aplicação atualizam o índice na hora.
+    `version` muda sempre que o conjunto de imagens (ou alguma delas) muda.
+    """
+
+    def __init__(self, folder, extension='.jpg'):
+        self.folder = folder
+        self.extension = extension
+        self.version = 0
+        self._images = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _key(self, sku):
+        # normcase: no Windows o nome do arquivo não diferencia maiúsculas
+        return os.path.normcase(f"{str(sku).strip()}{self.extension}")
+
+    def _scan(self):
+        images = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    name = os.path.normcase(entry.name)
+                    if name.endswith(self.extension):
+                        try:
+                            images[name] = max(1, entry.stat().st_mtime_ns // 1_000_000)
+                        except OSError:
+                            continue
+        except OSError:
+            pass
+        return images
+
+    def refresh(self):
+        """Relê a pasta se ela mudou desde a última leitura; devolve a versão"""
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime and self._mtime is not None:
+            return self.version
+
+        with self._lock:
+            if mtime != self._mtime or mtime is None:
+                images = self._scan()
+                if images != self._images:
+                    self._images = images
+                    self.version += 1
+                self._mtime = mtime
+        return self.version
+
+    def add(self, sku):
+        """Registra a imagem recém-salva sem esperar a próxima leitura da pasta"""
+        with self._lock:
+            key = self._key(sku)
+            version = image_version(os.path.join(self.folder, f"{str(sku).strip()}{self.extension}"))
+            if version and self._images.get(key) != version:
+                self._images = {**self._images, key: version}
+                self.version += 1
+            return version
+
+    def has(self, sku):
+        return self._key(sku) in self._images
+
+    def image_version(self, sku):
+        return self._images.get(self._key(sku), 0)
+
+    def versions(self, skus):
+        """array com a versão da imagem de cada SKU (0 = sem imagem)"""
+        images = self._images
+        if not images:
+            return array('q', bytes(8 * len(skus)))
+        # Nome sem extensão -> versão: um get por SKU, sem montar o nome do arquivo
+        cut = len(self.extension)
+        stems = {name[:-cut]: version for name, version in images.items()}
+        if os.path.normcase('A') == 'A':
+            return array('q', (stems.get(sku.strip(), 0) for sku in map(str, skus)))
+        return array('q', (stems.get(os.path.normcase(sku.strip()), 0) for sku in map(str, skus)))
+
+    def __len__(self):
+        return len(self._images)
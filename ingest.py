@@ -0,0 +1,195 @@
+import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_ID = re.compile(r'[0-9a-f]{12}')
+
+
+class IngestJob:
+    """Estado de um upload sendo processado em segundo plano"""
+
+    def __init__(self, filename):
+        self.id = uuid.uuid4().hex[:12]
+        self.filename = filename
+        self.state = 'queued'
+        self.message = 'Aguardando processamento'
+        self.rows = 0
+        self.created_at = datetime.datetime.now()
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'state': self.state,
+            'message': self.message,
+            'rows': self.rows,
+            'done': self.state in ('done', 'error'),
+            'created_at': self.created_at.isoformat(timespec='seconds'),
+            'finished_at': self.finished_at.isoformat(timespec='seconds') if self.finished_at else None
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        job = cls(data['filename'])
+        job.id = data['id']
+        job.state = data['state']
+        job.message = data['message']
+        job.rows = data['rows']
+        job.created_at = datetime.datetime.fromisoformat(data['created_at'])
+        job.finished_at = datetime.datetime.fromisoformat(data['finished_at']) if data['finished_at'] else None
+        return job
+
+
+class UploadIngestor:
+    """Processa uploads de estoque em um worker, um de cada vez.
+
+    O arquivo enviado (já salvo em um temporário e validado) é lido e
+    enriquecido fora da requisição; enquanto isso o catálogo anterior continua
+    sendo servido. Quando termina, o arquivo entra no lugar do atual com
+    os.replace e o catálogo novo é trocado de uma vez (StockProcessor.swap).
+
+    Com `status_folder`, o estado de cada job também é gravado ali em JSON
+    (escrita atômica) a cada mudança: com vários workers, a consulta do status
+    pode chegar a um processo que não recebeu o upload.
+    """
+
+    MAX_JOBS = 20
+
+    def __init__(self, processor, before_swap=None, after_swap=None, status_folder=None):
+        self.processor = processor
+        self.before_swap = before_swap
+        self.after_swap = after_swap
+        self.status_folder = status_folder
+        if status_folder:
+            os.makedirs(status_folder, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ingest')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, path, filename=''):
+        job = IngestJob(filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.MAX_JOBS:
+                self._jobs.popitem(last=False)
+        self._publish(job)
+        self._prune_status()
+        self._executor.submit(self._run, job, path)
+        return job
+
+    def get(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None and self.status_folder and JOB_ID.fullmatch(job_id or ''):
+            job = self._read_status(os.path.join(self.status_folder, f"{job_id}.json"))
+        return job
+
+    def latest(self):
+        if self.status_folder:
+            jobs = [job for job in map(self._read_status, self._status_files()) if job is not None]
+            if jobs:
+                # O mais recente a ser criado (em empate, o atualizado por último)
+                return sorted(jobs, key=lambda job: job.created_at)[-1]
+        with self._lock:
+            return next(reversed(self._jobs.values()), None)
+
+    # Estado compartilhado entre processos ------------------------------------
+
+    def _status_files(self):
+        """Arquivos de status, do mais antigo para o mais novo"""
+        try:
+            entries = [entry for entry in os.scandir(self.status_folder)
+                       if entry.name.endswith('.json') and JOB_ID.fullmatch(entry.name[:-5])]
+        except OSError:
+            return []
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        return [entry.path for entry in entries]
+
+    def _read_status(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return IngestJob.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Erro ao ler o status do processamento {os.path.basename(path)}: {e}")
+            return None
+
+    def _publish(self, job):
+        if not self.status_folder:
+            return
+        path = os.path.join(self.status_folder, f"{job.id}.json")
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.status_folder, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job.to_dict(), f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Erro ao gravar o status do processamento {job.id}: {e}")
+
+    def _prune_status(self):
+        if not self.status_folder:
+            return
+        for path in self._status_files()[:-self.MAX_JOBS]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _set(self, job, state, message=None):
+        job.state = state
+        if message is not None:
+            job.message = message
+        self._publish(job)
+
+    def _progress(self, job):
+        def report(rows):
+            job.rows = rows
+            job.message = f'{rows} produtos processados'
+            self._publish(job)
+        return report
+
+    def _hook(self, hook, stage):
+        # Backup/histórico não impedem a atualização do estoque
+        if hook is None:
+            return
+        try:
+            hook()
+        except Exception as e:
+            print(f"Erro no processamento {stage}: {e}")
+
+    def _run(self, job, path):
+        try:
+            self._set(job, 'processing', 'Processando arquivo')
+            data = self.processor.load(path, progress=self._progress(job))
+            if not len(data):
+                raise ValueError('Nenhum produto encontrado no arquivo')
+            job.rows = len(data)
+
+            self._set(job, 'swapping', 'Atualizando o estoque')
+            self._hook(self.before_swap, 'antes da troca')
+            self.processor.swap(path, data)
+
+            # Índice e estatísticas prontos antes do primeiro acesso
+            self._set(job, 'warming')
+            self.processor.warm()
+            self._hook(self.after_swap, 'depois da troca')
+
+            job.state = 'done'
+            job.message = f'Estoque atualizado: {job.rows} produtos'
+        except Exception as e:
+            print(f"Erro ao processar upload {job.filename}: {e}")
+            job.state = 'error'
+            job.message = str(e)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        finally:
+            job.finished_at = datetime.datetime.now()
+            self._publish(job)
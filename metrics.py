@@ -0,0 +1,213 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Limites (segundos) dos histogramas de tempo: de 1 ms a 1 min
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Tamanho de respostas (bytes): de 1 KB a 50 MB
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 52428800)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        # Cada amostra cai em um balde só; o acumulado (le=...) é montado na exportação
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class _Metric:
+    """Métrica com rótulos; labels(*valores) devolve a série (criada no primeiro uso)"""
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def render(self):
+        lines = self._header()
+        for values, child in sorted(self._children.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self, *values):
+        return self.labels(*values).time()
+
+    def render(self):
+        lines = self._header()
+        for values, child in sorted(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket in zip(self.bounds + (float('inf'),), counts):
+                cumulative += bucket
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, values, [('le', _number(float(bound)))])}"
+                             f" {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, values)} {count}")
+        return lines
+
+
+class Collected(_Metric):
+    """Valores lidos só na exportação (contadores que já existem em outros objetos).
+
+    collect() devolve {tupla de rótulos: valor}; nada é feito no caminho quente.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), collect=None, kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self):
+        try:
+            samples = self.collect()
+        except Exception as e:
+            print(f"Erro ao coletar a métrica {self.name}: {e}")
+            return []
+        lines = self._header()
+        for values, value in sorted(samples.items()):
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_labels(self.labelnames, values)} {_number(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            # Reimportar um módulo não duplica a métrica
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        """Todas as métricas no formato de texto do Prometheus (0.0.4)"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def collected(name, documentation, labelnames=(), collect=None, kind='gauge'):
+    return REGISTRY.register(Collected(name, documentation, labelnames, collect, kind))
+
+
+# Etapas do processamento (leitura, enriquecimento, índices, serialização...)
+STAGE_SECONDS = histogram('estoque_stage_seconds', 'Tempo de cada etapa do processamento do catálogo', ('stage',))
+# Passos do enriquecimento, estimados por amostragem de linhas (ver processor.ENRICH_SAMPLE_RATE)
+ENRICH_SECONDS = counter('estoque_enrich_seconds_total', 'Tempo estimado por passo do enriquecimento', ('step',))
+ROWS = counter('estoque_rows_total', 'Linhas lidas dos CSVs de estoque', ('format',))
+
+
+def stage(name):
+    """Cronômetro de uma etapa: with stage('parse'): ..."""
+    return STAGE_SECONDS.time(name)
@@ -0,0 +1,200 @@
+import re
+import heapq
+from collections import deque
+
+# Tokens na mesma definição de palavra usada pelo \b das regras
+TOKEN_RE = re.compile(r'\w+')
+
+# Caracteres que o re.IGNORECASE considera iguais a letras ASCII, mas que o
+# str.lower() não converte para a mesma letra (ex: 'ſ' casa com 's')
+_FOLD_TABLE = str.maketrans({'\u0130': 'i', '\u0131': 'i', '\u017f': 's'})
+
+
+def token_key(token):
+    return token.translate(_FOLD_TABLE).lower()
+
+
+class TextNormalizer:
+    """Aplica a tabela de substituições em uma passada.
+
+    Toda regra começa com \\b seguido de uma palavra, então uma regra só pode
+    casar se a primeira palavra dela existir como token no texto. O texto é
+    tokenizado uma vez e apenas as regras candidatas são executadas, na mesma
+    ordem da tabela, o que mantém o resultado idêntico ao loop com re.sub.
+    """
+
+    def __init__(self, replacements):
+        self.rules = list(replacements.items())
+        # Compiladas aqui, uma vez: nenhuma leitura paga a compilação no meio
+        self._compiled = [re.compile(pattern, re.IGNORECASE) for pattern, _ in self.rules]
+
+        # Primeira palavra da regra -> índices das regras (em ordem)
+        self._by_first_word = {}
+        for index, (pattern, _) in enumerate(self.rules):
+            match = re.match(r'\\b(\w+)', pattern)
+            if not match:
+                raise ValueError(f"Regra sem palavra inicial: {pattern}")
+            key = token_key(match.group(1))
+            self._by_first_word.setdefault(key, []).append(index)
+
+    def _candidates(self, text, after=-1):
+        found = set()
+        for token in TOKEN_RE.findall(text):
+            indexes = self._by_first_word.get(token_key(token))
+            if indexes:
+                found.update(i for i in indexes if i > after)
+        return found
+
+    def normalize(self, text):
+        pending = list(self._candidates(text))
+        heapq.heapify(pending)
+        seen = set(pending)
+
+        while pending:
+            index = heapq.heappop(pending)
+            new_text = self._compiled[index].sub(self.rules[index][1], text)
+            if new_text == text:
+                continue
+            text = new_text
+            # A substituição pode criar palavras que disparam regras posteriores
+            for candidate in self._candidates(text, after=index):
+                if candidate not in seen:
+                    seen.add(candidate)
+                    heapq.heappush(pending, candidate)
+
+        return text
+
+
+def _is_word(char):
+    # Mesma definição de \w do módulo re para str
+    return char.isalnum() or char == '_'
+
+
+class BrandMatcher:
+    """Autômato Aho-Corasick sobre as chaves de marcas_conhecidas.
+
+    Uma varredura do nome encontra todas as ocorrências de todas as chaves.
+    A prioridade continua a mesma do loop original: primeiro a chave mais
+    antiga no dicionário que casa com limites de palavra; se nenhuma casar,
+    a mais antiga que aparece como substring e tem mais de 3 caracteres.
+    """
+
+    def __init__(self, brands):
+        self.keys = list(brands.keys())
+        self.values = list(brands.values())
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, key in enumerate(self.keys):
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append(index)
+
+        # Links de falha em largura (BFS)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def find(self, text):
+        goto, fail, out, keys = self._goto, self._fail, self._out, self.keys
+        best_boundary = None
+        best_relaxed = None
+        length = len(text)
+        state = 0
+
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for index in out[state]:
+                key = keys[index]
+                if best_boundary is None or index < best_boundary:
+                    start = end - len(key) + 1
+                    before = start > 0 and _is_word(text[start - 1])
+                    after = end + 1 < length and _is_word(text[end + 1])
+                    if before != _is_word(key[0]) and after != _is_word(key[-1]):
+                        best_boundary = index
+                if len(key) > 3 and (best_relaxed is None or index < best_relaxed):
+                    best_relaxed = index
+
+        if best_boundary is not None:
+            return self.values[best_boundary]
+        if best_relaxed is not None:
+            return self.values[best_relaxed]
+        return None
+
+
+# Padrões de peso (Ported from JS), na ordem de prioridade
+WEIGHT_PATTERNS = [
+    r'(\d+(?:[,\.]\d+)?)\s*kg',
+    r'(\d+(?:[,\.]\d+)?)\s*k\b',
+    r'(\d+)\s*quilos?',
+    r'(\d+(?:[,\.]\d+)?)\s*g(?!\w)',
+    r'(\d+(?:[,\.]\d+)?)\s*gramas?',
+    r'(\d+(?:[,\.]\d+)?)\s*ml',
+    r'(\d+(?:[,\.]\d+)?)\s*litros?',
+    r'(\d+(?:[,\.]\d+)?)\s*l(?!\w)'
+]
+
+# Todo padrão termina em "dígito, espaços, unidade". Uma única varredura acha
+# quais unidades aparecem logo após um número; as alternativas são mutuamente
+# exclusivas na mesma posição, então nenhum padrão candidato fica de fora.
+_UNIT_SCAN = re.compile(
+    r'\d\s*(?:(?P<p0>kg)|(?P<p1>k\b)|(?P<p2>quilo)|(?P<p3>g(?!\w))|(?P<p4>grama)'
+    r'|(?P<p5>ml)|(?P<p6>litro)|(?P<p7>l(?!\w)))',
+    re.IGNORECASE
+)
+
+
+class WeightExtractor:
+    """Extrai peso/volume (em kg) com uma varredura de unidades.
+
+    Só os padrões cujas unidades aparecem no nome são executados, na ordem
+    original, mantendo a regra de faixa (0.001 < kg <= 50) e o fallback para o
+    próximo padrão.
+    """
+
+    def __init__(self, patterns=WEIGHT_PATTERNS):
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        # Conversão para kg: gramas e ml dividem por 1000
+        self.divisors = [
+            1000 if ('g' in p and 'kg' not in p) or 'ml' in p else 1
+            for p in patterns
+        ]
+
+    def extract(self, name):
+        candidates = set()
+        for match in _UNIT_SCAN.finditer(name):
+            candidates.add(int(match.lastgroup[1:]))
+        if not candidates:
+            return None
+
+        for index in sorted(candidates):
+            match = self.patterns[index].search(name)
+            if not match:
+                continue
+            try:
+                val = float(match.group(1).replace(',', '.')) / self.divisors[index]
+            except ValueError:
+                continue
+            if 0.001 < val <= 50:
+                return f"{val:.3f}"
+        return None
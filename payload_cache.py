@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import threading
+
+from cache import LRUCache
+from metrics import stage
+
+
+class Payload:
+    """Corpo JSON já serializado, com ETag e versão gzip"""
+
+    __slots__ = ('body', 'gzipped', 'etag')
+
+    def __init__(self, body, gzipped, etag):
+        self.body = body
+        self.gzipped = gzipped
+        self.etag = etag
+
+
+class PayloadCache:
+    """Respostas serializadas e comprimidas por versão dos dados.
+
+    Guarda só a versão atual do catálogo: quando a versão muda, os bytes antigos
+    são descartados. O ETag é o hash do corpo, igual entre processos e
+    reinícios enquanto o conteúdo não mudar.
+
+    As versões são crescentes: uma requisição que ainda monta a resposta de
+    uma versão anterior recebe o payload, mas ele não entra no cache nem
+    descarta o da versão nova.
+    """
+
+    def __init__(self, dumps, maxsize=128, compress_level=6, min_compress_size=1024):
+        self.dumps = dumps
+        self.compress_level = compress_level
+        self.min_compress_size = min_compress_size
+        self._payloads = LRUCache(maxsize)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        """Payload da chave nesta versão; build() só roda (e é serializado) na primeira vez"""
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._payloads.clear()
+                self._version = version
+            payload = self._payloads.get(key) if version == self._version else None
+        if payload is None:
+            with stage('payload_build'):
+                data = build()
+            with stage('serialize'):
+                body = self.dumps(data).encode('utf-8')
+            gzipped = None
+            if len(body) >= self.min_compress_size:
+                with stage('gzip'):
+                    gzipped = gzip.compress(body, compresslevel=self.compress_level, mtime=0)
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            payload = Payload(body, gzipped, etag)
+            with self._lock:
+                # A versão pode ter mudado enquanto o payload era montado
+                if version == self._version:
+                    self._payloads.put(key, payload)
+        return payload
+
+    def clear(self):
+        with self._lock:
+            self._payloads.clear()
+
+    def stats(self):
+        return self._payloads.stats()
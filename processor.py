@@ -1,458 +1,956 @@
-import pandas as pd
 import os
 import json
 import csv
-import re
-import glob
-import datetime
+import hashlib
+import itertools
+import codecs
+import functools
+import importlib.util
+import math
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from cache import LRUCache
+from catalog_index import CatalogIndex
+from catalog_stats import CatalogStats
+from normalizer import TextNormalizer, BrandMatcher, WeightExtractor
+from image_index import ImageIndex
+from product_store import ProductStore, ProductStoreBuilder
+from snapshot_store import SnapshotStore
+from metrics import ENRICH_SECONDS, ROWS, STAGE_SECONDS, stage
+
+# Bytes lidos do início do arquivo para detectar encoding/separador/formato
+DIALECT_SAMPLE_SIZE = 64 * 1024
+
+# Versão das regras de enriquecimento (nome, marca, peso, categorias): incremente ao
+# mudar o código de enriquecimento para invalidar os catálogos gravados em disco
+RULES_VERSION = 1
+
+# A cada quantas linhas o progresso da leitura é informado
+PROGRESS_INTERVAL = 1000
+
+# Engines do pandas para o CSV padrão, da mais rápida para a mais tolerante
+# (só verifica se o pyarrow existe: importar fica para a primeira leitura)
+if importlib.util.find_spec('pyarrow') is not None:
+    CSV_ENGINES = ('pyarrow', 'c', 'python')
+else:
+    CSV_ENGINES = ('c', 'python')
+
+# Uma a cada N linhas enriquecidas é cronometrada por passo (o tempo entra
+# multiplicado por N); cronometrar todas custava ~10% da leitura
+ENRICH_SAMPLE_RATE = 64
+_enrich_ticks = itertools.count()
+# Séries das métricas usadas no enriquecimento (evita procurar o rótulo no caminho quente)
+_FIX_TEXT_SECONDS = ENRICH_SECONDS.labels('fix_text')
+_BRAND_SECONDS = ENRICH_SECONDS.labels('detect_brand')
+_WEIGHT_SECONDS = ENRICH_SECONDS.labels('extract_weight')
+
+# Marcas Conhecidas (Ported from JS)
+MARCAS_CONHECIDAS = {
+    'royal canin': 'Royal Canin', 'royalcanin': 'Royal Canin', 'premier': 'Premier', 
+    'premier pet': 'Premier Pet', 'golden': 'Golden', 'golden formula': 'Golden Formula',
+    'farmina': 'Farmina', 'farmina n&d': 'Farmina N&D', 'origen': 'Origen', 'acana': 'Acana',
+    'taste of the wild': 'Taste of the Wild', 'hills': "Hill's", 'purina': 'Purina',
+    'proplan': 'Pro Plan', 'pro plan': 'Pro Plan', 'pedigree': 'Pedigree', 'whiskas': 'Whiskas',
+    'friskies': 'Friskies', 'dog chow': 'Dog Chow', 'cat chow': 'Cat Chow', 'special dog': 'Special Dog',
+    'special cat': 'Special Cat', 'luck dog': 'Luck Dog', 'luck cat': 'Luck Cat', 'max': 'Max',
+    'max cat': 'Max Cat', 'max dog': 'Max Dog', 'total': 'Total', 'total dog': 'Total Dog',
+    'total cat': 'Total Cat', 'sabor': 'Sabor & Vida', 'sabor e vida': 'Sabor & Vida',
+    'sabor vida': 'Sabor & Vida', 'guabi': 'Guabi', 'guabi natural': 'Guabi Natural',
+    'equilibrio': 'Equilíbrio', 'naturalis': 'Naturalis', 'nexgard': 'NexGard', 'bravecto': 'Bravecto',
+    'simparic': 'Simparic', 'revolution': 'Revolution', 'advocate': 'Advocate', 'frontline': 'Frontline',
+    'seresto': 'Seresto', 'heartgard': 'Heartgard', 'drontal': 'Drontal', 'vermifugo': 'Vermífugo',
+    'antipulgas': 'Antipulgas', 'zoetis': 'Zoetis', 'virbac': 'Virbac', 'agener': 'Agener',
+    'ceva': 'Ceva', 'merial': 'Merial', 'petbrilho': 'Pet Brilho', 'pet society': 'Pet Society',
+    'plush': 'Plush', 'nasus': 'Nasus', 'kelldrin': 'Kelldrin', 'vitor': 'Vitor', 'vitalab': 'Vitalab',
+    'biovet': 'Biovet', 'vetnil': 'Vetnil', 'ecopet': 'Ecopet', 'alcon': 'Alcon', 'tetra': 'Tetra',
+    'sera': 'Sera', 'tropical': 'Tropical', 'nutrafin': 'Nutrafin', 'ocean tech': 'Ocean Tech',
+    'oceantech': 'Ocean Tech', 'boyu': 'Boyu', 'sarlo': 'Sarlo', 'sarlo better': 'Sarlo Better',
+    'atman': 'Atman', 'aquatech': 'Aquatech', 'resun': 'Resun', 'megazoo': 'Megazoo',
+    'alimento': 'Alimento', 'nutrópica': 'Nutrópica', 'nutropica': 'Nutrópica', 'zootekna': 'Zootekna',
+    'poytara': 'Poytara', 'trinca ferro': 'Trinca Ferro', 'genco': 'Genco', 'hidroazul': 'Hidroazul',
+    'bel gard': 'Bel Gard', 'belguard': 'Bel Gard', 'barranets': 'Barranets', 'HTH': 'HTH',
+    'acquazero': 'Acquazero', 'tramontina': 'Tramontina', 'vonder': 'Vonder', 'western': 'Western',
+    'nautika': 'Nautika', 'coleman': 'Coleman', 'guepardo': 'Guepardo', 'mor': 'Mor',
+    'invictus': 'Invictus', 'marine sports': 'Marine Sports', 'maruri': 'Maruri', 'daiwa': 'Daiwa',
+    'shimano': 'Shimano', 'albatroz': 'Albatroz', 'saint': 'Saint', 'sumax': 'Sumax', 'forth': 'Forth',
+    'dimy': 'Dimy', 'nutriplan': 'Nutriplan', 'biofertil': 'Biofertil', 'bionatural': 'BioNatural',
+    'vitaplan': 'Vitaplan', 'plantafol': 'Plantafol', 'palheiro': 'Palheiro', 'smoking': 'Smoking',
+    'zig zag': 'Zig Zag', 'zigzag': 'Zig Zag', 'raw': 'RAW', 'club modiano': 'Club Modiano', 'copag': 'Copag'
+}
+
+# Regex Replacements (Ported from Python)
+REPLACEMENTS = {
+     r'\bCes\b': 'Cães', r'\bRacao\b': 'Ração', r'\bRao\b': 'Ração', r'\bMaA\b': 'Maçã',
+     r'\bDGua\b': "D'Água", r'\bAcrilico\b': 'Acrílico', r'\bPlastico\b': 'Plástico',
+     r'\bEletrico\b': 'Elétrico', r'\bRape\b': 'Rapé', r'\bPassaros\b': 'Pássaros',
+     r'\bHerbivoros\b': 'Herbívoros', r'\bCeramico\b': 'Cerâmico', r'\bAutomatico\b': 'Automático',
+     r'\bCb\.(?=\s|$)': 'Cabo', r'\bBainha Pl\b': 'Bainha Plástica', r'\b110v\b': '110V',
+     r'\b220v\b': '220V', r'\b300g\b': '300g', r'\bKg\b': 'kg', r'\bkg\b': 'kg',
+     r'\bUnid\b': 'Unid.', r'\bUn\.(?=\s|$)': 'Un.', r'\bMts\b': 'Metros', r'\bMt\b': 'Metro',
+     r'\bmt\b': 'Metros', r'\bCm\b': 'cm', r'\bMm\b': 'mm', r'\bLts\b': 'Litros',
+     r'\bLt\b': 'Litro', r'\bMl\b': 'ml', r'\bW\b': 'W', r'\bV\b': 'V', r'\bA\b': 'A',
+     r'\bCv\b': 'CV', r'\bHp\b': 'HP', r'\bPh\b': 'pH', r'\bPpm\b': 'ppm', r'\bKh\b': 'KH',
+     r'\bGh\b': 'GH', r'\bUv\b': 'UV', r'\bLed\b': 'LED', r'\bRgb\b': 'RGB', r'\bUsb\b': 'USB',
+     r'\bBivolt\b': 'Bivolt', r'\bInox\b': 'Inox', r'\bPvc\b': 'PVC', r'\bAbs\b': 'ABS',
+     r'\bPp\b': 'PP', r'\bPe\b': 'PE', r'\bPet\b': 'PET', r'\bEva\b': 'EVA', r'\bTnt\b': 'TNT',
+     r'\bMdf\b': 'MDF', r'\bMdp\b': 'MDP', r'\bOsso\b': 'Osso', r'\bCouro\b': 'Couro',
+     r'\bNylon\b': 'Nylon', r'\bPoliester\b': 'Poliéster', r'\bAlgodao\b': 'Algodão',
+     r'\bAluminio\b': 'Alumínio', r'\bSeda\b': 'Seda', r'\bVeludo\b': 'Veludo',
+     r'\bCamurca\b': 'Camurça', r'\bJeans\b': 'Jeans', r'\bLona\b': 'Lona', r'\bJuta\b': 'Juta',
+     r'\bSisal\b': 'Sisal', r'\bPalha\b': 'Palha', r'\bBambu\b': 'Bambu', r'\bMadeira\b': 'Madeira',
+     r'\bVidro\b': 'Vidro', r'\bCristal\b': 'Cristal', r'\bPorcelana\b': 'Porcelana',
+     r'\bCeramica\b': 'Cerâmica', r'\bBarro\b': 'Barro', r'\bGesso\b': 'Gesso',
+     r'\bCimento\b': 'Cimento', r'\bPedra\b': 'Pedra', r'\bMarmore\b': 'Mármore',
+     r'\bGranito\b': 'Granito', r'\bAreia\b': 'Areia', r'\bTerra\b': 'Terra',
+     r'\bSubstrato\b': 'Substrato', r'\bAdubo\b': 'Adubo', r'\bFertilizante\b': 'Fertilizante',
+     r'\bSemente\b': 'Semente', r'\bMuda\b': 'Muda', r'\bPlanta\b': 'Planta', r'\bFlor\b': 'Flor',
+     r'\bFruta\b': 'Fruta', r'\bLegume\b': 'Legume', r'\bVerdura\b': 'Verdura',
+     r'\bTempero\b': 'Tempero', r'\bErva\b': 'Erva', r'\bCha\b': 'Chá', r'\bCafe\b': 'Café',
+     r'\bAcucar\b': 'Açúcar', r'\bSal\b': 'Sal', r'\bPimenta\b': 'Pimenta', r'\bOleo\b': 'Óleo',
+     r'\bAzeite\b': 'Azeite', r'\bVinagre\b': 'Vinagre', r'\bMolho\b': 'Molho',
+     r'\bConserva\b': 'Conserva', r'\bDoce\b': 'Doce', r'\bBiscoito\b': 'Biscoito',
+     r'\bBolacha\b': 'Bolacha', r'\bBolo\b': 'Bolo', r'\bPao\b': 'Pão', r'\bTorrada\b': 'Torrada',
+     r'\bSnack\b': 'Snack', r'\bPetisco\b': 'Petisco', r'\bOssinho\b': 'Ossinho',
+     r'\bBifinho\b': 'Bifinho', r'\bPalito\b': 'Palito', r'\bSache\b': 'Sachê', r'\bLata\b': 'Lata',
+     r'\bPote\b': 'Pote', r'\bCaixa\b': 'Caixa', r'\bSaco\b': 'Saco', r'\bFardo\b': 'Fardo',
+     r'\bKit\b': 'Kit', r'\bJogo\b': 'Jogo', r'\bConjunto\b': 'Conjunto', r'\bPar\b': 'Par',
+     r'\bUnidade\b': 'Unidade', r'\bPeca\b': 'Peça', r'\bMetro\b': 'Metro', r'\bRolo\b': 'Rolo',
+     r'\bBobina\b': 'Bobina', r'\bCartela\b': 'Cartela', r'\bDisplay\b': 'Display',
+     r'\bBlister\b': 'Blister', r'\bGranel\b': 'Granel', r'\bRefil\b': 'Refil',
+     r'\bReparo\b': 'Reparo', r'\bAcessorio\b': 'Acessório',
+     r'\bPeca De Reposicao\b': 'Peça de Reposição', r'\bManutencao\b': 'Manutenção',
+     r'\bLimpeza\b': 'Limpeza', r'\bHigiene\b': 'Higiene', r'\bBeleza\b': 'Beleza',
+     r'\bSaude\b': 'Saúde', r'\bMedicamento\b': 'Medicamento', r'\bRemedio\b': 'Remédio',
+     r'\bVacina\b': 'Vacina', r'\bVermifugo\b': 'Vermífugo', r'\bAntipulgas\b': 'Antipulgas',
+     r'\bCarrapaticida\b': 'Carrapaticida', r'\bShampoo\b': 'Shampoo',
+     r'\bCondicionador\b': 'Condicionador', r'\bSabonete\b': 'Sabonete', r'\bPerfume\b': 'Perfume',
+     r'\bColonia\b': 'Colônia', r'\bTalco\b': 'Talco', r'\bAreia Sanitaria\b': 'Areia Sanitária',
+     r'\bTapete Higienico\b': 'Tapete Higiênico', r'\bFralda\b': 'Fralda', r'\bBanheiro\b': 'Banheiro',
+     r'\bCaixa De Areia\b': 'Caixa de Areia', r'\bPah\b': 'Pá', r'\bComedouro\b': 'Comedouro',
+     r'\bBebedouro\b': 'Bebedouro', r'\bFonte\b': 'Fonte', r'\bAlimentador\b': 'Alimentador',
+     r'\bColeira\b': 'Coleira', r'\bGuia\b': 'Guia', r'\bPeitoral\b': 'Peitoral',
+     r'\bEnforcador\b': 'Enforcador', r'\bFocinheira\b': 'Focinheira',
+     r'\bIdentificador\b': 'Identificador', r'\bPingente\b': 'Pingente', r'\bRoupa\b': 'Roupa',
+     r'\bCama\b': 'Cama', r'\bColchonete\b': 'Colchonete', r'\bAlmofada\b': 'Almofada',
+     r'\bCobertor\b': 'Cobertor', r'\bManta\b': 'Manta', r'\bToca\b': 'Toca',
+     r'\bCasinha\b': 'Casinha', r'\bGaiola\b': 'Gaiola', r'\bViveiro\b': 'Viveiro',
+     r'\bAquario\b': 'Aquário', r'\bTerrario\b': 'Terrário', r'\bTransporte\b': 'Transporte',
+     r'\bCaixa De Transporte\b': 'Caixa de Transporte', r'\bBolsa\b': 'Bolsa',
+     r'\bMochila\b': 'Mochila', r'\bCarrinho\b': 'Carrinho', r'\bBrinquedo\b': 'Brinquedo',
+     r'\bArranhador\b': 'Arranhador', r'\bTunel\b': 'Túnel', r'\bBolinha\b': 'Bolinha',
+     r'\bCorda\b': 'Corda', r'\bPelucia\b': 'Pelúcia', r'\bLatex\b': 'Látex',
+     r'\bBorracha\b': 'Borracha', r'\bVinil\b': 'Vinil', r'\bTecido\b': 'Tecido',
+     r'\bInterativo\b': 'Interativo', r'\bInteligente\b': 'Inteligente',
+     r'\bEducativo\b': 'Educativo', r'\bAdestramento\b': 'Adestramento',
+     r'\bComportamento\b': 'Comportamento', r'\bAnti-Latido\b': 'Anti-Latido',
+     r'\bAnti-Mordida\b': 'Anti-Mordida', r'\bRepelente\b': 'Repelente', r'\bAtrativo\b': 'Atrativo',
+     r'\bCatnip\b': 'Catnip', r'\bErva De Gato\b': 'Erva de Gato', r'\bGraminha\b': 'Graminha',
+     r'\bPassaro\b': 'Pássaro', r'\bAve\b': 'Ave', r'\bAves\b': 'Aves', r'\bPeixe\b': 'Peixe',
+     r'\bPeixes\b': 'Peixes', r'\bReptil\b': 'Réptil', r'\bRepteis\b': 'Répteis',
+     r'\bRoedor\b': 'Roedor', r'\bRoedores\b': 'Roedores', r'\bCoelho\b': 'Coelho',
+     r'\bCoelhos\b': 'Coelhos', r'\bHamster\b': 'Hamster', r'\bHamsters\b': 'Hamsters',
+     r'\bChinchila\b': 'Chinchila', r'\bChinchilas\b': 'Chinchilas',
+     r'\bPorquinho Da India\b': 'Porquinho da Índia', r'\bFurao\b': 'Furão', r'\bFuroes\b': 'Furões',
+     r'\bCavalo\b': 'Cavalo', r'\bCavalos\b': 'Cavalos', r'\bEquino\b': 'Equino',
+     r'\bEquinos\b': 'Equinos', r'\bBovino\b': 'Bovino', r'\bBovinos\b': 'Bovinos',
+     r'\bSuino\b': 'Suíno', r'\bSuinos\b': 'Suínos', r'\bCaprino\b': 'Caprino',
+     r'\bCaprinos\b': 'Caprinos', r'\bOvino\b': 'Ovino', r'\bOvinos\b': 'Ovinos',
+     r'\bAve De Corte\b': 'Ave de Corte', r'\bAve De Postura\b': 'Ave de Postura',
+     r'\bAbelha\b': 'Abelha', r'\bAbelhas\b': 'Abelhas', r'\bJardim\b': 'Jardim',
+     r'\bJardinagem\b': 'Jardinagem', r'\bPiscina\b': 'Piscina', r'\bCamping\b': 'Camping',
+     r'\bPesca\b': 'Pesca', r'\bLazer\b': 'Lazer', r'\bChurrasco\b': 'Churrasco',
+     r'\bDecoracao\b': 'Decoração', r'\bUtilidade Domestica\b': 'Utilidade Doméstica',
+     r'\bFerramenta\b': 'Ferramenta', r'\bFerragem\b': 'Ferragem',
+     r'\bMaterial De Construcao\b': 'Material de Construção', r'\bEletrica\b': 'Elétrica',
+     r'\bHidraulica\b': 'Hidráulica', r'\bPintura\b': 'Pintura', r'\bAutomotivo\b': 'Automotivo',
+     r'\bAgro\b': 'Agro', r'\bVeterinaria\b': 'Veterinária', r'\bPet Shop\b': 'Pet Shop',
+     r'\bAgropecuaria\b': 'Agropecuária', r'\bFarmacia\b': 'Farmácia', r'\bClinica\b': 'Clínica',
+     r'\bHospital\b': 'Hospital', r'\bLaboratorio\b': 'Laboratório', r'\bIndustria\b': 'Indústria',
+     r'\bComercio\b': 'Comércio', r'\bServico\b': 'Serviço', r'\bEscritorio\b': 'Escritório',
+     r'\bEscola\b': 'Escola', r'\bPapelaria\b': 'Papelaria', r'\bInformatica\b': 'Informática',
+     r'\bEletronico\b': 'Eletrônico', r'\bCelular\b': 'Celular', r'\bTelefone\b': 'Telefone',
+     r'\bAudio\b': 'Áudio', r'\bVideo\b': 'Vídeo', r'\bFoto\b': 'Foto', r'\bGame\b': 'Game',
+     r'\bEsporte\b': 'Esporte', r'\bFitness\b': 'Fitness', r'\bSuplemento\b': 'Suplemento',
+     r'\bVitamina\b': 'Vitamina', r'\bMineral\b': 'Mineral', r'\bProteina\b': 'Proteína',
+     r'\bAminoacido\b': 'Aminoácido', r'\bEmagrecedor\b': 'Emagrecedor',
+     r'\bTermogenico\b': 'Termogênico', r'\bPre-Treino\b': 'Pré-Treino',
+     r'\bPos-Treino\b': 'Pós-Treino', r'\bBarra De Proteina\b': 'Barra de Proteína',
+     r'\bBebida Esportiva\b': 'Bebida Esportiva', r'\bAcessorio Esportivo\b': 'Acessório Esportivo',
+     r'\bRoupa Esportiva\b': 'Roupa Esportiva', r'\bCalcado Esportivo\b': 'Calçado Esportivo',
+     r'\bEquipamento Esportivo\b': 'Equipamento Esportivo', r'\bBicicleta\b': 'Bicicleta',
+     r'\bSkate\b': 'Skate', r'\bPatins\b': 'Patins', r'\bPatinete\b': 'Patinete',
+     r'\bMoto\b': 'Moto', r'\bCarro\b': 'Carro', r'\bCaminhao\b': 'Caminhão',
+     r'\bOnibus\b': 'Ônibus', r'\bTrator\b': 'Trator', r'\bMaquina Agricola\b': 'Máquina Agrícola',
+     r'\bImplemento Agricola\b': 'Implemento Agrícola', r'\bPneu\b': 'Pneu', r'\bRoda\b': 'Roda',
+     r'\bBateria\b': 'Bateria', r'\bOleo Lubrificante\b': 'Óleo Lubrificante',
+     r'\bFiltro De Oleo\b': 'Filtro de Óleo', r'\bFiltro De Ar\b': 'Filtro de Ar',
+     r'\bFiltro De Combustivel\b': 'Filtro de Combustível',
+     r'\bPastilha De Freio\b': 'Pastilha de Freio', r'\bDisco De Freio\b': 'Disco de Freio',
+     r'\bAmortecedor\b': 'Amortecedor', r'\bMola\b': 'Mola', r'\bSuspensao\b': 'Suspensão',
+     r'\bDirecao\b': 'Direção', r'\bEmbreagem\b': 'Embreagem', r'\bCambio\b': 'Câmbio',
+     r'\bMotor\b': 'Motor', r'\bEscapamento\b': 'Escapamento', r'\bCatalisador\b': 'Catalisador',
+     r'\bRadiador\b': 'Radiador', r'\bAr Condicionado\b': 'Ar Condicionado',
+     r'\bVidro Eletrico\b': 'Vidro Elétrico', r'\bTrava Eletrica\b': 'Trava Elétrica',
+     r'\bAlarme\b': 'Alarme', r'\bSom Automotivo\b': 'Som Automotivo', r'\bGps\b': 'GPS',
+     r'\bCamera De Re\b': 'Câmera de Ré', r'\bSensor De Estacionamento\b': 'Sensor de Estacionamento',
+     r'\bFarol\b': 'Farol', r'\bLanterna\b': 'Lanterna', r'\bLampada\b': 'Lâmpada',
+     r'\bEspelho\b': 'Espelho', r'\bRetrovisor\b': 'Retrovisor', r'\bParachoque\b': 'Para-choque',
+     r'\bGrade\b': 'Grade', r'\bCapo\b': 'Capô', r'\bPorta\b': 'Porta',
+     r'\bPorta-Malas\b': 'Porta-Malas', r'\bTeto Solar\b': 'Teto Solar', r'\bBanco\b': 'Banco',
+     r'\bCapa De Banco\b': 'Capa de Banco', r'\bTapete Automotivo\b': 'Tapete Automotivo',
+     r'\bVolante\b': 'Volante', r'\bManopla\b': 'Manopla', r'\bPedaleira\b': 'Pedaleira',
+     r'\bCinto De Seguranca\b': 'Cinto de Segurança', r'\bCadeira De Bebe\b': 'Cadeira de Bebê',
+     r'\bAssento De Elevacao\b': 'Assento de Elevação', r'\bBebe Conforto\b': 'Bebê Conforto',
+     r'\bCarrinho De Bebe\b': 'Carrinho de Bebê', r'\bAndador\b': 'Andador', r'\bBerco\b': 'Berço',
+     r'\bComoda\b': 'Cômoda', r'\bGuarda-Roupa\b': 'Guarda-Roupa', r'\bArmario\b': 'Armário',
+     r'\bEstante\b': 'Estante', r'\bPrateleira\b': 'Prateleira', r'\bNicho\b': 'Nicho',
+     r'\bMesa\b': 'Mesa', r'\bCadeira\b': 'Cadeira', r'\bBanqueta\b': 'Banqueta',
+     r'\bSofa\b': 'Sofá', r'\bPoltrona\b': 'Poltrona', r'\bPuff\b': 'Puff', r'\bRack\b': 'Rack',
+     r'\bPainel\b': 'Painel', r'\bHome Theater\b': 'Home Theater', r'\bTv\b': 'TV',
+     r'\bSmart Tv\b': 'Smart TV', r'\bMonitor\b': 'Monitor', r'\bProjetor\b': 'Projetor',
+     r'\bTela De Projecao\b': 'Tela de Projeção', r'\bSuporte Para Tv\b': 'Suporte para TV',
+     r'\bAntena\b': 'Antena', r'\bReceptor\b': 'Receptor', r'\bConversor\b': 'Conversor',
+     r'\bDvd Player\b': 'DVD Player', r'\bBlu-Ray Player\b': 'Blu-Ray Player',
+     r'\bSoundbar\b': 'Soundbar', r'\bCaixa De Som\b': 'Caixa de Som',
+     r'\bFone De Ouvido\b': 'Fone de Ouvido', r'\bMicrofone\b': 'Microfone',
+     r'\bInstrumento Musical\b': 'Instrumento Musical', r'\bViolao\b': 'Violão',
+     r'\bGuitarra\b': 'Guitarra', r'\bBaixo\b': 'Baixo', r'\bTeclado\b': 'Teclado',
+     r'\bPiano\b': 'Piano', r'\bSopro\b': 'Sopro', r'\bPercussao\b': 'Percussão',
+     r'\bAcessorio Musical\b': 'Acessório Musical', r'\bLivro\b': 'Livro', r'\bRevista\b': 'Revista',
+     r'\bHq\b': 'HQ', r'\bManga\b': 'Mangá', r'\bCd\b': 'CD', r'\bDvd\b': 'DVD',
+     r'\bBlu-Ray\b': 'Blu-Ray', r'\bVinil\b': 'Vinil', r'\bLp\b': 'LP', r'\bFilme\b': 'Filme',
+     r'\bSerie\b': 'Série', r'\bDocumentario\b': 'Documentário', r'\bShow\b': 'Show',
+     r'\bMusica\b': 'Música', r'\bJogo De Videogame\b': 'Jogo de Videogame', r'\bConsole\b': 'Console',
+     r'\bControle\b': 'Controle', r'\bAcessorio Gamer\b': 'Acessório Gamer',
+     r'\bPc Gamer\b': 'PC Gamer', r'\bNotebook Gamer\b': 'Notebook Gamer',
+     r'\bMouse Gamer\b': 'Mouse Gamer', r'\bTeclado Gamer\b': 'Teclado Gamer',
+     r'\bHeadset Gamer\b': 'Headset Gamer', r'\bCadeira Gamer\b': 'Cadeira Gamer',
+     r'\bMesa Gamer\b': 'Mesa Gamer', r'\bMousepad Gamer\b': 'Mousepad Gamer',
+     r'\bStreamer\b': 'Streamer', r'\bYoutuber\b': 'YouTuber', r'\bInfluencer\b': 'Influencer',
+     r'\bCriador De Conteudo\b': 'Criador de Conteúdo', r'\bCamera Fotografica\b': 'Câmera Fotográfica',
+     r'\bFilmadora\b': 'Filmadora', r'\bDrone\b': 'Drone', r'\bTripe\b': 'Tripé',
+     r'\bIluminacao\b': 'Iluminação', r'\bEstudio\b': 'Estúdio', r'\bLente\b': 'Lente',
+     r'\bFlash\b': 'Flash', r'\bCartao De Memoria\b': 'Cartão de Memória',
+     r'\bHd Externo\b': 'HD Externo', r'\bSsd\b': 'SSD', r'\bPen Drive\b': 'Pen Drive',
+     r'\bRoteador\b': 'Roteador', r'\bRepetidor\b': 'Repetidor', r'\bSwitch\b': 'Switch',
+     r'\bModem\b': 'Modem', r'\bCabo De Rede\b': 'Cabo de Rede', r'\bServidor\b': 'Servidor',
+     r'\bNobreak\b': 'Nobreak', r'\bEstabilizador\b': 'Estabilizador',
+     r'\bFiltro De Linha\b': 'Filtro de Linha', r'\bExtensao\b': 'Extensão',
+     r'\bAdaptador\b': 'Adaptador', r'\bHub\b': 'Hub', r'\bDock Station\b': 'Dock Station',
+     r'\bCooler\b': 'Cooler', r'\bFonte De Alimentacao\b': 'Fonte de Alimentação',
+     r'\bGabinete\b': 'Gabinete', r'\bPlaca Mae\b': 'Placa Mãe', r'\bProcessador\b': 'Processador',
+     r'\bMemoria Ram\b': 'Memória RAM', r'\bPlaca De Video\b': 'Placa de Vídeo',
+     r'\bPlaca De Som\b': 'Placa de Som', r'\bPlaca De Rede\b': 'Placa de Rede',
+     r'\bDrive Optico\b': 'Drive Óptico', r'\bLeitor De Cartao\b': 'Leitor de Cartão',
+     r'\bWebcam\b': 'Webcam', r'\bImpressora\b': 'Impressora', r'\bMultifuncional\b': 'Multifuncional',
+     r'\bScanner\b': 'Scanner', r'\bCartucho\b': 'Cartucho', r'\bToner\b': 'Toner',
+     r'\bPapel\b': 'Papel', r'\bEtiqueta\b': 'Etiqueta', r'\bEnvelope\b': 'Envelope',
+     r'\bCaneta\b': 'Caneta', r'\bLapis\b': 'Lápis', r'\bBorracha\b': 'Borracha',
+     r'\bApontador\b': 'Apontador', r'\bRegua\b': 'Régua', r'\bTesoura\b': 'Tesoura',
+     r'\bCola\b': 'Cola', r'\bFita Adesiva\b': 'Fita Adesiva', r'\bGrampeador\b': 'Grampeador',
+     r'\bPerfurador\b': 'Perfurador', r'\bPasta\b': 'Pasta', r'\bArquivo\b': 'Arquivo',
+     r'\bOrganizador\b': 'Organizador', r'\bAgenda\b': 'Agenda', r'\bCaderno\b': 'Caderno',
+     r'\bBloco De Notas\b': 'Bloco de Notas', r'\bPost-It\b': 'Post-it',
+     r'\bQuadro Branco\b': 'Quadro Branco', r'\bMarcador\b': 'Marcador', r'\bApagador\b': 'Apagador',
+     r'\bEstojo\b': 'Estojo', r'\bLancheira\b': 'Lancheira', r'\bGarrafa\b': 'Garrafa',
+     r'\bCopo\b': 'Copo', r'\bCaneca\b': 'Caneca', r'\bTermica\b': 'Térmica',
+     r'\bMarmita\b': 'Marmita', r'\bTalher\b': 'Talher', r'\bPrato\b': 'Prato',
+     r'\bTigela\b': 'Tigela', r'\bJarra\b': 'Jarra', r'\bBule\b': 'Bule',
+     r'\bChaleira\b': 'Chaleira', r'\bCafeteira\b': 'Cafeteira', r'\bLiquidificador\b': 'Liquidificador',
+     r'\bBatedeira\b': 'Batedeira', r'\bProcessador De Alimentos\b': 'Processador de Alimentos',
+     r'\bMixer\b': 'Mixer', r'\bEspremedor\b': 'Espremedor', r'\bSanduicheira\b': 'Sanduicheira',
+     r'\bTorradeira\b': 'Torradeira', r'\bGrill\b': 'Grill', r'\bFritadeira\b': 'Fritadeira',
+     r'\bAir Fryer\b': 'Air Fryer', r'\bPanela Eletrica\b': 'Panela Elétrica',
+     r'\bForno Eletrico\b': 'Forno Elétrico', r'\bMicroondas\b': 'Micro-ondas',
+     r'\bFogao\b': 'Fogão', r'\bCooktop\b': 'Cooktop', r'\bCoifa\b': 'Coifa',
+     r'\bDepurador\b': 'Depurador', r'\bGeladeira\b': 'Geladeira', r'\bRefrigerador\b': 'Refrigerador',
+     r'\bFreezer\b': 'Freezer', r'\bFrigobar\b': 'Frigobar', r'\bAdega\b': 'Adega',
+     r'\bCervejeira\b': 'Cervejeira', r'\bLava-Loucas\b': 'Lava-Louças',
+     r'\bLava-Roupas\b': 'Lava-Roupas', r'\bSecadora\b': 'Secadora', r'\bLava E Seca\b': 'Lava e Seca',
+     r'\bCentrifuga\b': 'Centrífuga', r'\bFerro De Passar\b': 'Ferro de Passar',
+     r'\bVaporizador\b': 'Vaporizador', r'\bAspirador De Po\b': 'Aspirador de Pó',
+     r'\bRobo Aspirador\b': 'Robô Aspirador', r'\bEnceradeira\b': 'Enceradeira',
+     r'\bLavadora De Alta Pressao\b': 'Lavadora de Alta Pressão', r'\bVentilador\b': 'Ventilador',
+     r'\bCirculador De Ar\b': 'Circulador de Ar', r'\bClimatizador\b': 'Climatizador',
+     r'\bAquecedor\b': 'Aquecedor', r'\bDesumidificador\b': 'Desumidificador',
+     r'\bUmidificador\b': 'Umidificador', r'\bPurificador De Ar\b': 'Purificador de Ar',
+     r'\bPurificador De Agua\b': 'Purificador de Água', r'\bFiltro De Agua\b': 'Filtro de Água',
+     r'\bTorneira\b': 'Torneira', r'\bMisturador\b': 'Misturador', r'\bChuveiro\b': 'Chuveiro',
+     r'\bDucha\b': 'Ducha', r'\bAssento Sanitario\b': 'Assento Sanitário',
+     r'\bVaso Sanitario\b': 'Vaso Sanitário', r'\bCuba\b': 'Cuba', r'\bPia\b': 'Pia',
+     r'\bTanque\b': 'Tanque', r'\bBox\b': 'Box', r'\bToalheiro\b': 'Toalheiro',
+     r'\bSaboneteira\b': 'Saboneteira', r'\bPapeleira\b': 'Papeleira', r'\bCabide\b': 'Cabide',
+     r'\bGancho\b': 'Gancho', r'\bLixeira\b': 'Lixeira', r'\bCesto\b': 'Cesto',
+     r'\bBalde\b': 'Balde', r'\bBacia\b': 'Bacia', r'\bVassoura\b': 'Vassoura',
+     r'\bRodo\b': 'Rodo', r'\bEscova\b': 'Escova', r'\bEsponja\b': 'Esponja',
+     r'\bPano\b': 'Pano', r'\bFlanela\b': 'Flanela', r'\bAvental\b': 'Avental',
+     r'\bTouca\b': 'Touca', r'\bMascara\b': 'Máscara', r'\bOculos\b': 'Óculos',
+     r'\bProtetor Auricular\b': 'Protetor Auricular', r'\bCapacete\b': 'Capacete',
+     r'\bBota\b': 'Bota', r'\bSapato\b': 'Sapato', r'\bTenis\b': 'Tênis',
+     r'\bChinelo\b': 'Chinelo', r'\bSandalia\b': 'Sandália', r'\bSapatilha\b': 'Sapatilha',
+     r'\bMeia\b': 'Meia', r'\bCalca\b': 'Calça', r'\bBermuda\b': 'Bermuda',
+     r'\bShort\b': 'Short', r'\bSaia\b': 'Saia', r'\bVestido\b': 'Vestido',
+     r'\bCamisa\b': 'Camisa', r'\bCamiseta\b': 'Camiseta', r'\bBlusa\b': 'Blusa',
+     r'\bCasaco\b': 'Casaco', r'\bJaqueta\b': 'Jaqueta', r'\bMoletom\b': 'Moletom',
+     r'\bSueter\b': 'Suéter', r'\bColete\b': 'Colete', r'\bTerno\b': 'Terno',
+     r'\bGravata\b': 'Gravata', r'\bCinto\b': 'Cinto', r'\bBone\b': 'Boné',
+     r'\bChapeu\b': 'Chapéu', r'\bGorro\b': 'Gorro', r'\bCachecol\b': 'Cachecol',
+     r'\bRelogio\b': 'Relógio', r'\bOculos De Sol\b': 'Óculos de Sol', r'\bJoia\b': 'Joia',
+     r'\bBijuteria\b': 'Bijuteria', r'\bAnel\b': 'Anel', r'\bBrinco\b': 'Brinco',
+     r'\bColar\b': 'Colar', r'\bPulseira\b': 'Pulseira', r'\bTornozeleira\b': 'Tornozeleira',
+     r'\bPiercing\b': 'Piercing', r'\bAlianca\b': 'Aliança', r'\bOuro\b': 'Ouro',
+     r'\bPrata\b': 'Prata', r'\bBronze\b': 'Bronze', r'\bAco\b': 'Aço',
+     r'\bTitanio\b': 'Titânio', r'\bPedra Preciosa\b': 'Pedra Preciosa',
+     r'\bDiamante\b': 'Diamante', r'\bRubi\b': 'Rubi', r'\bEsmeralda\b': 'Esmeralda',
+     r'\bSafira\b': 'Safira', r'\bPerola\b': 'Pérola', r'\bZirconia\b': 'Zircônia',
+     r'\bReligioso\b': 'Religioso', r'\bEsoterico\b': 'Esotérico', r'\bMistico\b': 'Místico',
+     r'\bArtesanato\b': 'Artesanato', r'\bFeito A Mao\b': 'Feito à Mão',
+     r'\bPersonalizado\b': 'Personalizado', r'\bPresente\b': 'Presente',
+     r'\bLembrancinha\b': 'Lembrancinha', r'\bFesta\b': 'Festa',
+     r'\bAniversario\b': 'Aniversário', r'\bCasamento\b': 'Casamento',
+     r'\bBatizado\b': 'Batizado', r'\bCha De Bebe\b': 'Chá de Bebê',
+     r'\bCha De Cozinha\b': 'Chá de Cozinha', r'\bCha Bar\b': 'Chá Bar',
+     r'\bDespedida De Solteiro\b': 'Despedida de Solteiro', r'\bFormatura\b': 'Formatura',
+     r'\bNatal\b': 'Natal', r'\bAno Novo\b': 'Ano Novo', r'\bPascoa\b': 'Páscoa',
+     r'\bDia Das Maes\b': 'Dia das Mães', r'\bDia Dos Pais\b': 'Dia dos Pais',
+     r'\bDia Dos Namorados\b': 'Dia dos Namorados', r'\bDia Das Criancas\b': 'Dia das Crianças',
+     r'\bBlack Friday\b': 'Black Friday', r'\bPromocao\b': 'Promoção', r'\bOferta\b': 'Oferta',
+     r'\bDesconto\b': 'Desconto', r'\bLiquidação\b': 'Liquidação', r'\bSaldão\b': 'Saldão',
+     r'\bOutlet\b': 'Outlet', r'\bLancamento\b': 'Lançamento', r'\bNovidade\b': 'Novidade',
+     r'\bExclusivo\b': 'Exclusivo', r'\bLimitado\b': 'Limitado', r'\bEspecial\b': 'Especial',
+     r'\bPremium\b': 'Premium', r'\bLuxo\b': 'Luxo', r'\bBasico\b': 'Básico',
+     r'\bEssencial\b': 'Essencial', r'\bPadrao\b': 'Padrão', r'\bSimples\b': 'Simples',
+     r'\bComposto\b': 'Composto', r'\bMisto\b': 'Misto', r'\bSortido\b': 'Sortido',
+     r'\bVariado\b': 'Variado', r'\bDiverso\b': 'Diverso', r'\bOutro\b': 'Outro',
+     r'\bAd\b': 'Adulto', r'\bPq\b': 'Pequeno', r'\bMd\b': 'Médio', r'\bGd\b': 'Grande',
+     r'\bFil\b': 'Filhote', r'\bCast\b': 'Castrado', r'\bLig\b': 'Light', r'\bSen\b': 'Sênior',
+     r'\bSenior\b': 'Sênior', r'\bRmg\b': 'Raças Médias e Grandes', r'\bRp\b': 'Raças Pequenas',
+     r'\bNat\.\b': 'Natural', r'\bNat\b': 'Natural', r'\bSel\.\b': 'Seleção',
+     r'\bSelecao\b': 'Seleção', r'\bPrem\b': 'Premium', r'\bEsp\b': 'Especial',
+     r'\bMin\b': 'Mini', r'\bGig\b': 'Gigante', r'\bPed\b': 'Pedaços', r'\bMol\b': 'Molho',
+     r'\bSach\b': 'Sachê', r'\bFrg\b': 'Frango', r'\bVeg\b': 'Vegetais',
+     r'\bCord\b': 'Cordeiro', r'\bSalm\b': 'Salmão', r'\bArr\b': 'Arroz', r'\bBat\b': 'Batata'
+}
+
+
+@functools.lru_cache(maxsize=1)
+def compiled_rules():
+    """Motores de normalização, marcas e peso, montados uma vez por processo"""
+    return TextNormalizer(REPLACEMENTS), BrandMatcher(MARCAS_CONHECIDAS), WeightExtractor()
+
 
 class StockProcessor:
-    def __init__(self, file_path, images_folder=None):
+    def __init__(self, file_path, images_folder=None, row_memo_size=100000, description_memo_size=20000,
+                 parallel=False, workers=None, chunk_size=2000, min_parallel_rows=10000, snapshot_folder=None,
+                 low_stock_threshold=3):
         self.file_path = file_path
         self.images_folder = images_folder
+        # Estoque até esse valor (inclusive) entra em "estoque baixo" e na reposição
+        self.low_stock_threshold = low_stock_threshold
+
+        # Catálogo processado em disco, mapeado em memória e compartilhado entre workers
+        self.snapshots = SnapshotStore(snapshot_folder) if snapshot_folder else None
+
+        # Enriquecimento paralelo (opcional) para exportações grandes
+        self.parallel = parallel
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel_rows = min_parallel_rows
         self.target_columns = [
             'SKU', 'Name', 'Regular price', 'Categories', 'Meta: _marca', 'Stock',
             'Description', 'Short description', 'Weight (kg)', 'Meta: _custo'
         ]
         
-        # Cache
-        self._cache = None
+        # Cache: catálogo lido do CSV (por nome) e (versão com imagens primeiro, self.version)
+        self._base = None
+        self._current = None
         self._last_mtime = 0
-        
-        # Marcas Conhecidas (Ported from JS)
-        self.marcas_conhecidas = {
-            'royal canin': 'Royal Canin', 'royalcanin': 'Royal Canin', 'premier': 'Premier', 
-            'premier pet': 'Premier Pet', 'golden': 'Golden', 'golden formula': 'Golden Formula',
-            'farmina': 'Farmina', 'farmina n&d': 'Farmina N&D', 'origen': 'Origen', 'acana': 'Acana',
-            'taste of the wild': 'Taste of the Wild', 'hills': "Hill's", 'purina': 'Purina',
-            'proplan': 'Pro Plan', 'pro plan': 'Pro Plan', 'pedigree': 'Pedigree', 'whiskas': 'Whiskas',
-            'friskies': 'Friskies', 'dog chow': 'Dog Chow', 'cat chow': 'Cat Chow', 'special dog': 'Special Dog',
-            'special cat': 'Special Cat', 'luck dog': 'Luck Dog', 'luck cat': 'Luck Cat', 'max': 'Max',
-            'max cat': 'Max Cat', 'max dog': 'Max Dog', 'total': 'Total', 'total dog': 'Total Dog',
-            'total cat': 'Total Cat', 'sabor': 'Sabor & Vida', 'sabor e vida': 'Sabor & Vida',
-            'sabor vida': 'Sabor & Vida', 'guabi': 'Guabi', 'guabi natural': 'Guabi Natural',
-            'equilibrio': 'Equilíbrio', 'naturalis': 'Naturalis', 'nexgard': 'NexGard', 'bravecto': 'Bravecto',
-            'simparic': 'Simparic', 'revolution': 'Revolution', 'advocate': 'Advocate', 'frontline': 'Frontline',
-            'seresto': 'Seresto', 'heartgard': 'Heartgard', 'drontal': 'Drontal', 'vermifugo': 'Vermífugo',
-            'antipulgas': 'Antipulgas', 'zoetis': 'Zoetis', 'virbac': 'Virbac', 'agener': 'Agener',
-            'ceva': 'Ceva', 'merial': 'Merial', 'petbrilho': 'Pet Brilho', 'pet society': 'Pet Society',
-            'plush': 'Plush', 'nasus': 'Nasus', 'kelldrin': 'Kelldrin', 'vitor': 'Vitor', 'vitalab': 'Vitalab',
-            'biovet': 'Biovet', 'vetnil': 'Vetnil', 'ecopet': 'Ecopet', 'alcon': 'Alcon', 'tetra': 'Tetra',
-            'sera': 'Sera', 'tropical': 'Tropical', 'nutrafin': 'Nutrafin', 'ocean tech': 'Ocean Tech',
-            'oceantech': 'Ocean Tech', 'boyu': 'Boyu', 'sarlo': 'Sarlo', 'sarlo better': 'Sarlo Better',
-            'atman': 'Atman', 'aquatech': 'Aquatech', 'resun': 'Resun', 'megazoo': 'Megazoo',
-            'alimento': 'Alimento', 'nutrópica': 'Nutrópica', 'nutropica': 'Nutrópica', 'zootekna': 'Zootekna',
-            'poytara': 'Poytara', 'trinca ferro': 'Trinca Ferro', 'genco': 'Genco', 'hidroazul': 'Hidroazul',
-            'bel gard': 'Bel Gard', 'belguard': 'Bel Gard', 'barranets': 'Barranets', 'HTH': 'HTH',
-            'acquazero': 'Acquazero', 'tramontina': 'Tramontina', 'vonder': 'Vonder', 'western': 'Western',
-            'nautika': 'Nautika', 'coleman': 'Coleman', 'guepardo': 'Guepardo', 'mor': 'Mor',
-            'invictus': 'Invictus', 'marine sports': 'Marine Sports', 'maruri': 'Maruri', 'daiwa': 'Daiwa',
-            'shimano': 'Shimano', 'albatroz': 'Albatroz', 'saint': 'Saint', 'sumax': 'Sumax', 'forth': 'Forth',
-            'dimy': 'Dimy', 'nutriplan': 'Nutriplan', 'biofertil': 'Biofertil', 'bionatural': 'BioNatural',
-            'vitaplan': 'Vitaplan', 'plantafol': 'Plantafol', 'palheiro': 'Palheiro', 'smoking': 'Smoking',
-            'zig zag': 'Zig Zag', 'zigzag': 'Zig Zag', 'raw': 'RAW', 'club modiano': 'Club Modiano', 'copag': 'Copag'
-        }
 
-        # Regex Replacements (Ported from Python)
-        self.replacements = {
-             r'\bCes\b': 'Cães', r'\bRacao\b': 'Ração', r'\bRao\b': 'Ração', r'\bMaA\b': 'Maçã',
-             r'\bDGua\b': "D'Água", r'\bAcrilico\b': 'Acrílico', r'\bPlastico\b': 'Plástico',
-             r'\bEletrico\b': 'Elétrico', r'\bRape\b': 'Rapé', r'\bPassaros\b': 'Pássaros',
-             r'\bHerbivoros\b': 'Herbívoros', r'\bCeramico\b': 'Cerâmico', r'\bAutomatico\b': 'Automático',
-             r'\bCb\.(?=\s|$)': 'Cabo', r'\bBainha Pl\b': 'Bainha Plástica', r'\b110v\b': '110V',
-             r'\b220v\b': '220V', r'\b300g\b': '300g', r'\bKg\b': 'kg', r'\bkg\b': 'kg',
-             r'\bUnid\b': 'Unid.', r'\bUn\.(?=\s|$)': 'Un.', r'\bMts\b': 'Metros', r'\bMt\b': 'Metro',
-             r'\bmt\b': 'Metros', r'\bCm\b': 'cm', r'\bMm\b': 'mm', r'\bLts\b': 'Litros',
-             r'\bLt\b': 'Litro', r'\bMl\b': 'ml', r'\bW\b': 'W', r'\bV\b': 'V', r'\bA\b': 'A',
-             r'\bCv\b': 'CV', r'\bHp\b': 'HP', r'\bPh\b': 'pH', r'\bPpm\b': 'ppm', r'\bKh\b': 'KH',
-             r'\bGh\b': 'GH', r'\bUv\b': 'UV', r'\bLed\b': 'LED', r'\bRgb\b': 'RGB', r'\bUsb\b': 'USB',
-             r'\bBivolt\b': 'Bivolt', r'\bInox\b': 'Inox', r'\bPvc\b': 'PVC', r'\bAbs\b': 'ABS',
-             r'\bPp\b': 'PP', r'\bPe\b': 'PE', r'\bPet\b': 'PET', r'\bEva\b': 'EVA', r'\bTnt\b': 'TNT',
-             r'\bMdf\b': 'MDF', r'\bMdp\b': 'MDP', r'\bOsso\b': 'Osso', r'\bCouro\b': 'Couro',
-             r'\bNylon\b': 'Nylon', r'\bPoliester\b': 'Poliéster', r'\bAlgodao\b': 'Algodão',
-             r'\bAluminio\b': 'Alumínio', r'\bSeda\b': 'Seda', r'\bVeludo\b': 'Veludo',
-             r'\bCamurca\b': 'Camurça', r'\bJeans\b': 'Jeans', r'\bLona\b': 'Lona', r'\bJuta\b': 'Juta',
-             r'\bSisal\b': 'Sisal', r'\bPalha\b': 'Palha', r'\bBambu\b': 'Bambu', r'\bMadeira\b': 'Madeira',
-             r'\bVidro\b': 'Vidro', r'\bCristal\b': 'Cristal', r'\bPorcelana\b': 'Porcelana',
-             r'\bCeramica\b': 'Cerâmica', r'\bBarro\b': 'Barro', r'\bGesso\b': 'Gesso',
-             r'\bCimento\b': 'Cimento', r'\bPedra\b': 'Pedra', r'\bMarmore\b': 'Mármore',
-             r'\bGranito\b': 'Granito', r'\bAreia\b': 'Areia', r'\bTerra\b': 'Terra',
-             r'\bSubstrato\b': 'Substrato', r'\bAdubo\b': 'Adubo', r'\bFertilizante\b': 'Fertilizante',
-             r'\bSemente\b': 'Semente', r'\bMuda\b': 'Muda', r'\bPlanta\b': 'Planta', r'\bFlor\b': 'Flor',
-             r'\bFruta\b': 'Fruta', r'\bLegume\b': 'Legume', r'\bVerdura\b': 'Verdura',
-             r'\bTempero\b': 'Tempero', r'\bErva\b': 'Erva', r'\bCha\b': 'Chá', r'\bCafe\b': 'Café',
-             r'\bAcucar\b': 'Açúcar', r'\bSal\b': 'Sal', r'\bPimenta\b': 'Pimenta', r'\bOleo\b': 'Óleo',
-             r'\bAzeite\b': 'Azeite', r'\bVinagre\b': 'Vinagre', r'\bMolho\b': 'Molho',
-             r'\bConserva\b': 'Conserva', r'\bDoce\b': 'Doce', r'\bBiscoito\b': 'Biscoito',
-             r'\bBolacha\b': 'Bolacha', r'\bBolo\b': 'Bolo', r'\bPao\b': 'Pão', r'\bTorrada\b': 'Torrada',
-             r'\bSnack\b': 'Snack', r'\bPetisco\b': 'Petisco', r'\bOssinho\b': 'Ossinho',
-             r'\bBifinho\b': 'Bifinho', r'\bPalito\b': 'Palito', r'\bSache\b': 'Sachê', r'\bLata\b': 'Lata',
-             r'\bPote\b': 'Pote', r'\bCaixa\b': 'Caixa', r'\bSaco\b': 'Saco', r'\bFardo\b': 'Fardo',
-             r'\bKit\b': 'Kit', r'\bJogo\b': 'Jogo', r'\bConjunto\b': 'Conjunto', r'\bPar\b': 'Par',
-             r'\bUnidade\b': 'Unidade', r'\bPeca\b': 'Peça', r'\bMetro\b': 'Metro', r'\bRolo\b': 'Rolo',
-             r'\bBobina\b': 'Bobina', r'\bCartela\b': 'Cartela', r'\bDisplay\b': 'Display',
-             r'\bBlister\b': 'Blister', r'\bGranel\b': 'Granel', r'\bRefil\b': 'Refil',
-             r'\bReparo\b': 'Reparo', r'\bAcessorio\b': 'Acessório',
-             r'\bPeca De Reposicao\b': 'Peça de Reposição', r'\bManutencao\b': 'Manutenção',
-             r'\bLimpeza\b': 'Limpeza', r'\bHigiene\b': 'Higiene', r'\bBeleza\b': 'Beleza',
-             r'\bSaude\b': 'Saúde', r'\bMedicamento\b': 'Medicamento', r'\bRemedio\b': 'Remédio',
-             r'\bVacina\b': 'Vacina', r'\bVermifugo\b': 'Vermífugo', r'\bAntipulgas\b': 'Antipulgas',
-             r'\bCarrapaticida\b': 'Carrapaticida', r'\bShampoo\b': 'Shampoo',
-             r'\bCondicionador\b': 'Condicionador', r'\bSabonete\b': 'Sabonete', r'\bPerfume\b': 'Perfume',
-             r'\bColonia\b': 'Colônia', r'\bTalco\b': 'Talco', r'\bAreia Sanitaria\b': 'Areia Sanitária',
-             r'\bTapete Higienico\b': 'Tapete Higiênico', r'\bFralda\b': 'Fralda', r'\bBanheiro\b': 'Banheiro',
-             r'\bCaixa De Areia\b': 'Caixa de Areia', r'\bPah\b': 'Pá', r'\bComedouro\b': 'Comedouro',
-             r'\bBebedouro\b': 'Bebedouro', r'\bFonte\b': 'Fonte', r'\bAlimentador\b': 'Alimentador',
-             r'\bColeira\b': 'Coleira', r'\bGuia\b': 'Guia', r'\bPeitoral\b': 'Peitoral',
-             r'\bEnforcador\b': 'Enforcador', r'\bFocinheira\b': 'Focinheira',
-             r'\bIdentificador\b': 'Identificador', r'\bPingente\b': 'Pingente', r'\bRoupa\b': 'Roupa',
-             r'\bCama\b': 'Cama', r'\bColchonete\b': 'Colchonete', r'\bAlmofada\b': 'Almofada',
-             r'\bCobertor\b': 'Cobertor', r'\bManta\b': 'Manta', r'\bToca\b': 'Toca',
-             r'\bCasinha\b': 'Casinha', r'\bGaiola\b': 'Gaiola', r'\bViveiro\b': 'Viveiro',
-             r'\bAquario\b': 'Aquário', r'\bTerrario\b': 'Terrário', r'\bTransporte\b': 'Transporte',
-             r'\bCaixa De Transporte\b': 'Caixa de Transporte', r'\bBolsa\b': 'Bolsa',
-             r'\bMochila\b': 'Mochila', r'\bCarrinho\b': 'Carrinho', r'\bBrinquedo\b': 'Brinquedo',
-             r'\bArranhador\b': 'Arranhador', r'\bTunel\b': 'Túnel', r'\bBolinha\b': 'Bolinha',
-             r'\bCorda\b': 'Corda', r'\bPelucia\b': 'Pelúcia', r'\bLatex\b': 'Látex',
-             r'\bBorracha\b': 'Borracha', r'\bVinil\b': 'Vinil', r'\bTecido\b': 'Tecido',
-             r'\bInterativo\b': 'Interativo', r'\bInteligente\b': 'Inteligente',
-             r'\bEducativo\b': 'Educativo', r'\bAdestramento\b': 'Adestramento',
-             r'\bComportamento\b': 'Comportamento', r'\bAnti-Latido\b': 'Anti-Latido',
-             r'\bAnti-Mordida\b': 'Anti-Mordida', r'\bRepelente\b': 'Repelente', r'\bAtrativo\b': 'Atrativo',
-             r'\bCatnip\b': 'Catnip', r'\bErva De Gato\b': 'Erva de Gato', r'\bGraminha\b': 'Graminha',
-             r'\bPassaro\b': 'Pássaro', r'\bAve\b': 'Ave', r'\bAves\b': 'Aves', r'\bPeixe\b': 'Peixe',
-             r'\bPeixes\b': 'Peixes', r'\bReptil\b': 'Réptil', r'\bRepteis\b': 'Répteis',
-             r'\bRoedor\b': 'Roedor', r'\bRoedores\b': 'Roedores', r'\bCoelho\b': 'Coelho',
-             r'\bCoelhos\b': 'Coelhos', r'\bHamster\b': 'Hamster', r'\bHamsters\b': 'Hamsters',
-             r'\bChinchila\b': 'Chinchila', r'\bChinchilas\b': 'Chinchilas',
-             r'\bPorquinho Da India\b': 'Porquinho da Índia', r'\bFurao\b': 'Furão', r'\bFuroes\b': 'Furões',
-             r'\bCavalo\b': 'Cavalo', r'\bCavalos\b': 'Cavalos', r'\bEquino\b': 'Equino',
-             r'\bEquinos\b': 'Equinos', r'\bBovino\b': 'Bovino', r'\bBovinos\b': 'Bovinos',
-             r'\bSuino\b': 'Suíno', r'\bSuinos\b': 'Suínos', r'\bCaprino\b': 'Caprino',
-             r'\bCaprinos\b': 'Caprinos', r'\bOvino\b': 'Ovino', r'\bOvinos\b': 'Ovinos',
-             r'\bAve De Corte\b': 'Ave de Corte', r'\bAve De Postura\b': 'Ave de Postura',
-             r'\bAbelha\b': 'Abelha', r'\bAbelhas\b': 'Abelhas', r'\bJardim\b': 'Jardim',
-             r'\bJardinagem\b': 'Jardinagem', r'\bPiscina\b': 'Piscina', r'\bCamping\b': 'Camping',
-             r'\bPesca\b': 'Pesca', r'\bLazer\b': 'Lazer', r'\bChurrasco\b': 'Churrasco',
-             r'\bDecoracao\b': 'Decoração', r'\bUtilidade Domestica\b': 'Utilidade Doméstica',
-             r'\bFerramenta\b': 'Ferramenta', r'\bFerragem\b': 'Ferragem',
-             r'\bMaterial De Construcao\b': 'Material de Construção', r'\bEletrica\b': 'Elétrica',
-             r'\bHidraulica\b': 'Hidráulica', r'\bPintura\b': 'Pintura', r'\bAutomotivo\b': 'Automotivo',
-             r'\bAgro\b': 'Agro', r'\bVeterinaria\b': 'Veterinária', r'\bPet Shop\b': 'Pet Shop',
-             r'\bAgropecuaria\b': 'Agropecuária', r'\bFarmacia\b': 'Farmácia', r'\bClinica\b': 'Clínica',
-             r'\bHospital\b': 'Hospital', r'\bLaboratorio\b': 'Laboratório', r'\bIndustria\b': 'Indústria',
-             r'\bComercio\b': 'Comércio', r'\bServico\b': 'Serviço', r'\bEscritorio\b': 'Escritório',
-             r'\bEscola\b': 'Escola', r'\bPapelaria\b': 'Papelaria', r'\bInformatica\b': 'Informática',
-             r'\bEletronico\b': 'Eletrônico', r'\bCelular\b': 'Celular', r'\bTelefone\b': 'Telefone',
-             r'\bAudio\b': 'Áudio', r'\bVideo\b': 'Vídeo', r'\bFoto\b': 'Foto', r'\bGame\b': 'Game',
-             r'\bEsporte\b': 'Esporte', r'\bFitness\b': 'Fitness', r'\bSuplemento\b': 'Suplemento',
-             r'\bVitamina\b': 'Vitamina', r'\bMineral\b': 'Mineral', r'\bProteina\b': 'Proteína',
-             r'\bAminoacido\b': 'Aminoácido', r'\bEmagrecedor\b': 'Emagrecedor',
-             r'\bTermogenico\b': 'Termogênico', r'\bPre-Treino\b': 'Pré-Treino',
-             r'\bPos-Treino\b': 'Pós-Treino', r'\bBarra De Proteina\b': 'Barra de Proteína',
-             r'\bBebida Esportiva\b': 'Bebida Esportiva', r'\bAcessorio Esportivo\b': 'Acessório Esportivo',
-             r'\bRoupa Esportiva\b': 'Roupa Esportiva', r'\bCalcado Esportivo\b': 'Calçado Esportivo',
-             r'\bEquipamento Esportivo\b': 'Equipamento Esportivo', r'\bBicicleta\b': 'Bicicleta',
-             r'\bSkate\b': 'Skate', r'\bPatins\b': 'Patins', r'\bPatinete\b': 'Patinete',
-             r'\bMoto\b': 'Moto', r'\bCarro\b': 'Carro', r'\bCaminhao\b': 'Caminhão',
-             r'\bOnibus\b': 'Ônibus', r'\bTrator\b': 'Trator', r'\bMaquina Agricola\b': 'Máquina Agrícola',
-             r'\bImplemento Agricola\b': 'Implemento Agrícola', r'\bPneu\b': 'Pneu', r'\bRoda\b': 'Roda',
-             r'\bBateria\b': 'Bateria', r'\bOleo Lubrificante\b': 'Óleo Lubrificante',
-             r'\bFiltro De Oleo\b': 'Filtro de Óleo', r'\bFiltro De Ar\b': 'Filtro de Ar',
-             r'\bFiltro De Combustivel\b': 'Filtro de Combustível',
-             r'\bPastilha De Freio\b': 'Pastilha de Freio', r'\bDisco De Freio\b': 'Disco de Freio',
-             r'\bAmortecedor\b': 'Amortecedor', r'\bMola\b': 'Mola', r'\bSuspensao\b': 'Suspensão',
-             r'\bDirecao\b': 'Direção', r'\bEmbreagem\b': 'Embreagem', r'\bCambio\b': 'Câmbio',
-             r'\bMotor\b': 'Motor', r'\bEscapamento\b': 'Escapamento', r'\bCatalisador\b': 'Catalisador',
-             r'\bRadiador\b': 'Radiador', r'\bAr Condicionado\b': 'Ar Condicionado',
-             r'\bVidro Eletrico\b': 'Vidro Elétrico', r'\bTrava Eletrica\b': 'Trava Elétrica',
-             r'\bAlarme\b': 'Alarme', r'\bSom Automotivo\b': 'Som Automotivo', r'\bGps\b': 'GPS',
-             r'\bCamera De Re\b': 'Câmera de Ré', r'\bSensor De Estacionamento\b': 'Sensor de Estacionamento',
-             r'\bFarol\b': 'Farol', r'\bLanterna\b': 'Lanterna', r'\bLampada\b': 'Lâmpada',
-             r'\bEspelho\b': 'Espelho', r'\bRetrovisor\b': 'Retrovisor', r'\bParachoque\b': 'Para-choque',
-             r'\bGrade\b': 'Grade', r'\bCapo\b': 'Capô', r'\bPorta\b': 'Porta',
-             r'\bPorta-Malas\b': 'Porta-Malas', r'\bTeto Solar\b': 'Teto Solar', r'\bBanco\b': 'Banco',
-             r'\bCapa De Banco\b': 'Capa de Banco', r'\bTapete Automotivo\b': 'Tapete Automotivo',
-             r'\bVolante\b': 'Volante', r'\bManopla\b': 'Manopla', r'\bPedaleira\b': 'Pedaleira',
-             r'\bCinto De Seguranca\b': 'Cinto de Segurança', r'\bCadeira De Bebe\b': 'Cadeira de Bebê',
-             r'\bAssento De Elevacao\b': 'Assento de Elevação', r'\bBebe Conforto\b': 'Bebê Conforto',
-             r'\bCarrinho De Bebe\b': 'Carrinho de Bebê', r'\bAndador\b': 'Andador', r'\bBerco\b': 'Berço',
-             r'\bComoda\b': 'Cômoda', r'\bGuarda-Roupa\b': 'Guarda-Roupa', r'\bArmario\b': 'Armário',
-             r'\bEstante\b': 'Estante', r'\bPrateleira\b': 'Prateleira', r'\bNicho\b': 'Nicho',
-             r'\bMesa\b': 'Mesa', r'\bCadeira\b': 'Cadeira', r'\bBanqueta\b': 'Banqueta',
-             r'\bSofa\b': 'Sofá', r'\bPoltrona\b': 'Poltrona', r'\bPuff\b': 'Puff', r'\bRack\b': 'Rack',
-             r'\bPainel\b': 'Painel', r'\bHome Theater\b': 'Home Theater', r'\bTv\b': 'TV',
-             r'\bSmart Tv\b': 'Smart TV', r'\bMonitor\b': 'Monitor', r'\bProjetor\b': 'Projetor',
-             r'\bTela De Projecao\b': 'Tela de Projeção', r'\bSuporte Para Tv\b': 'Suporte para TV',
-             r'\bAntena\b': 'Antena', r'\bReceptor\b': 'Receptor', r'\bConversor\b': 'Conversor',
-             r'\bDvd Player\b': 'DVD Player', r'\bBlu-Ray Player\b': 'Blu-Ray Player',
-             r'\bSoundbar\b': 'Soundbar', r'\bCaixa De Som\b': 'Caixa de Som',
-             r'\bFone De Ouvido\b': 'Fone de Ouvido', r'\bMicrofone\b': 'Microfone',
-             r'\bInstrumento Musical\b': 'Instrumento Musical', r'\bViolao\b': 'Violão',
-             r'\bGuitarra\b': 'Guitarra', r'\bBaixo\b': 'Baixo', r'\bTeclado\b': 'Teclado',
-             r'\bPiano\b': 'Piano', r'\bSopro\b': 'Sopro', r'\bPercussao\b': 'Percussão',
-             r'\bAcessorio Musical\b': 'Acessório Musical', r'\bLivro\b': 'Livro', r'\bRevista\b': 'Revista',
-             r'\bHq\b': 'HQ', r'\bManga\b': 'Mangá', r'\bCd\b': 'CD', r'\bDvd\b': 'DVD',
-             r'\bBlu-Ray\b': 'Blu-Ray', r'\bVinil\b': 'Vinil', r'\bLp\b': 'LP', r'\bFilme\b': 'Filme',
-             r'\bSerie\b': 'Série', r'\bDocumentario\b': 'Documentário', r'\bShow\b': 'Show',
-             r'\bMusica\b': 'Música', r'\bJogo De Videogame\b': 'Jogo de Videogame', r'\bConsole\b': 'Console',
-             r'\bControle\b': 'Controle', r'\bAcessorio Gamer\b': 'Acessório Gamer',
-             r'\bPc Gamer\b': 'PC Gamer', r'\bNotebook Gamer\b': 'Notebook Gamer',
-             r'\bMouse Gamer\b': 'Mouse Gamer', r'\bTeclado Gamer\b': 'Teclado Gamer',
-             r'\bHeadset Gamer\b': 'Headset Gamer', r'\bCadeira Gamer\b': 'Cadeira Gamer',
-             r'\bMesa Gamer\b': 'Mesa Gamer', r'\bMousepad Gamer\b': 'Mousepad Gamer',
-             r'\bStreamer\b': 'Streamer', r'\bYoutuber\b': 'YouTuber', r'\bInfluencer\b': 'Influencer',
-             r'\bCriador De Conteudo\b': 'Criador de Conteúdo', r'\bCamera Fotografica\b': 'Câmera Fotográfica',
-             r'\bFilmadora\b': 'Filmadora', r'\bDrone\b': 'Drone', r'\bTripe\b': 'Tripé',
-             r'\bIluminacao\b': 'Iluminação', r'\bEstudio\b': 'Estúdio', r'\bLente\b': 'Lente',
-             r'\bFlash\b': 'Flash', r'\bCartao De Memoria\b': 'Cartão de Memória',
-             r'\bHd Externo\b': 'HD Externo', r'\bSsd\b': 'SSD', r'\bPen Drive\b': 'Pen Drive',
-             r'\bRoteador\b': 'Roteador', r'\bRepetidor\b': 'Repetidor', r'\bSwitch\b': 'Switch',
-             r'\bModem\b': 'Modem', r'\bCabo De Rede\b': 'Cabo de Rede', r'\bServidor\b': 'Servidor',
-             r'\bNobreak\b': 'Nobreak', r'\bEstabilizador\b': 'Estabilizador',
-             r'\bFiltro De Linha\b': 'Filtro de Linha', r'\bExtensao\b': 'Extensão',
-             r'\bAdaptador\b': 'Adaptador', r'\bHub\b': 'Hub', r'\bDock Station\b': 'Dock Station',
-             r'\bCooler\b': 'Cooler', r'\bFonte De Alimentacao\b': 'Fonte de Alimentação',
-             r'\bGabinete\b': 'Gabinete', r'\bPlaca Mae\b': 'Placa Mãe', r'\bProcessador\b': 'Processador',
-             r'\bMemoria Ram\b': 'Memória RAM', r'\bPlaca De Video\b': 'Placa de Vídeo',
-             r'\bPlaca De Som\b': 'Placa de Som', r'\bPlaca De Rede\b': 'Placa de Rede',
-             r'\bDrive Optico\b': 'Drive Óptico', r'\bLeitor De Cartao\b': 'Leitor de Cartão',
-             r'\bWebcam\b': 'Webcam', r'\bImpressora\b': 'Impressora', r'\bMultifuncional\b': 'Multifuncional',
-             r'\bScanner\b': 'Scanner', r'\bCartucho\b': 'Cartucho', r'\bToner\b': 'Toner',
-             r'\bPapel\b': 'Papel', r'\bEtiqueta\b': 'Etiqueta', r'\bEnvelope\b': 'Envelope',
-             r'\bCaneta\b': 'Caneta', r'\bLapis\b': 'Lápis', r'\bBorracha\b': 'Borracha',
-             r'\bApontador\b': 'Apontador', r'\bRegua\b': 'Régua', r'\bTesoura\b': 'Tesoura',
-             r'\bCola\b': 'Cola', r'\bFita Adesiva\b': 'Fita Adesiva', r'\bGrampeador\b': 'Grampeador',
-             r'\bPerfurador\b': 'Perfurador', r'\bPasta\b': 'Pasta', r'\bArquivo\b': 'Arquivo',
-             r'\bOrganizador\b': 'Organizador', r'\bAgenda\b': 'Agenda', r'\bCaderno\b': 'Caderno',
-             r'\bBloco De Notas\b': 'Bloco de Notas', r'\bPost-It\b': 'Post-it',
-             r'\bQuadro Branco\b': 'Quadro Branco', r'\bMarcador\b': 'Marcador', r'\bApagador\b': 'Apagador',
-             r'\bEstojo\b': 'Estojo', r'\bLancheira\b': 'Lancheira', r'\bGarrafa\b': 'Garrafa',
-             r'\bCopo\b': 'Copo', r'\bCaneca\b': 'Caneca', r'\bTermica\b': 'Térmica',
-             r'\bMarmita\b': 'Marmita', r'\bTalher\b': 'Talher', r'\bPrato\b': 'Prato',
-             r'\bTigela\b': 'Tigela', r'\bJarra\b': 'Jarra', r'\bBule\b': 'Bule',
-             r'\bChaleira\b': 'Chaleira', r'\bCafeteira\b': 'Cafeteira', r'\bLiquidificador\b': 'Liquidificador',
-             r'\bBatedeira\b': 'Batedeira', r'\bProcessador De Alimentos\b': 'Processador de Alimentos',
-             r'\bMixer\b': 'Mixer', r'\bEspremedor\b': 'Espremedor', r'\bSanduicheira\b': 'Sanduicheira',
-             r'\bTorradeira\b': 'Torradeira', r'\bGrill\b': 'Grill', r'\bFritadeira\b': 'Fritadeira',
-             r'\bAir Fryer\b': 'Air Fryer', r'\bPanela Eletrica\b': 'Panela Elétrica',
-             r'\bForno Eletrico\b': 'Forno Elétrico', r'\bMicroondas\b': 'Micro-ondas',
-             r'\bFogao\b': 'Fogão', r'\bCooktop\b': 'Cooktop', r'\bCoifa\b': 'Coifa',
-             r'\bDepurador\b': 'Depurador', r'\bGeladeira\b': 'Geladeira', r'\bRefrigerador\b': 'Refrigerador',
-             r'\bFreezer\b': 'Freezer', r'\bFrigobar\b': 'Frigobar', r'\bAdega\b': 'Adega',
-             r'\bCervejeira\b': 'Cervejeira', r'\bLava-Loucas\b': 'Lava-Louças',
-             r'\bLava-Roupas\b': 'Lava-Roupas', r'\bSecadora\b': 'Secadora', r'\bLava E Seca\b': 'Lava e Seca',
-             r'\bCentrifuga\b': 'Centrífuga', r'\bFerro De Passar\b': 'Ferro de Passar',
-             r'\bVaporizador\b': 'Vaporizador', r'\bAspirador De Po\b': 'Aspirador de Pó',
-             r'\bRobo Aspirador\b': 'Robô Aspirador', r'\bEnceradeira\b': 'Enceradeira',
-             r'\bLavadora De Alta Pressao\b': 'Lavadora de Alta Pressão', r'\bVentilador\b': 'Ventilador',
-             r'\bCirculador De Ar\b': 'Circulador de Ar', r'\bClimatizador\b': 'Climatizador',
-             r'\bAquecedor\b': 'Aquecedor', r'\bDesumidificador\b': 'Desumidificador',
-             r'\bUmidificador\b': 'Umidificador', r'\bPurificador De Ar\b': 'Purificador de Ar',
-             r'\bPurificador De Agua\b': 'Purificador de Água', r'\bFiltro De Agua\b': 'Filtro de Água',
-             r'\bTorneira\b': 'Torneira', r'\bMisturador\b': 'Misturador', r'\bChuveiro\b': 'Chuveiro',
-             r'\bDucha\b': 'Ducha', r'\bAssento Sanitario\b': 'Assento Sanitário',
-             r'\bVaso Sanitario\b': 'Vaso Sanitário', r'\bCuba\b': 'Cuba', r'\bPia\b': 'Pia',
-             r'\bTanque\b': 'Tanque', r'\bBox\b': 'Box', r'\bToalheiro\b': 'Toalheiro',
-             r'\bSaboneteira\b': 'Saboneteira', r'\bPapeleira\b': 'Papeleira', r'\bCabide\b': 'Cabide',
-             r'\bGancho\b': 'Gancho', r'\bLixeira\b': 'Lixeira', r'\bCesto\b': 'Cesto',
-             r'\bBalde\b': 'Balde', r'\bBacia\b': 'Bacia', r'\bVassoura\b': 'Vassoura',
-             r'\bRodo\b': 'Rodo', r'\bEscova\b': 'Escova', r'\bEsponja\b': 'Esponja',
-             r'\bPano\b': 'Pano', r'\bFlanela\b': 'Flanela', r'\bAvental\b': 'Avental',
-             r'\bTouca\b': 'Touca', r'\bMascara\b': 'Máscara', r'\bOculos\b': 'Óculos',
-             r'\bProtetor Auricular\b': 'Protetor Auricular', r'\bCapacete\b': 'Capacete',
-             r'\bBota\b': 'Bota', r'\bSapato\b': 'Sapato', r'\bTenis\b': 'Tênis',
-             r'\bChinelo\b': 'Chinelo', r'\bSandalia\b': 'Sandália', r'\bSapatilha\b': 'Sapatilha',
-             r'\bMeia\b': 'Meia', r'\bCalca\b': 'Calça', r'\bBermuda\b': 'Bermuda',
-             r'\bShort\b': 'Short', r'\bSaia\b': 'Saia', r'\bVestido\b': 'Vestido',
-             r'\bCamisa\b': 'Camisa', r'\bCamiseta\b': 'Camiseta', r'\bBlusa\b': 'Blusa',
-             r'\bCasaco\b': 'Casaco', r'\bJaqueta\b': 'Jaqueta', r'\bMoletom\b': 'Moletom',
-             r'\bSueter\b': 'Suéter', r'\bColete\b': 'Colete', r'\bTerno\b': 'Terno',
-             r'\bGravata\b': 'Gravata', r'\bCinto\b': 'Cinto', r'\bBone\b': 'Boné',
-             r'\bChapeu\b': 'Chapéu', r'\bGorro\b': 'Gorro', r'\bCachecol\b': 'Cachecol',
-             r'\bRelogio\b': 'Relógio', r'\bOculos De Sol\b': 'Óculos de Sol', r'\bJoia\b': 'Joia',
-             r'\bBijuteria\b': 'Bijuteria', r'\bAnel\b': 'Anel', r'\bBrinco\b': 'Brinco',
-             r'\bColar\b': 'Colar', r'\bPulseira\b': 'Pulseira', r'\bTornozeleira\b': 'Tornozeleira',
-             r'\bPiercing\b': 'Piercing', r'\bAlianca\b': 'Aliança', r'\bOuro\b': 'Ouro',
-             r'\bPrata\b': 'Prata', r'\bBronze\b': 'Bronze', r'\bAco\b': 'Aço',
-             r'\bTitanio\b': 'Titânio', r'\bPedra Preciosa\b': 'Pedra Preciosa',
-             r'\bDiamante\b': 'Diamante', r'\bRubi\b': 'Rubi', r'\bEsmeralda\b': 'Esmeralda',
-             r'\bSafira\b': 'Safira', r'\bPerola\b': 'Pérola', r'\bZirconia\b': 'Zircônia',
-             r'\bReligioso\b': 'Religioso', r'\bEsoterico\b': 'Esotérico', r'\bMistico\b': 'Místico',
-             r'\bArtesanato\b': 'Artesanato', r'\bFeito A Mao\b': 'Feito à Mão',
-             r'\bPersonalizado\b': 'Personalizado', r'\bPresente\b': 'Presente',
-             r'\bLembrancinha\b': 'Lembrancinha', r'\bFesta\b': 'Festa',
-             r'\bAniversario\b': 'Aniversário', r'\bCasamento\b': 'Casamento',
-             r'\bBatizado\b': 'Batizado', r'\bCha De Bebe\b': 'Chá de Bebê',
-             r'\bCha De Cozinha\b': 'Chá de Cozinha', r'\bCha Bar\b': 'Chá Bar',
-             r'\bDespedida De Solteiro\b': 'Despedida de Solteiro', r'\bFormatura\b': 'Formatura',
-             r'\bNatal\b': 'Natal', r'\bAno Novo\b': 'Ano Novo', r'\bPascoa\b': 'Páscoa',
-             r'\bDia Das Maes\b': 'Dia das Mães', r'\bDia Dos Pais\b': 'Dia dos Pais',
-             r'\bDia Dos Namorados\b': 'Dia dos Namorados', r'\bDia Das Criancas\b': 'Dia das Crianças',
-             r'\bBlack Friday\b': 'Black Friday', r'\bPromocao\b': 'Promoção', r'\bOferta\b': 'Oferta',
-             r'\bDesconto\b': 'Desconto', r'\bLiquidação\b': 'Liquidação', r'\bSaldão\b': 'Saldão',
-             r'\bOutlet\b': 'Outlet', r'\bLancamento\b': 'Lançamento', r'\bNovidade\b': 'Novidade',
-             r'\bExclusivo\b': 'Exclusivo', r'\bLimitado\b': 'Limitado', r'\bEspecial\b': 'Especial',
-             r'\bPremium\b': 'Premium', r'\bLuxo\b': 'Luxo', r'\bBasico\b': 'Básico',
-             r'\bEssencial\b': 'Essencial', r'\bPadrao\b': 'Padrão', r'\bSimples\b': 'Simples',
-             r'\bComposto\b': 'Composto', r'\bMisto\b': 'Misto', r'\bSortido\b': 'Sortido',
-             r'\bVariado\b': 'Variado', r'\bDiverso\b': 'Diverso', r'\bOutro\b': 'Outro',
-             r'\bAd\b': 'Adulto', r'\bPq\b': 'Pequeno', r'\bMd\b': 'Médio', r'\bGd\b': 'Grande',
-             r'\bFil\b': 'Filhote', r'\bCast\b': 'Castrado', r'\bLig\b': 'Light', r'\bSen\b': 'Sênior',
-             r'\bSenior\b': 'Sênior', r'\bRmg\b': 'Raças Médias e Grandes', r'\bRp\b': 'Raças Pequenas',
-             r'\bNat\.\b': 'Natural', r'\bNat\b': 'Natural', r'\bSel\.\b': 'Seleção',
-             r'\bSelecao\b': 'Seleção', r'\bPrem\b': 'Premium', r'\bEsp\b': 'Especial',
-             r'\bMin\b': 'Mini', r'\bGig\b': 'Gigante', r'\bPed\b': 'Pedaços', r'\bMol\b': 'Molho',
-             r'\bSach\b': 'Sachê', r'\bFrg\b': 'Frango', r'\bVeg\b': 'Vegetais',
-             r'\bCord\b': 'Cordeiro', r'\bSalm\b': 'Salmão', r'\bArr\b': 'Arroz', r'\bBat\b': 'Batata'
-        }
+        # Quais SKUs têm imagem; muda sem precisar reler o CSV
+        self.image_index = ImageIndex(images_folder) if images_folder else None
+        self._images_version = None
+        # Incrementada a cada reprocessamento (chave dos caches de resposta)
+        self.version = 0
+        # Protege a troca do catálogo (reprocessamento, upload novo, imagens)
+        self._lock = threading.RLock()
+        # Só um thread relê o CSV por vez; os outros seguem com o catálogo anterior
+        self._rebuild_lock = threading.Lock()
+        self.rebuild_stats = {'hits': 0, 'rebuilds': 0, 'served_stale': 0, 'waited': 0,
+                              'last_seconds': 0.0, 'max_seconds': 0.0, 'total_seconds': 0.0}
+
+        # Memo por linha: linhas brutas iguais reaproveitam o produto já enriquecido
+        self._row_memo = LRUCache(row_memo_size)
+        self.last_run_stats = {'rows': 0, 'reused': 0, 'enriched': 0}
+
+        # Descrições geradas sob demanda, por conteúdo do produto (nome, categoria, marca, peso)
+        self._description_memo = LRUCache(description_memo_size)
+
+        # Valores derivados do catálogo (índices, estatísticas), um por versão
+        self._derived = {}
+
+        # Dialeto detectado (por versão do arquivo) e como a última leitura foi feita
+        # (versão, dialeto) em uma tupla só: trocada de uma vez, nunca pela metade
+        self._dialect_cache = None
+        self.last_read_info = {}
+        
+        # Tabelas de regras (do módulo) e seus motores compilados, compartilhados no processo
+        self.marcas_conhecidas = MARCAS_CONHECIDAS
+        self.replacements = REPLACEMENTS
+        self.normalizer, self.brand_matcher, self.weight_extractor = compiled_rules()
 
     def process(self):
+        return self.current()[0]
+
+    def current(self):
+        """(catálogo atual, versão), lidos juntos.
+
+        Quem guarda algo derivado do catálogo sob a versão (cache de respostas)
+        usa este par: um upload ou uma imagem nova entre duas leituras
+        separadas faria os dados novos ficarem com a versão antiga.
+        """
         if not os.path.exists(self.file_path):
-            return []
+            return [], self.version
         
         # Cache Check
         try:
             mtime = os.path.getmtime(self.file_path)
-            if self._cache is not None and self._last_mtime == mtime:
-                return self._cache
+            if self._base is not None and self._last_mtime == mtime:
+                self.rebuild_stats['hits'] += 1
+                return self._apply_images()
         except:
             pass
 
+        # Um só reprocessamento por versão do arquivo (single-flight)
+        if self._rebuild_lock.acquire(blocking=False):
+            try:
+                self._rebuild()
+            finally:
+                self._rebuild_lock.release()
+            return self._apply_images()
+
+        if self._base is not None:
+            # Outro thread já está reprocessando: serve o catálogo anterior
+            self.rebuild_stats['served_stale'] += 1
+            return self._apply_images()
+
+        # Ainda não há catálogo: espera o reprocessamento em andamento
+        self.rebuild_stats['waited'] += 1
+        with self._rebuild_lock:
+            pass
+        if self._base is None:
+            return self.current()
+        return self._apply_images()
+
+    def _rebuild(self):
+        """Relê o arquivo atual e instala o catálogo novo (chamado com _rebuild_lock)"""
+        # Outro thread pode ter reprocessado (ou trocado o arquivo) enquanto esperávamos
+        mtime = os.path.getmtime(self.file_path)
+        if self._base is not None and self._last_mtime == mtime:
+            return
+
+        started = time.perf_counter()
+        data = self.load(self.file_path)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            # Um upload trocado durante a leitura (swap) já instalou algo mais novo
+            if self._base is None or self._last_mtime != os.path.getmtime(self.file_path):
+                self._base = data
+                self._last_mtime = mtime
+                self._current = None
+
+        stats = self.rebuild_stats
+        stats['rebuilds'] += 1
+        stats['last_seconds'] = round(elapsed, 4)
+        stats['max_seconds'] = max(stats['max_seconds'], stats['last_seconds'])
+        stats['total_seconds'] = round(stats['total_seconds'] + elapsed, 4)
+
+    def rules_fingerprint(self):
+        """Identifica as regras de enriquecimento (mudou a regra, o snapshot antigo não serve)"""
+        rules = json.dumps([RULES_VERSION, self.marcas_conhecidas, self.replacements],
+                           sort_keys=True, ensure_ascii=False)
+        return hashlib.blake2b(rules.encode('utf-8'), digest_size=8).hexdigest()
+
+    def load(self, path, progress=None):
+        """Catálogo de um CSV sem mexer no catálogo em uso.
+
+        Com snapshots, o CSV só é lido e enriquecido por um processo: os demais
+        (e os reinícios) mapeiam a versão gravada em disco.
+        """
+        if self.snapshots is None:
+            return self.parse(path, progress)
+
+        with stage('snapshot_key'):
+            key = self.snapshots.key_for(path, self.rules_fingerprint())
+        with stage('snapshot_load'):
+            data = self.snapshots.load(key, self.describe)
+        if data is None:
+            with self.snapshots.building(key):
+                # Quem esperou a trava encontra a versão pronta
+                data = self.snapshots.load(key, self.describe)
+                if data is None:
+                    data = self.parse(path, progress)
+                    if not isinstance(data, ProductStore) or not len(data):
+                        return data
+                    with stage('snapshot_save'):
+                        self.snapshots.save(key, data, self.last_read_info)
+                        # Recarrega mapeado: a memória passa a ser a página compartilhada
+                        saved = self.snapshots.load(key, self.describe)
+                    if saved is None:
+                        # Versão não gravada ou já removida: segue com o que foi lido
+                        # (last_read_info continua o da leitura)
+                        return data
+                    data = saved
+        self.last_read_info = data.read_info
+        return data
+
+    def parse(self, path, progress=None):
+        """Lê e enriquece um CSV (padrão ou bruto)"""
         try:
-            # Tenta ler como CSV padrão primeiro
-            df = pd.read_csv(self.file_path, nrows=5, sep=None, engine='python', encoding='utf-8', on_bad_lines='skip')
-            if 'SKU' in df.columns and 'Name' in df.columns:
-                data = self.process_standard_csv()
-            else:
-                data = self.process_raw_csv()
-            
-            # Update Cache
-            self._cache = data
-            self._last_mtime = mtime
-            return data
+            # Detecta formato e separador uma vez, a partir do início do arquivo
+            dialect = self.detect_dialect(path)
+            if dialect['format'] == 'standard':
+                return self.process_standard_csv(path)
+            return self.process_raw_csv(path, progress)
         except:
-            data = self.process_raw_csv()
-            self._cache = data
-            self._last_mtime = mtime
-            return data
+            return self.process_raw_csv(path, progress)
 
-    def process_standard_csv(self):
+    def validate(self, path):
+        """Confere se o arquivo parece um CSV de estoque; devolve a mensagem de erro ou None"""
         try:
-            df = pd.read_csv(self.file_path, sep=None, engine='python', dtype=str)
-            df = df.fillna('')
+            if os.path.getsize(path) == 0:
+                return 'Arquivo vazio'
+            dialect = self.detect_dialect(path)
+            if dialect['format'] == 'standard':
+                return None
+            rows = self.iter_raw_rows(path)
+            try:
+                first = next(rows, None)
+            finally:
+                rows.close()
+            if first is None:
+                return 'Nenhum produto encontrado no arquivo (cabeçalho "Valor Custo" ausente?)'
+            return None
+        except Exception as e:
+            return f'Arquivo ilegível: {e}'
+
+    def swap(self, source, data):
+        """Coloca `source` (já lido em `data`) no lugar do arquivo atual, de forma atômica.
+
+        Quem pedir o catálogo durante a troca recebe o anterior ou o novo, nunca
+        um arquivo pela metade nem um reprocessamento.
+        """
+        with self._lock:
+            os.replace(source, self.file_path)
+            self._base = data
+            self._last_mtime = os.path.getmtime(self.file_path)
+            self._current = None
+            return self.apply_images()
+
+    def warm(self):
+        """Monta o catálogo e os valores derivados (índice, estatísticas) antes do primeiro acesso"""
+        data = self.process()
+        if isinstance(data, ProductStore):
+            index = self.get_index(data)
+            with stage('index_warm'):
+                index.warm()
+            stats = self._stats_for(data)
+            stats.summary()
+            stats.dashboard()
+            # Próximo reinício (ou outro worker) carrega índice e estatísticas prontos do disco
+            location = self._derived_location(data)
+            if location is not None:
+                for name, value in (('index', index), ('stats', stats)):
+                    try:
+                        self.snapshots.save_derived(location[0], name, location[1], value)
+                    except Exception as e:
+                        print(f"Erro ao gravar {name} no snapshot: {e}")
+        return data
+
+    def apply_images(self):
+        """Catálogo atual com has_image e imagens primeiro.
+
+        Refeito a partir do catálogo já lido só quando o índice de imagens muda
+        (upload ou alteração na pasta); o CSV não é relido.
+        """
+        return self._apply_images()[0]
+
+    def _apply_images(self):
+        # O par (catálogo, versão) é trocado de uma vez: quem o leu tem sempre os dois da mesma versão
+        images_version = None
+        if self.image_index is not None and isinstance(self._base, ProductStore):
+            images_version = self.image_index.refresh()
+
+        current = self._current
+        if current is None or self._images_version != images_version:
+            with self._lock:
+                if self._current is None or self._images_version != images_version:
+                    base = self._base
+                    if images_version is None or not isinstance(base, ProductStore):
+                        data = base
+                    else:
+                        with stage('images'):
+                            data = base.with_images(self.image_index.versions(base.sku))
+                    self._images_version = images_version
+                    self.version += 1
+                    self._current = (data, self.version)
+                current = self._current
+        return current
+
+    def derived(self, name, builder, data=None):
+        """Valor derivado do catálogo (o atual, se `data` não for passado), calculado uma vez por versão"""
+        if data is None:
+            data = self.process()
+        entry = self._derived.get(name)
+        if entry is None or entry[0] is not data:
+            with stage(name):
+                entry = (data, builder(data))
+            self._derived[name] = entry
+        return entry[1]
+
+    def get_index(self, data=None):
+        return self.derived('index', lambda data: self._restored('index', CatalogIndex, data), data)
+
+    def _derived_location(self, data):
+        """(snapshot, disposição) onde os derivados de `data` ficam em disco.
+
+        A disposição junta as imagens e o limite de estoque baixo: mudar
+        qualquer um dos dois remonta (e regrava) índice e estatísticas.
+        """
+        if self.snapshots is None or not isinstance(data, ProductStore):
+            return None
+        key = data.read_info.get('snapshot')
+        if key is None:
+            return None
+        return key, f"{data.read_info.get('image_layout', 'base')}-{self.low_stock_threshold}"
+
+    def _restored(self, name, cls, data):
+        """Valor derivado gravado junto do snapshot de `data` ou, se não houver, montado agora"""
+        location = self._derived_location(data)
+        if location is not None:
+            value = self.snapshots.load_derived(location[0], name, location[1])
+            if isinstance(value, cls):
+                if isinstance(value, CatalogIndex):
+                    # O índice é gravado sem o catálogo
+                    value.products = data
+                return value
+        return cls(data, self.low_stock_threshold)
+
+    def detect_dialect(self, path=None):
+        """Detecta encoding, separador e formato (padrão ou bruto do ERP).
+
+        Lê só os primeiros bytes do arquivo; o resultado fica em cache por
+        versão do arquivo (caminho + mtime + tamanho).
+        """
+        path = path or self.file_path
+        stat = os.stat(path)
+        version = (path, stat.st_mtime, stat.st_size)
+        cached = self._dialect_cache
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        started = time.perf_counter()
+        with open(path, 'rb') as f:
+            prefix = f.read(DIALECT_SAMPLE_SIZE)
+
+        try:
+            text = prefix.decode('utf-8-sig')
+            encoding = 'utf-8-sig' if prefix.startswith(codecs.BOM_UTF8) else 'utf-8'
+        except UnicodeDecodeError as e:
+            if e.start >= len(prefix) - 3 and len(prefix) == DIALECT_SAMPLE_SIZE:
+                # Caractere multibyte cortado no fim da amostra
+                text = prefix[:e.start].decode('utf-8-sig')
+                encoding = 'utf-8-sig' if prefix.startswith(codecs.BOM_UTF8) else 'utf-8'
+            else:
+                text = prefix.decode('cp1252', errors='replace')
+                encoding = 'cp1252'
+
+        first_line = text.splitlines()[0] if text else ''
+        try:
+            delimiter = csv.Sniffer().sniff(first_line, delimiters=',;\t|').delimiter
+        except csv.Error:
+            delimiter = ','
+
+        header = next(csv.reader([first_line], delimiter=delimiter), [])
+        is_standard = 'SKU' in header and 'Name' in header
+
+        dialect = {
+            'format': 'standard' if is_standard else 'raw',
+            'delimiter': delimiter,
+            'encoding': encoding,
+            'columns': header if is_standard else []
+        }
+        self._dialect_cache = (version, dialect)
+        STAGE_SECONDS.labels('detect').observe(time.perf_counter() - started)
+        return dialect
+
+    def process_standard_csv(self, path=None):
+        # pandas só é importado quando um CSV padrão é lido de fato (a subida não paga o import)
+        import pandas as pd
+
+        path = path or self.file_path
+        try:
+            dialect = self.detect_dialect(path)
+            usecols = [col for col in dialect['columns'] if col in self.target_columns]
+
+            df = None
+            with stage('read_standard'):
+                for engine in CSV_ENGINES:
+                    try:
+                        # Materializa só as colunas usadas pelo sistema
+                        df = pd.read_csv(path, sep=dialect['delimiter'], encoding=dialect['encoding'],
+                                         engine=engine, dtype=str, usecols=usecols)
+                        break
+                    except Exception as e:
+                        if engine == CSV_ENGINES[-1]:
+                            raise
+                        print(f"Leitura com engine '{engine}' falhou, tentando a próxima: {e}")
+                df = df.fillna('')
             
             # Garante colunas
             for col in self.target_columns:
                 if col not in df.columns:
                     df[col] = ''
             
-            data = df.to_dict(orient='records')
-            return self.finalize_data(data)
+            self.last_read_info = {'format': 'standard', 'engine': engine,
+                                   'delimiter': dialect['delimiter'], 'encoding': dialect['encoding']}
+            builder = ProductStoreBuilder(self.describe)
+            with stage('records_standard'):
+                for record in df.to_dict(orient='records'):
+                    builder.add_record(record)
+            ROWS.labels('standard').inc(len(builder))
+            return self.finalize_data(builder)
         except Exception as e:
             print(f"Erro ao processar CSV padrão: {e}")
             return []
 
-    def process_raw_csv(self):
-        data = []
+    def process_raw_csv(self, path=None, progress=None):
+        """Lê o CSV bruto; progress(linhas) é chamado a cada PROGRESS_INTERVAL linhas"""
+        path = path or self.file_path
         try:
-            with open(self.file_path, 'r', encoding='utf-8', errors='replace') as f:
-                # Lê todas as linhas
-                lines = f.readlines()
-                
+            hits_before = self._row_memo.hits
+            misses_before = self._row_memo.misses
+
+            builder = ProductStoreBuilder(self.describe)
+            # Leitura e enriquecimento andam juntos (streaming); os passos do
+            # enriquecimento aparecem em estoque_enrich_seconds_total
+            with stage('read_raw'):
+                if self.parallel:
+                    products = self.enrich_rows_parallel(self.iter_raw_rows(path))
+                else:
+                    products = self.iter_raw_products(path)
+                for fields in products:
+                    builder.add_fields(*fields)
+                    if progress is not None and len(builder) % PROGRESS_INTERVAL == 0:
+                        progress(len(builder))
+            if progress is not None:
+                progress(len(builder))
+            ROWS.labels('raw').inc(len(builder))
+            self.last_read_info = {'format': 'raw', 'engine': 'stream',
+                                   'delimiter': ',', 'encoding': self._raw_encoding(path)}
+
+            self.last_run_stats = {
+                'rows': len(builder),
+                'reused': self._row_memo.hits - hits_before,
+                'enriched': self._row_memo.misses - misses_before
+            }
+            return self.finalize_data(builder)
+
+        except Exception as e:
+            print(f"Erro ao processar CSV bruto: {e}")
+            return []
+
+    def iter_raw_products(self, path=None):
+        """Gera os campos enriquecidos (enrich_fields) do CSV bruto, um por linha"""
+        for sku_raw, desc_raw, stock_raw, price_raw, cost_raw, category in self.iter_raw_rows(path):
+            # Processamento Inteligente (reaproveita linhas que não mudaram)
+            yield self.enrich_row(sku_raw, desc_raw, stock_raw, price_raw, cost_raw, category)
+
+    def iter_raw_rows(self, path=None):
+        """Lê o CSV bruto do ERP em streaming e gera os campos de cada produto.
+
+        O arquivo é percorrido uma vez só, sem carregar todas as linhas em memória.
+        """
+        path = path or self.file_path
+        with open(path, 'r', encoding=self._raw_encoding(path), errors='replace') as f:
             # Encontra a linha de cabeçalho
-            header_index = -1
-            for i, line in enumerate(lines):
+            header_line = None
+            for line in f:
                 if 'Valor Custo' in line:
-                    header_index = i
+                    header_line = line
                     break
-            
-            if header_index == -1:
+
+            if header_line is None:
                 print("Cabeçalho 'Valor Custo' não encontrado")
-                return []
+                return
 
             # Processa as linhas a partir do cabeçalho
             # Usa csv reader para lidar com aspas e separadores
-            reader = csv.reader(lines[header_index:], delimiter=',')
-            rows = list(reader)
-            
-            if not rows:
-                return []
+            records = _iter_csv_records(itertools.chain([header_line], f))
 
             # Usa a primeira linha para descobrir índices
-            header_row = rows[0]
-            try:
-                # Procura 'Valor Custo' para referência
-                idx_custo_header = -1
-                for i, col in enumerate(header_row):
-                    if 'Valor Custo' in col:
-                        idx_custo_header = i
-                        break
-                
-                if idx_custo_header == -1:
-                    return []
-            except ValueError:
-                return []
+            header_row, header_text = next(records, ([], ''))
+
+            # Procura 'Valor Custo' para referência
+            idx_custo_header = -1
+            for i, col in enumerate(header_row):
+                if 'Valor Custo' in col:
+                    idx_custo_header = i
+                    break
+
+            if idx_custo_header == -1:
+                return
 
             # Mapeamento baseado no JS:
             # Assumimos que o SKU está logo após 'Valor Custo'
             start_idx = idx_custo_header + 1
-            
+
             # Verifica se a primeira linha é cabeçalho ou dados
             # Se o valor no start_idx parecer um cabeçalho (ex: "SKU", "Código"), pulamos a linha
             first_val = header_row[start_idx] if len(header_row) > start_idx else ""
             is_header = first_val.lower() in ['sku', 'código', 'codigo', 'code']
-            
-            start_processing_idx = 1 if is_header else 0
-            
-            for row in rows[start_processing_idx:]:
+
+            if not is_header:
+                records = itertools.chain([(header_row, header_text)], records)
+
+            for row, text in records:
                 if len(row) < start_idx + 6:
                     continue
-                
-                # Extrai categoria do departamento se houver
-                category = "Geral"
-                for col in row:
-                    # Procura por "Departamento:" em qualquer parte da string da coluna
-                    if 'Departamento' in col and ':' in col:
-                        parts = col.split(':', 1)
-                        if parts[0].strip() == 'Departamento':
-                            category = parts[1].strip()
-                            break
-                
+
                 sku_raw = row[start_idx]
                 desc_raw = row[start_idx + 1]
-                stock_raw = row[start_idx + 2]
-                price_raw = row[start_idx + 4]
-                cost_raw = row[start_idx + 5]
-                
+
                 if not sku_raw or not desc_raw:
                     continue
 
-                # Processamento Inteligente
-                processed_item = self.create_smart_product(sku_raw, desc_raw, stock_raw, price_raw, cost_raw, category)
-                data.append(processed_item)
+                # Extrai categoria do departamento se houver.
+                # Só percorre as colunas quando o texto bruto da linha cita "Departamento"
+                category = "Geral"
+                if '"' in text:
+                    text = text.replace('"', '')
+                if 'Departamento' in text:
+                    for col in row:
+                        # Procura por "Departamento:" em qualquer parte da string da coluna
+                        if 'Departamento' in col and ':' in col:
+                            parts = col.split(':', 1)
+                            if parts[0].strip() == 'Departamento':
+                                category = parts[1].strip()
+                                break
 
-            return self.finalize_data(data)
+                yield sku_raw, desc_raw, row[start_idx + 2], row[start_idx + 4], row[start_idx + 5], category
 
-        except Exception as e:
-            print(f"Erro ao processar CSV bruto: {e}")
-            return []
+    def _raw_encoding(self, path=None):
+        # Exportações do ERP costumam ser UTF-8; cp1252 só se a detecção indicar
+        try:
+            if self.detect_dialect(path)['encoding'] == 'cp1252':
+                return 'cp1252'
+        except OSError:
+            pass
+        return 'utf-8'
 
-    def create_smart_product(self, sku, name, stock, price, cost, category):
-        # Limpeza básica
-        sku = str(sku).strip()
-        name = str(name).strip()
-        
-        # Fix Text (Correções de nome)
+    def enrich_rows_parallel(self, rows):
+        """Enriquece as linhas em um pool de processos, mantendo a ordem original.
+
+        As linhas são consumidas em blocos de chunk_size, conforme chegam: só as
+        primeiras min_parallel_rows ficam guardadas para decidir o caminho.
+        Arquivos pequenos (ou um único worker) seguem pelo caminho serial.
+        """
+        rows = iter(rows)
+        if self.workers <= 1:
+            for row in rows:
+                yield self.enrich_row(*row)
+            return
+        head = list(itertools.islice(rows, self.min_parallel_rows))
+        if len(head) < self.min_parallel_rows:
+            for row in head:
+                yield self.enrich_row(*row)
+            return
+
+        def submit(executor, chunk):
+            # Só as linhas que não estão no memo vão para o pool
+            keys = [_row_key(row) for row in chunk]
+            items = [self._row_memo.get(key) for key in keys]
+            missing = [i for i, item in enumerate(items) if item is None]
+            future = executor.submit(_enrich_chunk, [chunk[i] for i in missing]) if missing else None
+            return keys, items, missing, future
+
+        def collect(keys, items, missing, future):
+            if future is not None:
+                for i, item in zip(missing, future.result()):
+                    items[i] = item
+                    self._row_memo.put(keys[i], item)
+            return items
+
+        rows = itertools.chain(head, rows)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            # Até dois blocos por worker em andamento: a leitura não corre à frente do pool
+            pending = []
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                pending.append(submit(executor, chunk))
+                if len(pending) >= self.workers * 2:
+                    yield from collect(*pending.pop(0))
+            for entry in pending:
+                yield from collect(*entry)
+
+    def enrich_row(self, sku, name, stock, price, cost, category):
+        # Chave: hash dos campos brutos da linha
+        key = _row_key((sku, name, stock, price, cost, category))
+
+        item = self._row_memo.get(key)
+        if item is None:
+            item = self.enrich_fields(sku, name, stock, price, cost, category)
+            self._row_memo.put(key, item)
+        return item
+
+    def cache_stats(self):
+        return {
+            'row_memo': self._row_memo.stats(),
+            'descriptions': self._description_memo.stats(),
+            'snapshots': self.snapshots.stats() if self.snapshots is not None else None,
+            'rebuilds': self.rebuild_stats,
+            'last_run': self.last_run_stats
+        }
+
+    def _timed_rules(self, name, category):
+        """As mesmas regras de enrich_fields, cronometradas por passo (linha amostrada)"""
+        started = time.perf_counter()
         name = self.fix_text(name, category)
         category = self.fix_text(category)
-        
-        # Detecção de Marca e Peso
+        fixed = time.perf_counter()
         brand = self.detect_brand(name)
+        detected = time.perf_counter()
         weight = self.extract_weight(name)
+        _FIX_TEXT_SECONDS.inc((fixed - started) * ENRICH_SAMPLE_RATE)
+        _BRAND_SECONDS.inc((detected - fixed) * ENRICH_SAMPLE_RATE)
+        _WEIGHT_SECONDS.inc((time.perf_counter() - detected) * ENRICH_SAMPLE_RATE)
+        return name, category, brand, weight
+
+    def enrich_fields(self, sku, name, stock, price, cost, category):
+        """Campos enriquecidos de uma linha do ERP, sem as descrições.
+
+        Devolve (sku, nome, categoria, marca, estoque, preço, custo, peso), com
+        os números já arredondados como aparecem no catálogo (peso NaN quando
+        não detectado).
+        """
+        # Limpeza básica
+        sku = str(sku).strip()
+        name = str(name).strip()
         
-        # Se não detectou marca, tenta usar a categoria se ela parecer uma marca (opcional, mas ajuda visualmente)
-        # Mas o usuário pediu para corrigir a categoria, então vamos focar nisso.
+        if next(_enrich_ticks) % ENRICH_SAMPLE_RATE == 0:
+            name, category, brand, weight = self._timed_rules(name, category)
+        else:
+            # Fix Text (Correções de nome)
+            name = self.fix_text(name, category)
+            category = self.fix_text(category)
+
+            # Detecção de Marca e Peso
+            brand = self.detect_brand(name)
+            weight = self.extract_weight(name)
         
         # Formatação de Preços
         try:
@@ -470,30 +968,53 @@ class StockProcessor:
         except:
             stock_val = 0
 
+        return (
+            sku, name, category, brand if brand else '',
+            float(stock_val), float(f"{price_val:.2f}"), float(f"{cost_val:.2f}"),
+            float(weight) if weight else math.nan
+        )
+
+    def create_smart_product(self, sku, name, stock, price, cost, category):
+        sku, name, category, brand, stock_val, price_val, cost_val, weight_val = \
+            self.enrich_fields(sku, name, stock, price, cost, category)
+        weight = '' if math.isnan(weight_val) else f"{weight_val:.3f}"
+
         # Gera Descrições
-        short_desc = self.generate_short_description(name, category, brand)
-        full_desc = self.generate_full_description(name, category, price_val, brand, weight)
+        full_desc, short_desc = self.describe(name, category, brand, weight)
         
         return {
             'SKU': sku,
             'Name': name,
             'Regular price': f"{price_val:.2f}",
             'Categories': category,
-            'Meta: _marca': brand if brand else '',
-            'Stock': str(stock_val),
+            'Meta: _marca': brand,
+            'Stock': str(int(stock_val)),
             'Description': full_desc,
             'Short description': short_desc,
-            'Weight (kg)': weight if weight else '',
+            'Weight (kg)': weight,
             'Meta: _custo': f"{cost_val:.2f}"
         }
 
+    def describe(self, name, category, brand, weight):
+        """(descrição completa, descrição curta) geradas a partir dos campos.
+
+        Chamado só quando alguém pede as descrições; o resultado fica no memo
+        enquanto o produto não mudar.
+        """
+        key = (name, category, brand, weight)
+        descriptions = self._description_memo.get(key)
+        if descriptions is None:
+            descriptions = (self.generate_full_description(name, category, None, brand, weight),
+                            self.generate_short_description(name, category, brand))
+            self._description_memo.put(key, descriptions)
+        return descriptions
+
     def fix_text(self, text, category=""):
         if not isinstance(text, str):
             return text
         
-        # Aplica substituições regex
-        for pattern, replacement in self.replacements.items():
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+        # Aplica substituições regex (somente as regras que podem casar)
+        text = self.normalizer.normalize(text)
             
         # Capitalização (Title Case simples)
         if text:
@@ -503,107 +1024,12 @@ class StockProcessor:
 
     def detect_brand(self, name):
         if not name: return None
-        name_lower = name.lower()
-        
-        # 1. Busca exata/regex
-        for key, value in self.marcas_conhecidas.items():
-            # Tenta encontrar a marca com word boundaries
-            if re.search(r'\b' + re.escape(key) + r'\b', name_lower):
-                return value
-        
-        # 2. Busca relaxada (se não encontrou com boundary)
-        # Útil para casos onde a marca está colada em outra palavra ou pontuação estranha
-        for key, value in self.marcas_conhecidas.items():
-            if key in name_lower:
-                # Verifica se não é parte de outra palavra comum (ex: "pet" em "tapete")
-                # Mas como as chaves são marcas específicas, o risco é menor.
-                # Evita falsos positivos curtos
-                if len(key) > 3: 
-                    return value
-                    
-        return None
-
-    def get_product_history(self, sku):
-        """Recupera histórico de preços dos backups"""
-        history = []
-        try:
-            backups_dir = os.path.join(os.path.dirname(self.file_path), 'backups')
-            if not os.path.exists(backups_dir):
-                return []
-            
-            # Pega os últimos 10 backups
-            files = sorted(glob.glob(os.path.join(backups_dir, '*.csv')), reverse=True)[:10]
-            
-            for file_path in files:
-                try:
-                    # Extrai data do nome do arquivo (estoque_YYYY-MM-DD_HH-MM-SS.csv)
-                    filename = os.path.basename(file_path)
-                    date_str = filename.replace('estoque_', '').replace('.csv', '')
-                    date_obj = datetime.datetime.strptime(date_str, "%Y-%m-%d_%H-%M-%S")
-                    formatted_date = date_obj.strftime("%d/%m/%Y")
-                    
-                    # Lê o arquivo (modo rápido, apenas procurando o SKU)
-                    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                        content = f.read()
-                        if sku not in content:
-                            continue
-                        
-                        # Se SKU está no arquivo, precisamos parsear para pegar o preço correto
-                        # Para ser rápido, vamos usar regex simples se o formato for conhecido
-                        # Mas como o formato muda (raw vs standard), melhor usar uma busca linha a linha
-                        f.seek(0)
-                        for line in f:
-                            if sku in line:
-                                # Tenta extrair preço. Assumindo formato raw onde preço é uma das colunas
-                                # Isso é frágil, mas rápido. Melhor seria parsear direito se performance permitir.
-                                # Vamos tentar parsear a linha como CSV
-                                parts = list(csv.reader([line]))[0]
-                                # Procura algo que pareça preço (tem vírgula e números)
-                                for part in parts:
-                                    if re.match(r'^\d+,\d{2}$', part.strip()):
-                                        price = part.strip()
-                                        history.append({'date': formatted_date, 'price': price})
-                                        break
-                                break
-                except:
-                    continue
-                    
-            return history[::-1] # Retorna cronológico (antigo -> novo)
-        except Exception as e:
-            print(f"Erro ao buscar histórico: {e}")
-            return []
+        # Busca exata (word boundary) e depois relaxada (len > 3), numa varredura só
+        return self.brand_matcher.find(name.lower())
 
     def extract_weight(self, name):
         if not name: return None
-        # Padrões de peso (Ported from JS)
-        patterns = [
-            r'(\d+(?:[,\.]\d+)?)\s*kg',
-            r'(\d+(?:[,\.]\d+)?)\s*k\b',
-            r'(\d+)\s*quilos?',
-            r'(\d+(?:[,\.]\d+)?)\s*g(?!\w)',
-            r'(\d+(?:[,\.]\d+)?)\s*gramas?',
-            r'(\d+(?:[,\.]\d+)?)\s*ml',
-            r'(\d+(?:[,\.]\d+)?)\s*litros?',
-            r'(\d+(?:[,\.]\d+)?)\s*l(?!\w)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, name, re.IGNORECASE)
-            if match:
-                val_str = match.group(1).replace(',', '.')
-                try:
-                    val = float(val_str)
-                    # Conversão para kg
-                    if 'g' in pattern and 'kg' not in pattern: # gramas
-                        val /= 1000
-                    elif 'ml' in pattern: # ml
-                        val /= 1000
-                    
-                    if 0.001 < val <= 50:
-                        return f"{val:.3f}"
-                except:
-                    continue
-        return None
+        return self.weight_extractor.extract(name)
 
     def generate_short_description(self, name, category, brand):
         desc = f"{name}"
@@ -639,64 +1065,51 @@ class StockProcessor:
         
         return f"<div class='product-description'><h2>{name}</h2>{intro}{features}{cta}</div>"
 
-    def finalize_data(self, data):
-        # Verifica imagens e ordena
-        if self.images_folder:
-            for item in data:
-                sku = str(item.get('SKU', '')).strip()
-                image_path = os.path.join(self.images_folder, f"{sku}.jpg")
-                item['has_image'] = os.path.exists(image_path)
-        
-        # Ordena: Com imagem primeiro, depois por nome
-        data.sort(key=lambda x: (not x.get('has_image', False), x.get('Name', '')))
-        return data
+    def finalize_data(self, builder):
+        # Ordena por nome; has_image e a ordem "com imagem primeiro" vêm de apply_images
+        with stage('finalize'):
+            return builder.build()
+
+    def _stats_for(self, data):
+        # Colunas/estatísticas ficam guardadas junto do cache, uma vez por versão
+        current = self._current
+        if current is not None and data is current[0]:
+            return self.derived('stats', lambda data: self._restored('stats', CatalogStats, data), data)
+        return CatalogStats(data, self.low_stock_threshold)
 
     def get_stats(self, data):
-        if not data:
-            return {'total': 0, 'in_stock': 0, 'out_of_stock': 0, 'categories': []}
-            
-        df = pd.DataFrame(data)
-        df['Stock'] = pd.to_numeric(df['Stock'], errors='coerce').fillna(0)
-        
-        return {
-            'total': len(df),
-            'in_stock': len(df[df['Stock'] > 0]),
-            'out_of_stock': len(df[df['Stock'] <= 0]),
-            'categories': sorted(df['Categories'].unique().tolist()) if 'Categories' in df.columns else []
-        }
+        return self._stats_for(data).summary()
 
     def get_dashboard_stats(self, data):
-        if not data:
-            return {}
-            
-        df = pd.DataFrame(data)
-        
-        # Conversão numérica
-        df['Stock'] = pd.to_numeric(df['Stock'], errors='coerce').fillna(0)
-        
-        # Limpa preço (R$ 1.200,50 -> 1200.50)
-        def clean_price(p):
-            if isinstance(p, str):
-                return float(p.replace('.', '').replace(',', '.'))
-            return float(p)
-            
-        df['PriceVal'] = df['Regular price'].apply(clean_price)
-        
-        # Cálculos
-        total_items = len(df)
-        total_stock_count = df['Stock'].sum()
-        total_value = (df['Stock'] * df['PriceVal']).sum()
-        low_stock = len(df[(df['Stock'] > 0) & (df['Stock'] <= 3)])
-        out_of_stock = len(df[df['Stock'] <= 0])
-        
-        # Top Categorias
-        top_categories = df['Categories'].value_counts().head(5).to_dict()
-        
-        return {
-            'total_items': int(total_items),
-            'total_stock_count': int(total_stock_count),
-            'total_value': float(total_value),
-            'low_stock': int(low_stock),
-            'out_of_stock': int(out_of_stock),
-            'top_categories': top_categories
-        }
+        return self._stats_for(data).dashboard()
+
+
+def _iter_csv_records(lines):
+    """csv.reader que também devolve o texto bruto consumido por cada registro"""
+    consumed = []
+
+    def tap():
+        for line in lines:
+            consumed.append(line)
+            yield line
+
+    for row in csv.reader(tap(), delimiter=','):
+        text = ''.join(consumed)
+        consumed.clear()
+        yield row, text
+
+
+def _row_key(row):
+    raw = '\x1f'.join(row)
+    return hashlib.blake2b(raw.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+# Processador do worker do pool (um por processo, criado sob demanda)
+_worker_processor = None
+
+
+def _enrich_chunk(rows):
+    global _worker_processor
+    if _worker_processor is None:
+        _worker_processor = StockProcessor('')
+    return [_worker_processor.enrich_fields(*row) for row in rows]
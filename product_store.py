@@ -0,0 +1,351 @@
+import hashlib
+import math
+import sys
+from array import array
+
+# Campos de um produto, na ordem do CSV exportado
+FIELDS = (
+    'SKU', 'Name', 'Regular price', 'Categories', 'Meta: _marca', 'Stock',
+    'Description', 'Short description', 'Weight (kg)', 'Meta: _custo'
+)
+
+NUMERIC_FIELDS = ('Regular price', 'Stock', 'Meta: _custo', 'Weight (kg)')
+DESCRIPTION_FIELDS = ('Description', 'Short description')
+
+# Campos derivados da pasta de imagens (versão = mtime da imagem, para a URL)
+IMAGE_FIELDS = ('has_image', 'image_version')
+
+# Campos da listagem: tudo menos as descrições em HTML (geradas só quando pedidas)
+LIST_FIELDS = tuple(field for field in FIELDS if field not in DESCRIPTION_FIELDS) + IMAGE_FIELDS
+
+
+def to_number(value, default=0.0):
+    """Converte preço/estoque em texto para float ('1.200,50', '350.00', '5')."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return default
+    text = str(value).strip().replace('R$', '').strip()
+    if ',' in text:
+        text = text.replace('.', '').replace(',', '.')
+    try:
+        number = float(text)
+    except ValueError:
+        return default
+    return number if math.isfinite(number) else default
+
+
+def _format_money(value):
+    return f"{value:.2f}"
+
+
+def _format_stock(value):
+    return str(int(value))
+
+
+def _format_weight(value):
+    return '' if math.isnan(value) else f"{value:.3f}"
+
+
+# Como cada coluna numérica volta a ser texto (mesmo formato de create_smart_product)
+FORMATTERS = {
+    'Regular price': _format_money,
+    'Meta: _custo': _format_money,
+    'Stock': _format_stock,
+    'Weight (kg)': _format_weight,
+}
+
+
+def column(products, field):
+    """Valores de um campo de texto, de um ProductStore ou de uma lista de dicts"""
+    if isinstance(products, ProductStore):
+        return products.column(field)
+    return [p.get(field, '') for p in products]
+
+
+def select_fields(names):
+    """Filtra uma lista de nomes de campo (p.ex. de ?fields=) para os campos conhecidos"""
+    known = FIELDS + IMAGE_FIELDS
+    return tuple(dict.fromkeys(name for name in names if name in known))
+
+
+def row(products, pos, fields=None):
+    """Produto na posição como dict, só com os campos pedidos (None = todos)"""
+    if isinstance(products, ProductStore):
+        return products.row(pos, fields)
+    product = products[pos]
+    if fields is None:
+        return product
+    return {field: product[field] for field in fields if field in product}
+
+
+def records(products, fields=None):
+    """Todos os produtos como dicts, só com os campos pedidos"""
+    return [row(products, pos, fields) for pos in range(len(products))]
+
+
+def numbers(products, field):
+    """Valores numéricos de um campo (preço, estoque, custo)"""
+    if isinstance(products, ProductStore):
+        return products.numbers(field)
+    return [to_number(p.get(field)) for p in products]
+
+
+class ProductStoreBuilder:
+    """Acumula produtos em colunas e monta o ProductStore final.
+
+    Linhas do CSV bruto entram já como campos enriquecidos (as descrições são
+    geradas depois, a partir dos campos); linhas do CSV padrão entram como
+    dicts de texto e guardam o texto original só quando ele não pode ser
+    reconstruído a partir do número.
+    """
+
+    def __init__(self, describe):
+        self.describe = describe
+        self.sku = []
+        self.name = []
+        self.categories = []
+        self.brands = []
+        self.price = array('d')
+        self.cost = array('d')
+        self.stock = array('d')
+        self.weight = array('d')
+        # Campo -> {posição: texto original}
+        self.overrides = {}
+
+    def __len__(self):
+        return len(self.sku)
+
+    def add_fields(self, sku, name, category, brand, stock, price, cost, weight):
+        """Produto enriquecido do CSV bruto (números já arredondados)"""
+        self.sku.append(sku)
+        self.name.append(name)
+        self.categories.append(category)
+        self.brands.append(brand)
+        self.stock.append(stock)
+        self.price.append(price)
+        self.cost.append(cost)
+        self.weight.append(weight)
+
+    def add_record(self, record):
+        """Produto do CSV padrão (todos os campos como texto)"""
+        pos = len(self.sku)
+        self.sku.append(record.get('SKU', ''))
+        self.name.append(record.get('Name', ''))
+        self.categories.append(record.get('Categories', ''))
+        self.brands.append(record.get('Meta: _marca', ''))
+
+        for field, target in (('Regular price', self.price), ('Meta: _custo', self.cost),
+                              ('Stock', self.stock), ('Weight (kg)', self.weight)):
+            text = record.get(field, '')
+            value = to_number(text, default=math.nan if field == 'Weight (kg)' else 0.0)
+            target.append(value)
+            if FORMATTERS[field](value) != text:
+                self.overrides.setdefault(field, {})[pos] = text
+
+        # Descrições do arquivo são mantidas como estão
+        for field in DESCRIPTION_FIELDS:
+            self.overrides.setdefault(field, {})[pos] = record.get(field, '')
+
+    def build(self):
+        """Monta o ProductStore ordenado por nome"""
+        order = sorted(range(len(self.sku)), key=self.name.__getitem__)
+        category_codes, category_names = _intern_codes(self.categories, order)
+        brand_codes, brand_names = _intern_codes(self.brands, order)
+
+        return ProductStore(
+            sku=[self.sku[pos] for pos in order],
+            name=[self.name[pos] for pos in order],
+            category_codes=category_codes,
+            category_names=category_names,
+            brand_codes=brand_codes,
+            brand_names=brand_names,
+            price=array('d', (self.price[pos] for pos in order)),
+            cost=array('d', (self.cost[pos] for pos in order)),
+            stock=array('d', (self.stock[pos] for pos in order)),
+            weight=array('d', (self.weight[pos] for pos in order)),
+            image_versions=None,
+            overrides=_remap_overrides(self.overrides, order),
+            describe=self.describe
+        )
+
+
+def _remap_overrides(overrides, order):
+    """Overrides com as posições da nova ordem (order[nova] = antiga)"""
+    if not any(overrides.values()):
+        return {field: {} for field in overrides}
+    inverse = [0] * len(order)
+    for new_pos, pos in enumerate(order):
+        inverse[pos] = new_pos
+    # Colunas mapeadas de um snapshot sabem se remapear sem virar dict
+    return {field: values.remap(inverse) if hasattr(values, 'remap')
+            else {inverse[pos]: text for pos, text in values.items()}
+            for field, values in overrides.items()}
+
+
+def _take(column, order, typecode=None):
+    """Coluna reordenada (order[nova] = antiga).
+
+    Colunas com take() (arrays do NumPy, textos de um snapshot) se reordenam
+    sozinhas; as demais viram array do tipo `typecode` ou lista.
+    """
+    if hasattr(column, 'take'):
+        return column.take(order)
+    if typecode is None:
+        return [column[pos] for pos in order]
+    return array(typecode, (column[pos] for pos in order))
+
+
+def _intern_codes(values, order):
+    """Códigos inteiros (na ordem final) e a tabela de valores distintos"""
+    codes = {}
+    column = array('i', (codes.setdefault(values[pos], len(codes)) for pos in order))
+    return column, [sys.intern(value) if isinstance(value, str) else value for value in codes]
+
+
+class ProductStore:
+    """Catálogo de uma versão em colunas.
+
+    Categorias e marcas ficam como códigos em uma tabela de valores distintos;
+    preço, custo, estoque e peso ficam em arrays numéricos. As descrições das
+    linhas do ERP são geradas a partir dos campos, e só quando pedidas. Cada
+    produto só vira dict ao ser acessado (p.ex. na serialização para JSON).
+    """
+
+    def __init__(self, sku, name, category_codes, category_names, brand_codes, brand_names,
+                 price, cost, stock, weight, image_versions, overrides, describe):
+        self.sku = sku
+        self.name = name
+        self.category_codes = category_codes
+        self.category_names = category_names
+        self.brand_codes = brand_codes
+        self.brand_names = brand_names
+        self.price = price
+        self.cost = cost
+        self.stock = stock
+        self.weight = weight
+        # Versão da imagem de cada produto (0 = sem imagem); None sem pasta de imagens
+        self.image_versions = image_versions
+        self.overrides = overrides
+        self.describe = describe
+        # Origem do catálogo (formato, snapshot em disco, disposição das imagens)
+        self.read_info = {}
+        self._numeric = {'Regular price': price, 'Meta: _custo': cost, 'Stock': stock, 'Weight (kg)': weight}
+        self.fields = FIELDS + IMAGE_FIELDS if image_versions is not None else FIELDS
+
+    def __len__(self):
+        return len(self.sku)
+
+    def __iter__(self):
+        for pos in range(len(self.sku)):
+            yield self.row(pos)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self.row(i) for i in range(*pos.indices(len(self.sku)))]
+        if pos < 0:
+            pos += len(self.sku)
+        if not 0 <= pos < len(self.sku):
+            raise IndexError('product index out of range')
+        return self.row(pos)
+
+    def _text(self, field, pos):
+        values = self.overrides.get(field)
+        if values is not None:
+            text = values.get(pos)
+            if text is not None:
+                return text
+        return FORMATTERS[field](self._numeric[field][pos])
+
+    def _value(self, field, pos):
+        if field == 'SKU':
+            return self.sku[pos]
+        if field == 'Name':
+            return self.name[pos]
+        if field == 'Categories':
+            return self.category_names[self.category_codes[pos]]
+        if field == 'Meta: _marca':
+            return self.brand_names[self.brand_codes[pos]]
+        if field == 'has_image':
+            return bool(self.image_versions[pos])
+        if field == 'image_version':
+            return self.image_versions[pos]
+        return self._text(field, pos)
+
+    def descriptions(self, pos):
+        """(descrição completa, descrição curta) do produto na posição"""
+        descriptions = self.overrides.get('Description')
+        if descriptions is not None and pos in descriptions:
+            return descriptions[pos], self.overrides['Short description'][pos]
+        return self.describe(self._value('Name', pos), self._value('Categories', pos),
+                             self._value('Meta: _marca', pos), self._text('Weight (kg)', pos))
+
+    def row(self, pos, fields=None):
+        """Produto na posição, como dict (mesmo formato do CSV exportado).
+
+        fields limita os campos montados; as descrições só são geradas se
+        forem pedidas.
+        """
+        if fields is None:
+            fields = self.fields
+        product = {}
+        descriptions = None
+        for field in fields:
+            if field in DESCRIPTION_FIELDS:
+                if descriptions is None:
+                    descriptions = self.descriptions(pos)
+                product[field] = descriptions[DESCRIPTION_FIELDS.index(field)]
+            elif field not in IMAGE_FIELDS or self.image_versions is not None:
+                product[field] = self._value(field, pos)
+        return product
+
+    def with_images(self, image_versions):
+        """Cópia com as versões de imagem (uma por posição deste store) e imagens primeiro.
+
+        Só permuta as colunas: a ordem por nome é mantida dentro de cada grupo,
+        sem reler nem reordenar o catálogo.
+        """
+        order = [pos for pos, version in enumerate(image_versions) if version]
+        order.extend(pos for pos, version in enumerate(image_versions) if not version)
+
+        store = ProductStore(
+            sku=_take(self.sku, order),
+            name=_take(self.name, order),
+            category_codes=_take(self.category_codes, order, 'i'),
+            category_names=self.category_names,
+            brand_codes=_take(self.brand_codes, order, 'i'),
+            brand_names=self.brand_names,
+            price=_take(self.price, order, 'd'),
+            cost=_take(self.cost, order, 'd'),
+            stock=_take(self.stock, order, 'd'),
+            weight=_take(self.weight, order, 'd'),
+            image_versions=array('q', (image_versions[pos] for pos in order)),
+            overrides=_remap_overrides(self.overrides, order),
+            describe=self.describe
+        )
+        # Quais produtos têm imagem define a ordem (e as posições dos índices derivados)
+        flags = bytes(1 if version else 0 for version in image_versions)
+        store.read_info = dict(self.read_info, image_layout=hashlib.blake2b(flags, digest_size=8).hexdigest())
+        return store
+
+    def column(self, field):
+        """Valores de um campo de texto para todos os produtos (sem montar os dicts)"""
+        if field == 'SKU':
+            return self.sku
+        if field == 'Name':
+            return self.name
+        if field == 'Categories':
+            return [self.category_names[code] for code in self.category_codes]
+        if field == 'Meta: _marca':
+            return [self.brand_names[code] for code in self.brand_codes]
+        if field in self._numeric:
+            return [self._text(field, pos) for pos in range(len(self.sku))]
+        return [self.row(pos, (field,)).get(field, '') for pos in range(len(self.sku))]
+
+    def numbers(self, field):
+        """Coluna numérica (preço, custo, estoque, peso)"""
+        return self._numeric[field]
+
+    def to_records(self, fields=None):
+        """Lista de dicts, para serializar o catálogo inteiro"""
+        return [self.row(pos, fields) for pos in range(len(self.sku))]
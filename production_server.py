@@ -1,7 +1,20 @@
-from app import app
+import threading
+import time
+
+from app import app, backups, processor
 from waitress import serve
 
 if __name__ == "__main__":
+    # Backups antigos (cópias inteiras) migram para o store em segundo plano
+    threading.Thread(target=backups.import_legacy, daemon=True).start()
+    if app.config['WARM_ON_START']:
+        # Com o snapshot em disco isso leva milissegundos; sem ele, o CSV é lido agora e não no primeiro acesso
+        started = time.time()
+        try:
+            processor.warm()
+            print(f"📦 Catálogo carregado em {time.time() - started:.2f}s")
+        except Exception as e:
+            print(f"Erro ao carregar o catálogo na subida: {e}")
     print("🚀 Servidor de Produção AquaFlora Rodando!")
     print("👉 Aguardando conexões na porta 8000...")
-    serve(app, host='0.0.0.0', port=8000)
\ No newline at end of file
+    serve(app, host='0.0.0.0', port=8000)
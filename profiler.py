@@ -0,0 +1,204 @@
+import cProfile
+import datetime
+import io
+import itertools
+import marshal
+import pstats
+import random
+import threading
+import time
+from collections import deque, defaultdict
+
+# Caminho com mais que isso de funções é cortado no gráfico de chamas
+MAX_STACK_DEPTH = 64
+# Fatias menores que essa fração do tempo total não viram pilha no gráfico
+MIN_STACK_SHARE = 1 / 5000
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        # Funções embutidas: cProfile usa '~' e o nome entre <>
+        return name
+    return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+
+def collapsed_stacks(stats):
+    """Pilhas no formato "a;b;c microssegundos" (flamegraph.pl, speedscope).
+
+    O cProfile guarda só pares chamador/chamado: cada pilha é reconstruída
+    dividindo o tempo de uma função entre os chamadores na proporção do tempo
+    gasto a partir de cada um (aproximação igual à do flameprof).
+    """
+    callees = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            callees[caller].append((func, cumulative))
+
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    total = sum(stats[func][3] for func in roots)
+    floor = total * MIN_STACK_SHARE
+    samples = defaultdict(float)
+
+    def walk(func, path, share):
+        _, _, own, cumulative, _ = stats[func]
+        if cumulative <= 0:
+            return
+        fraction = min(share / cumulative, 1.0)
+        samples[';'.join(_label(f) for f in path)] += own * fraction
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee, spent in callees.get(func, ()):
+            part = spent * fraction
+            # Recursão: o tempo já está contado na primeira ocorrência do caminho
+            if part >= floor and callee not in path:
+                walk(callee, path + (callee,), part)
+
+    for func in roots:
+        walk(func, (func,), stats[func][3])
+
+    lines = [f"{stack} {round(seconds * 1e6)}" for stack, seconds in sorted(samples.items())
+             if round(seconds * 1e6) > 0]
+    return '\n'.join(lines) + '\n'
+
+
+class Profile:
+    """Perfil de uma requisição (estatísticas do cProfile e dados da requisição)"""
+
+    def __init__(self, profile_id, route, method, path, query, status, seconds, stats):
+        self.id = profile_id
+        self.route = route
+        self.method = method
+        self.path = path
+        self.query = query
+        self.status = status
+        self.seconds = seconds
+        self.created_at = datetime.datetime.now().isoformat(timespec='seconds')
+        self.stats = stats
+
+    def to_dict(self):
+        return {'id': self.id, 'route': self.route, 'method': self.method, 'path': self.path,
+                'query': self.query, 'status': self.status, 'seconds': round(self.seconds, 4),
+                'functions': len(self.stats), 'created_at': self.created_at}
+
+    def pstats_bytes(self):
+        """Mesmo conteúdo de Stats.dump_stats (abre com pstats, snakeviz...)"""
+        return marshal.dumps(self.stats)
+
+    def text(self, limit=60):
+        output = io.StringIO()
+        stats = pstats.Stats(stream=output)
+        stats.stats = self.stats
+        stats.get_top_level_stats()
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+    def collapsed(self):
+        return collapsed_stacks(self.stats)
+
+
+class RequestProfiler:
+    """Perfis de requisições sob demanda, guardados em um buffer circular.
+
+    Desligado por padrão: nesse estado start() só lê um atributo. Liga com uma
+    fração amostrada de todas as requisições e/ou as próximas N requisições de
+    rotas específicas; os perfis mais antigos saem quando o buffer enche.
+
+    Um perfil por vez no processo: requisições que chegam enquanto outra está
+    sendo perfilada seguem sem perfil (no Python 3.12+ o cProfile recusa dois
+    perfis simultâneos).
+    """
+
+    def __init__(self, keep=20, max_sample_rate=0.25):
+        self.max_sample_rate = max_sample_rate
+        self.active = False
+        self.sample_rate = 0.0
+        self._targets = {}
+        self._profiles = deque(maxlen=keep)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+
+    def configure(self, sample_rate=None, route=None, count=None, enabled=None):
+        """Ajusta a amostragem e os alvos; enabled=False desliga e zera os alvos"""
+        with self._lock:
+            if enabled is False:
+                self.sample_rate = 0.0
+                self._targets.clear()
+            if sample_rate is not None:
+                self.sample_rate = min(max(float(sample_rate), 0.0), self.max_sample_rate)
+            if route:
+                if count is None or int(count) > 0:
+                    self._targets[route] = int(count or 1)
+                else:
+                    self._targets.pop(route, None)
+            self.active = self.sample_rate > 0 or bool(self._targets)
+        return self.status()
+
+    def _chosen(self, route, path):
+        with self._lock:
+            for target in (route, path):
+                remaining = self._targets.get(target)
+                if remaining:
+                    if remaining > 1:
+                        self._targets[target] = remaining - 1
+                    else:
+                        del self._targets[target]
+                        self.active = self.sample_rate > 0 or bool(self._targets)
+                    return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self, route, path):
+        """Começa o perfil da requisição se ela foi escolhida.
+
+        Devolve o handle para finish(), ou None se a requisição não foi
+        escolhida ou se outro perfil está em andamento.
+        """
+        if not self.active or not self._running.acquire(blocking=False):
+            return None
+        if not self._chosen(route, path):
+            self._running.release()
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except (RuntimeError, ValueError) as e:
+            # Outra ferramenta (depurador, outro profiler) já está ativa
+            self._running.release()
+            print(f"Perfil ignorado: {e}")
+            return None
+        return profile, time.perf_counter()
+
+    def finish(self, handle, route, method, path, query, status):
+        profile, started = handle
+        try:
+            profile.disable()
+            seconds = time.perf_counter() - started
+        finally:
+            self._running.release()
+        stats = pstats.Stats(profile).stats
+        with self._lock:
+            entry = Profile(f"p{next(self._ids):05d}", route, method, path, query, status, seconds, stats)
+            self._profiles.append(entry)
+        return entry
+
+    def get(self, profile_id):
+        with self._lock:
+            for entry in self._profiles:
+                if entry.id == profile_id:
+                    return entry
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+    def status(self):
+        with self._lock:
+            return {
+                'active': self.active,
+                'sample_rate': self.sample_rate,
+                'targets': dict(self._targets),
+                'keep': self._profiles.maxlen,
+                'profiles': [entry.to_dict() for entry in reversed(self._profiles)]
+            }
@@ -0,0 +1,146 @@
+import re
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_left
+
+from product_store import column
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Peso de cada campo no ranking (SKU e nome pesam mais que categoria)
+FIELD_WEIGHTS = (
+    ('SKU', 4),
+    ('Name', 3),
+    ('Meta: _marca', 2),
+    ('Categories', 1),
+)
+
+
+def fold(text):
+    """Minúsculas e sem acentos: 'Ração' -> 'racao'"""
+    if not text:
+        return ''
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(fold(text))
+
+
+class SearchIndex:
+    """Índice invertido de tokens sobre nome, SKU, marca e categoria.
+
+    Cada token normalizado aponta para a lista de produtos que o contém. Um
+    termo de busca vale como prefixo: o vocabulário ordenado dá, por bisect, os
+    tokens que começam com ele. Consultas com vários termos intersectam as
+    listas, começando pela menor, e o resultado é ordenado por relevância.
+    """
+
+    MAX_PREFIX_CACHE = 1024
+
+    def __init__(self, products):
+        postings = {}
+        # Tokens do produto e o maior peso de campo de cada um (para o ranking)
+        self._tokens = []
+        self._weights = []
+
+        # Marcas e categorias se repetem muito: tokeniza uma vez por valor
+        field_tokens = {}
+
+        columns = [(field, weight, column(products, field)) for field, weight in FIELD_WEIGHTS]
+        for pos in range(len(products)):
+            product_tokens = {}
+            for field, weight, values in columns:
+                value = values[pos]
+                tokens = field_tokens.get(value)
+                if tokens is None:
+                    tokens = tuple(sys.intern(t) for t in tokenize(value))
+                    if field != 'Name':
+                        field_tokens[value] = tokens
+                for token in tokens:
+                    if product_tokens.get(token, 0) < weight:
+                        product_tokens[token] = weight
+
+            self._tokens.append(tuple(product_tokens))
+            self._weights.append(tuple(product_tokens.values()))
+            for token in product_tokens:
+                postings.setdefault(token, []).append(pos)
+
+        # Listas compactas, já em ordem crescente de posição
+        self._postings = {token: array('i', ids) for token, ids in postings.items()}
+        self._vocab = sorted(self._postings)
+        self._prefix_cache = {}
+        self.size = len(products)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_prefix_cache'] = {}
+        return state
+
+    def _candidates(self, term):
+        """Produtos com algum token que começa com o termo"""
+        ids = self._prefix_cache.get(term)
+        if ids is not None:
+            return ids
+
+        start = bisect_left(self._vocab, term)
+        end = bisect_left(self._vocab, term + '\U0010ffff', start)
+        tokens = self._vocab[start:end]
+        if len(tokens) == 1:
+            ids = self._postings[tokens[0]]
+        else:
+            merged = set()
+            for token in tokens:
+                merged.update(self._postings[token])
+            ids = array('i', sorted(merged))
+
+        if len(self._prefix_cache) >= self.MAX_PREFIX_CACHE:
+            self._prefix_cache.clear()
+        self._prefix_cache[term] = ids
+        return ids
+
+    def _has_prefix(self, pos, term):
+        return any(token.startswith(term) for token in self._tokens[pos])
+
+    def _score(self, pos, terms):
+        tokens = self._tokens[pos]
+        weights = self._weights[pos]
+        score = 0
+        for term in terms:
+            try:
+                # Token exato vale o dobro do peso do campo; prefixo vale 1
+                score += weights[tokens.index(term)] * 2
+            except ValueError:
+                score += 1
+        return score
+
+    def search(self, query):
+        """Posições dos produtos que casam com todos os termos, por relevância"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        lists = []
+        for term in terms:
+            ids = self._candidates(term)
+            if not ids:
+                return []
+            lists.append((term, ids))
+        lists.sort(key=lambda item: len(item[1]))
+
+        result = set(lists[0][1])
+        for term, ids in lists[1:]:
+            if len(result) * 8 < len(ids):
+                # Poucos candidatos: confere direto nos tokens em vez de varrer a lista grande
+                result = {pos for pos in result if self._has_prefix(pos, term)}
+            else:
+                result.intersection_update(ids)
+            if not result:
+                return []
+
+        return sorted(result, key=lambda pos: (-self._score(pos, terms), pos))
@@ -0,0 +1,370 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import time
+import uuid
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+
+import numpy as np
+
+from product_store import ProductStore
+
+# Versão do formato gravado em disco (entra na chave dos snapshots)
+SNAPSHOT_FORMAT = 1
+
+CURRENT = 'CURRENT'
+META = 'meta.json'
+# Chaves já calculadas por (arquivo, tamanho, mtime): evita reler o CSV inteiro a cada subida
+SOURCES = 'sources.json'
+MAX_SOURCES = 32
+
+NUMERIC_COLUMNS = ('price', 'cost', 'stock', 'weight')
+CODE_COLUMNS = ('category_codes', 'brand_codes')
+
+
+def source_key(path, extra=''):
+    """Chave do snapshot: hash do conteúdo do CSV (mais o formato)"""
+    digest = hashlib.blake2b(f"{SNAPSHOT_FORMAT}:{extra}:".encode('utf-8'), digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StringColumn(Sequence):
+    """Coluna de textos sobre um blob UTF-8 (mapeado em memória) e offsets"""
+
+    def __init__(self, blob, starts, ends):
+        self.blob = blob
+        self.starts = starts
+        self.ends = ends
+
+    @staticmethod
+    def encode(values):
+        """(blob, offsets) com offsets[i]:offsets[i + 1] = values[i] em UTF-8"""
+        parts = [str(value).encode('utf-8', 'surrogatepass') for value in values]
+        offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum([len(part) for part in parts], out=offsets[1:])
+        return b''.join(parts), offsets
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [self[i] for i in range(*pos.indices(len(self)))]
+        return self.blob[int(self.starts[pos]):int(self.ends[pos])].decode('utf-8', 'surrogatepass')
+
+    def __iter__(self):
+        blob = self.blob
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield blob[start:end].decode('utf-8', 'surrogatepass')
+
+    def take(self, order):
+        """Mesma coluna em outra ordem, sem copiar os textos"""
+        order = np.asarray(order, dtype=np.int64)
+        return StringColumn(self.blob, self.starts[order], self.ends[order])
+
+
+class OverrideColumn(Mapping):
+    """Textos originais de algumas posições (posições ordenadas + StringColumn)"""
+
+    def __init__(self, positions, strings):
+        self.positions = positions
+        self.strings = strings
+
+    def _index(self, pos):
+        i = bisect_left(self.positions, pos)
+        if i < len(self.positions) and self.positions[i] == pos:
+            return i
+        return None
+
+    def __getitem__(self, pos):
+        i = self._index(pos)
+        if i is None:
+            raise KeyError(pos)
+        return self.strings[i]
+
+    def get(self, pos, default=None):
+        i = self._index(pos)
+        return default if i is None else self.strings[i]
+
+    def __contains__(self, pos):
+        return self._index(pos) is not None
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return iter(self.positions.tolist())
+
+    def remap(self, inverse):
+        """Posições trocadas por inverse[posição], mantendo a ordem crescente"""
+        new_positions = np.asarray(inverse, dtype=np.int64)[np.asarray(self.positions, dtype=np.int64)]
+        order = np.argsort(new_positions, kind='stable')
+        return OverrideColumn(new_positions[order], self.strings.take(order))
+
+
+class SnapshotStore:
+    """Catálogos processados gravados em disco, compartilhados entre processos.
+
+    Cada versão é um diretório com o nome da chave do CSV de origem: colunas
+    numéricas em .npy, textos em um blob UTF-8 com offsets e um meta.json com
+    as tabelas pequenas. Os workers mapeiam os arquivos em memória (somente
+    leitura), então o sistema operacional mantém uma única cópia. CURRENT
+    aponta para a versão mais recente; a troca é um os.replace.
+    """
+
+    def __init__(self, folder, keep=3, lock_timeout=300):
+        self.folder = folder
+        self.keep = keep
+        self.lock_timeout = lock_timeout
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key, name=''):
+        return os.path.join(self.folder, key, name) if name else os.path.join(self.folder, key)
+
+    def current(self):
+        try:
+            with open(os.path.join(self.folder, CURRENT), 'r', encoding='ascii') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _set_current(self, key):
+        path = os.path.join(self.folder, CURRENT)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'w', encoding='ascii') as f:
+            f.write(key)
+        os.replace(tmp, path)
+
+    def key_for(self, path, extra=''):
+        """source_key() do arquivo, reaproveitando a calculada para o mesmo tamanho e mtime"""
+        stat = os.stat(path)
+        entry = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{extra}"
+        sources_path = os.path.join(self.folder, SOURCES)
+        try:
+            with open(sources_path, 'r', encoding='utf-8') as f:
+                sources = json.load(f)
+        except (OSError, ValueError):
+            sources = {}
+        key = sources.get(entry)
+        if key is None:
+            key = source_key(path, extra)
+            sources[entry] = key
+            # dict mantém a ordem de inserção: descarta as entradas mais antigas
+            sources = dict(list(sources.items())[-MAX_SOURCES:])
+            tmp = f"{sources_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(sources, f, ensure_ascii=False)
+                os.replace(tmp, sources_path)
+            except OSError:
+                pass
+        return key
+
+    def exists(self, key):
+        return os.path.exists(self._path(key, META))
+
+    def save(self, key, store, read_info=None):
+        """Grava o catálogo (ordem base, sem imagens) como a versão `key`"""
+        if self.exists(key):
+            self._set_current(key)
+            return
+        tmp = self._path(f".tmp-{key}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(tmp)
+
+        def write_strings(name, values):
+            blob, offsets = StringColumn.encode(values)
+            with open(os.path.join(tmp, f"{name}.bin"), 'wb') as f:
+                f.write(blob)
+            np.save(os.path.join(tmp, f"{name}.offsets.npy"), offsets)
+
+        write_strings('sku', store.sku)
+        write_strings('name', store.name)
+        for column in NUMERIC_COLUMNS:
+            np.save(os.path.join(tmp, f"{column}.npy"), np.asarray(getattr(store, column), dtype=np.float64))
+        for column in CODE_COLUMNS:
+            np.save(os.path.join(tmp, f"{column}.npy"), np.asarray(getattr(store, column), dtype=np.int32))
+
+        overrides = []
+        for i, (field, values) in enumerate(store.overrides.items()):
+            positions = sorted(values)
+            np.save(os.path.join(tmp, f"override{i}.positions.npy"), np.asarray(positions, dtype=np.int64))
+            write_strings(f"override{i}", [values[pos] for pos in positions])
+            overrides.append(field)
+
+        meta = {
+            'format': SNAPSHOT_FORMAT,
+            'count': len(store),
+            'category_names': store.category_names,
+            'brand_names': store.brand_names,
+            'overrides': overrides,
+            'read_info': read_info or {},
+            'created_at': time.time()
+        }
+        # meta.json por último: a versão só "existe" quando está completa
+        with open(os.path.join(tmp, META), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if os.path.isdir(self._path(key)) and not self.exists(key):
+            # Sobra de uma remoção pela metade: sem meta.json a versão não vale
+            self._discard(key)
+        try:
+            os.rename(tmp, self._path(key))
+        except OSError:
+            # Outro processo gravou a mesma versão primeiro
+            shutil.rmtree(tmp, ignore_errors=True)
+        if self.exists(key):
+            self._set_current(key)
+        self.prune()
+
+    def load(self, key, describe):
+        """ProductStore mapeado em memória da versão `key` (None se não existir)"""
+        if not self.exists(key):
+            return None
+        with open(self._path(key, META), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        def strings(name):
+            offsets = np.load(self._path(key, f"{name}.offsets.npy"), mmap_mode='r')
+            path = self._path(key, f"{name}.bin")
+            if os.path.getsize(path):
+                with open(path, 'rb') as f:
+                    blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                blob = b''
+            return StringColumn(blob, offsets[:-1], offsets[1:])
+
+        def array(name):
+            return np.load(self._path(key, f"{name}.npy"), mmap_mode='r')
+
+        overrides = {}
+        for i, field in enumerate(meta['overrides']):
+            overrides[field] = OverrideColumn(array(f"override{i}.positions"), strings(f"override{i}"))
+
+        store = ProductStore(
+            sku=strings('sku'),
+            name=strings('name'),
+            category_codes=array('category_codes'),
+            category_names=meta['category_names'],
+            brand_codes=array('brand_codes'),
+            brand_names=meta['brand_names'],
+            price=array('price'),
+            cost=array('cost'),
+            stock=array('stock'),
+            weight=array('weight'),
+            image_versions=None,
+            overrides=overrides,
+            describe=describe
+        )
+        store.read_info = dict(meta['read_info'], snapshot=key)
+        return store
+
+    def _derived_path(self, key, name, layout):
+        return self._path(key, f"derived-{name}-{layout}.pickle")
+
+    def load_derived(self, key, name, layout):
+        """Valor derivado (p.ex. o índice) gravado para a versão e disposição; None se não houver"""
+        try:
+            with open(self._derived_path(key, name, layout), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Erro ao carregar {name} do snapshot {key}: {e}")
+            return None
+
+    def save_derived(self, key, name, layout, value):
+        """Grava um valor derivado; o de outra disposição (imagens mudaram) é descartado"""
+        if not self.exists(key):
+            return
+        path = self._derived_path(key, name, layout)
+        if os.path.exists(path):
+            return
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        prefix = f"derived-{name}-"
+        for entry in os.scandir(self._path(key)):
+            # Um .tmp é de outro processo (outro worker com a mesma pasta de
+            # snapshots) gravando este derivado agora: não pode ser removido
+            if entry.name.startswith(prefix) and entry.path != path and not entry.name.endswith('.tmp'):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    @contextmanager
+    def building(self, key):
+        """Trava entre processos para que só um monte a versão `key`"""
+        lock = os.path.join(self.folder, f".{key}.lock")
+        deadline = time.time() + self.lock_timeout
+        while True:
+            try:
+                fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                if self.exists(key):
+                    yield
+                    return
+                try:
+                    stale = time.time() - os.path.getmtime(lock) > self.lock_timeout
+                except OSError:
+                    stale = False
+                if stale or time.time() > deadline:
+                    # Processo que montava a versão morreu: assume a trava
+                    try:
+                        os.remove(lock)
+                    except OSError:
+                        pass
+                    continue
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock)
+            except OSError:
+                pass
+
+    def prune(self):
+        """Mantém as `keep` versões mais novas (e sempre a CURRENT)"""
+        current = self.current()
+        versions = []
+        for entry in os.scandir(self.folder):
+            if entry.is_dir() and not entry.name.startswith('.') and os.path.exists(os.path.join(entry.path, META)):
+                versions.append((entry.stat().st_mtime, entry.name))
+        versions.sort(reverse=True)
+        for _, name in versions[self.keep:]:
+            if name != current:
+                self._discard(name)
+        # Lixo que não pôde ser apagado antes (arquivo ainda aberto)
+        for entry in os.scandir(self.folder):
+            if entry.is_dir() and entry.name.startswith('.trash-'):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _discard(self, key):
+        """Tira a versão do ar com um rename e só depois apaga os arquivos.
+
+        Assim meta.json e as colunas somem juntos: um rmtree interrompido não
+        deixa uma versão com meta.json e sem parte dos dados.
+        """
+        trash = self._path(f".trash-{key}-{uuid.uuid4().hex[:8]}")
+        try:
+            os.rename(self._path(key), trash)
+        except OSError:
+            # No Windows uma versão ainda mapeada não pode ser movida: fica para a próxima
+            return
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def stats(self):
+        versions = [entry.name for entry in os.scandir(self.folder)
+                    if entry.is_dir() and not entry.name.startswith('.')]
+        return {'current': self.current(), 'versions': len(versions)}
@@ -4,7 +4,13 @@ createApp({
     delimiters: ['[[', ']]'], // Use [[ ]] to avoid conflict with Jinja2
     data() {
         return {
-            products: [],
+            products: [], // Página atual (filtrada e paginada no servidor)
+            totalProducts: 0,
+            pageCount: 1,
+            catalogTotal: 0,
+            categoryList: [],
+            fetchSeq: 0,
+            searchTimer: null,
             lastUpdate: '',
             loading: true,
             search: '',
@@ -104,6 +110,7 @@ createApp({
 
             // Bulk Selection
             selectedItems: [],
+            selectedProductsMap: {},
             
             // Conference Mode
             showConferenceModal: false,
@@ -113,41 +120,17 @@ createApp({
     },
     computed: {
         categories() {
-            const cats = new Set(this.products.map(p => p.Categories).filter(Boolean));
-            return Array.from(cats).sort();
+            return this.categoryList;
         },
         filteredProducts() {
-            // Products are already sorted by image existence from backend
-            let result = this.products;
-            
-            if (this.onlyLowStock) {
-                result = result.filter(p => Number(p.Stock) <= 3);
-            }
-
-            if (this.selectedCategory) {
-                result = result.filter(p => p.Categories === this.selectedCategory);
-            }
-            
-            if (this.search) {
-                const term = this.search.toLowerCase();
-                // Fuzzy-ish search: split terms and check if all exist
-                const terms = term.split(/\s+/).filter(t => t.length > 0);
-                
-                result = result.filter(p => {
-                    const searchStr = `${p.Name} ${p.SKU} ${p['Meta: _marca'] || ''}`.toLowerCase();
-                    return terms.every(t => searchStr.includes(t));
-                });
-            }
-            
-            return result;
+            // Filtros, busca e paginação são aplicados pelo servidor
+            return this.products;
         },
         totalPages() {
-            return Math.ceil(this.filteredProducts.length / this.itemsPerPage);
+            return this.pageCount;
         },
         paginatedProducts() {
-            const start = (this.currentPage - 1) * this.itemsPerPage;
-            const end = start + this.itemsPerPage;
-            return this.filteredProducts.slice(start, end);
+            return this.products;
         },
         allSelected() {
             return this.paginatedProducts.length > 0 && this.paginatedProducts.every(p => this.selectedItems.includes(p.SKU));
@@ -160,8 +143,12 @@ createApp({
         }
     },
     watch: {
-        search() { this.currentPage = 1; },
-        selectedCategory() { this.currentPage = 1; },
+        search() {
+            clearTimeout(this.searchTimer);
+            this.searchTimer = setTimeout(() => this.goToFirstPage(), 300);
+        },
+        selectedCategory() { this.goToFirstPage(); },
+        currentPage() { this.fetchData(); },
         isDark(newVal) {
             if (newVal) document.documentElement.classList.add('dark');
             else document.documentElement.classList.remove('dark');
@@ -223,10 +210,13 @@ createApp({
                 console.error('Erro ao sair:', error);
             }
         },
-        getImageUrl(sku) {
-            if (!sku) return 'https://placehold.co/400x400?text=Sem+Imagem';
-            // Tenta carregar a imagem pelo SKU
-            return `/imagens/${sku}.jpg`;
+        getImageUrl(product, size = 'grid') {
+            if (!product || !product.SKU || product.has_image === false) {
+                return 'https://placehold.co/400x400?text=Sem+Imagem';
+            }
+            // Variante redimensionada; a versão na URL deixa o navegador guardar a imagem em cache
+            const version = product.image_version ? `&v=${product.image_version}` : '';
+            return `/imagens/${encodeURIComponent(product.SKU)}.jpg?size=${size}${version}`;
         },
         handleImageError(e) {
             // Se falhar, mostra placeholder
@@ -239,19 +229,45 @@ createApp({
             this.selectedCategory = '';
             this.currentPage = 1;
         },
+        goToFirstPage() {
+            // Mudar a página dispara o watcher, que já busca os dados
+            if (this.currentPage !== 1) this.currentPage = 1;
+            else this.fetchData();
+        },
         async fetchData() {
-            this.loading = true;
+            const seq = ++this.fetchSeq;
+            this.loading = this.products.length === 0;
             try {
-                const response = await fetch('/api/produtos');
+                const params = new URLSearchParams({ page: this.currentPage, page_size: this.itemsPerPage });
+                if (this.selectedCategory) params.set('category', this.selectedCategory);
+                if (this.onlyLowStock) params.set('low_stock', '1');
+                if (this.search.trim()) params.set('q', this.search.trim());
+
+                const response = await fetch(`/api/produtos?${params}`);
                 const data = await response.json();
+                if (seq !== this.fetchSeq) return; // Já existe uma busca mais nova
+
                 this.products = data.produtos || [];
+                this.totalProducts = data.total || 0;
+                this.pageCount = data.pages || 1;
+                this.catalogTotal = data.stats ? data.stats.total : 0;
+                this.categoryList = data.stats ? data.stats.categories : [];
                 this.lastUpdate = data.ultima_atualizacao;
             } catch (error) {
                 console.error('Erro ao carregar dados:', error);
                 // Don't show error alert on initial load if empty, just show empty state
             } finally {
-                this.loading = false;
+                if (seq === this.fetchSeq) this.loading = false;
+            }
+        },
+        async lookupProduct(code) {
+            // Busca um produto fora da página atual (SKU exato, depois busca por texto)
+            for (const query of [`sku=${encodeURIComponent(code)}`, `q=${encodeURIComponent(code)}&page=1&page_size=1`]) {
+                const response = await fetch(`/api/produtos?${query}`);
+                const data = await response.json();
+                if (data.produtos && data.produtos.length) return data.produtos[0];
             }
+            return null;
         },
         async fetchHistory(sku) {
             try {
@@ -299,15 +315,16 @@ createApp({
                 if (result.success) {
                     Swal.fire({
                         title: 'Sucesso!',
-                        text: 'Imagem atualizada. Pode ser necessário limpar o cache do navegador para ver a mudança.',
+                        text: 'Imagem atualizada.',
                         icon: 'success',
                         timer: 2000
                     });
-                    // Force reload image by appending timestamp
-                    const img = document.querySelector(`img[src*="${sku}.jpg"]`);
-                    if (img) {
-                        img.src = `/imagens/${sku}.jpg?t=${new Date().getTime()}`;
-                    }
+                    // Nova versão na URL recarrega a imagem sem limpar o cache
+                    const updated = [this.selectedProduct, ...this.products].filter(p => p && p.SKU === sku);
+                    updated.forEach(p => {
+                        p.has_image = true;
+                        p.image_version = result.version;
+                    });
                 } else {
                     throw new Error(result.message);
                 }
@@ -342,15 +359,18 @@ createApp({
                 const result = await response.json();
                 
                 if (result.success) {
+                    this.showUploadModal = false;
+                    this.selectedFile = null;
+                    // O servidor processa em segundo plano; o estoque anterior segue disponível
+                    const job = result.job ? await this.waitForIngest(result.job.id) : { state: 'done' };
+                    if (job.state === 'error') throw new Error(job.message);
                     Swal.fire({
                         title: 'Sucesso!',
-                        text: 'Estoque atualizado com sucesso.',
+                        text: job.message || 'Estoque atualizado com sucesso.',
                         icon: 'success',
                         timer: 2000,
                         showConfirmButton: false
                     });
-                    this.showUploadModal = false;
-                    this.selectedFile = null;
                     this.fetchData();
                 } else {
                     throw new Error(result.message);
@@ -361,6 +381,36 @@ createApp({
                 this.uploading = false;
             }
         },
+        async waitForIngest(jobId) {
+            Swal.fire({
+                title: 'Processando estoque...',
+                text: 'Arquivo recebido',
+                allowOutsideClick: false,
+                didOpen: () => { Swal.showLoading(); }
+            });
+            // Falhas na consulta (rede, servidor reiniciando) são tentadas de novo;
+            // só depois de várias seguidas o upload é dado como erro
+            let failures = 0;
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                let job = null;
+                try {
+                    const response = await fetch(`/api/upload/status/${jobId}`);
+                    job = await response.json();
+                    if (!response.ok) throw new Error(job.error || `HTTP ${response.status}`);
+                } catch (error) {
+                    if (++failures >= 5) {
+                        return { state: 'error', done: true,
+                                 message: `Não foi possível acompanhar o processamento: ${error.message}` };
+                    }
+                    continue;
+                }
+                failures = 0;
+                if (job.done) return job;
+                Swal.update({ text: job.message });
+                Swal.showLoading();
+            }
+        },
         formatPrice(val) {
             if (!val) return '0,00';
             return parseFloat(val).toLocaleString('pt-BR', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
@@ -479,7 +529,7 @@ createApp({
         },
         toggleLowStock() {
             this.onlyLowStock = !this.onlyLowStock;
-            this.currentPage = 1;
+            this.goToFirstPage();
         },
         async startScanner() {
             this.showScanner = true;
@@ -593,8 +643,11 @@ createApp({
             const index = this.selectedItems.indexOf(sku);
             if (index === -1) {
                 this.selectedItems.push(sku);
+                const product = this.products.find(p => p.SKU === sku);
+                if (product) this.selectedProductsMap[sku] = product;
             } else {
                 this.selectedItems.splice(index, 1);
+                delete this.selectedProductsMap[sku];
             }
         },
         toggleSelectAll() {
@@ -602,20 +655,23 @@ createApp({
                 // Deselect current page items
                 const pageSkus = this.paginatedProducts.map(p => p.SKU);
                 this.selectedItems = this.selectedItems.filter(sku => !pageSkus.includes(sku));
+                pageSkus.forEach(sku => { delete this.selectedProductsMap[sku]; });
             } else {
                 // Select current page items
                 const pageSkus = this.paginatedProducts.map(p => p.SKU);
-                pageSkus.forEach(sku => {
-                    if (!this.selectedItems.includes(sku)) {
-                        this.selectedItems.push(sku);
+                this.paginatedProducts.forEach(product => {
+                    if (!this.selectedItems.includes(product.SKU)) {
+                        this.selectedItems.push(product.SKU);
                     }
+                    this.selectedProductsMap[product.SKU] = product;
                 });
             }
         },
         printSelectedLabels() {
             if (this.selectedItems.length === 0) return;
             
-            const productsToPrint = this.products.filter(p => this.selectedItems.includes(p.SKU));
+            // A seleção pode ter itens de várias páginas
+            const productsToPrint = this.selectedItems.map(sku => this.selectedProductsMap[sku]).filter(Boolean);
             
             const printWindow = window.open('', '', 'width=800,height=600');
             const date = new Date().toLocaleDateString('pt-BR');
@@ -701,9 +757,16 @@ createApp({
             this.showConferenceModal = false;
             this.stopScanner();
         },
-        handleConferenceScan(code) {
-            // Find product
-            const product = this.products.find(p => p.SKU === code || p.Name.includes(code)); // Simple match
+        async handleConferenceScan(code) {
+            // Find product (página atual primeiro, depois no servidor)
+            let product = this.products.find(p => p.SKU === code || p.Name.includes(code)); // Simple match
+            if (!product) {
+                try {
+                    product = await this.lookupProduct(code);
+                } catch (e) {
+                    product = null;
+                }
+            }
             
             if (product) {
                 const existing = this.conferenceItems.find(i => i.sku === product.SKU);
@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Os módulos do projeto ficam na raiz do repositório
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """O app importado uma vez, com todas as pastas em um diretório temporário"""
+    base = str(tmp_path_factory.mktemp('app'))
+    os.environ['ADMIN_PASSWORD'] = 'teste'
+    import config
+    config.Config.UPLOAD_FOLDER = os.path.join(base, 'uploads')
+    config.Config.DATA_FILE = os.path.join(base, 'uploads', 'estoque_atual.csv')
+    config.Config.IMAGES_FOLDER = os.path.join(base, 'images')
+    config.Config.BACKUP_FOLDER = os.path.join(base, 'backups')
+    config.Config.HISTORY_DB = os.path.join(base, 'historico.db')
+    config.Config.SNAPSHOT_FOLDER = os.path.join(base, 'snapshots')
+    config.Config.ADMIN_PASSWORD = 'teste'
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    client = app_module.app.test_client()
+    client.post('/api/login', json={'password': 'teste'})
+    return client
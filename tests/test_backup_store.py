@@ -0,0 +1,90 @@
+import datetime
+import multiprocessing
+import os
+
+import pytest
+
+from backup_store import BackupStore
+
+fork = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='requer fork')
+
+
+def _csv(folder, name, seed):
+    path = os.path.join(folder, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(300):
+            f.write(f"{i:05d},Produto {i},{(i * seed) % 97},{seed}\n")
+    return path
+
+
+def _snapshot_many(folder, paths, worker):
+    store = BackupStore(folder, keyframe_interval=3)
+    base = datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=worker)
+    for i, path in enumerate(paths):
+        store.snapshot(path, taken_at=base + datetime.timedelta(seconds=i))
+
+
+def _run(target, args_list):
+    ctx = multiprocessing.get_context('fork')
+    processes = [ctx.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+
+@fork
+def test_concurrent_processes_keep_every_snapshot(tmp_path):
+    folder = str(tmp_path / 'backups')
+    sources = [[_csv(str(tmp_path), f"w{worker}_{i}.csv", worker * 10 + i) for i in range(6)]
+               for worker in range(4)]
+    _run(_snapshot_many, [(folder, paths, worker) for worker, paths in enumerate(sources)])
+
+    store = BackupStore(folder)
+    snapshots = store.snapshots()
+    assert len(snapshots) == 24
+    expected = {}
+    for worker, paths in enumerate(sources):
+        for i, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                expected[(datetime.datetime(2024, 1, 1) + datetime.timedelta(hours=worker, seconds=i))
+                         .strftime("%Y-%m-%d_%H-%M-%S")] = f.read()
+    for snapshot in snapshots:
+        assert store.content(snapshot['id']) == expected[snapshot['id']]
+    assert not [name for name in os.listdir(folder) if name.endswith('.tmp') or name.endswith('.lock')]
+
+
+def _import(folder):
+    BackupStore(folder).import_legacy()
+
+
+@fork
+def test_concurrent_legacy_import_imports_each_file_once(tmp_path):
+    folder = str(tmp_path / 'backups')
+    os.makedirs(folder)
+    originals = {}
+    for day in range(1, 9):
+        path = _csv(folder, f"estoque_2024-01-{day:02d}_10-00-00.csv", day)
+        with open(path, 'rb') as f:
+            originals[f"2024-01-{day:02d}_10-00-00"] = f.read()
+
+    _run(_import, [(folder,), (folder,), (folder,)])
+
+    store = BackupStore(folder)
+    snapshots = store.snapshots()
+    assert [snapshot['id'] for snapshot in snapshots] == sorted(originals)
+    for snapshot in snapshots:
+        assert store.content(snapshot['id']) == originals[snapshot['id']]
+    assert not [name for name in os.listdir(folder) if name.startswith('estoque_')]
+
+
+def test_prune_keeps_delta_bases(tmp_path):
+    folder = str(tmp_path / 'backups')
+    store = BackupStore(folder, keyframe_interval=10, keep_last=2, keep_days=0)
+    for i in range(5):
+        store.snapshot(_csv(str(tmp_path), f"v{i}.csv", i + 1), taken_at=datetime.datetime(2024, 1, 1, 0, 0, i))
+    result = store.prune(now=datetime.datetime(2024, 6, 1))
+    assert result['snapshots_removed'] == 3
+    for snapshot in store.snapshots():
+        assert store.content(snapshot['id'])
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+
+from ingest import UploadIngestor
+from processor import StockProcessor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from catalog_gen import make_raw_rows, write_raw_csv  # noqa: E402
+
+
+def _wait(ingestor, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = ingestor.get(job_id)
+        if job is not None and job.to_dict()['done']:
+            return job
+        time.sleep(0.05)
+    raise AssertionError('processamento não terminou')
+
+
+def test_status_is_visible_from_another_worker(tmp_path):
+    data_file = str(tmp_path / 'estoque_atual.csv')
+    write_raw_csv(data_file, make_raw_rows(10))
+    status = str(tmp_path / '.ingest')
+    # Dois "workers": o upload chega em um, a consulta do status no outro
+    receiver = UploadIngestor(StockProcessor(data_file), status_folder=status)
+    other = UploadIngestor(StockProcessor(data_file), status_folder=status)
+
+    upload = str(tmp_path / '.upload.csv.tmp')
+    write_raw_csv(upload, make_raw_rows(25, seed=3))
+    job = receiver.submit(upload, 'novo.csv')
+
+    seen = _wait(other, job.id)
+    assert seen.state == 'done' and seen.rows == 25 and seen.finished_at is not None
+    assert other.latest().id == job.id
+
+    broken = str(tmp_path / '.vazio.csv.tmp')
+    open(broken, 'w').close()
+    failed = _wait(other, receiver.submit(broken, 'vazio.csv').id)
+    assert failed.state == 'error'
+    assert other.latest().id == failed.id
+
+
+def test_unknown_or_invalid_job_ids(tmp_path):
+    ingestor = UploadIngestor(StockProcessor(str(tmp_path / 'x.csv')), status_folder=str(tmp_path / '.ingest'))
+    assert ingestor.get('0123456789ab') is None
+    assert ingestor.get('../../etc/passwd') is None
+    assert ingestor.latest() is None
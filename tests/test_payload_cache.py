@@ -0,0 +1,45 @@
+import json
+import threading
+
+from payload_cache import PayloadCache
+
+
+def test_payload_is_built_once_per_version():
+    cache = PayloadCache(json.dumps)
+    calls = []
+    build = lambda: calls.append(1) or {'n': len(calls)}
+    first = cache.get(1, 'k', build)
+    assert cache.get(1, 'k', build) is first
+    second = cache.get(2, 'k', build)
+    assert second.etag != first.etag and len(calls) == 2
+
+
+def test_older_version_does_not_evict_or_poison_newer():
+    cache = PayloadCache(json.dumps)
+    new = cache.get(2, 'k', lambda: {'versao': 2})
+    # Requisição atrasada, com o catálogo da versão 1: recebe o seu payload, fora do cache
+    old = cache.get(1, 'k', lambda: {'versao': 1})
+    assert json.loads(old.body) == {'versao': 1}
+    assert cache.get(2, 'k', lambda: {'versao': 'outra'}) is new
+
+
+def test_version_change_during_build_is_not_cached():
+    cache = PayloadCache(json.dumps)
+    building, swapped = threading.Event(), threading.Event()
+
+    def slow_build():
+        building.set()
+        swapped.wait(5)
+        return {'versao': 1}
+
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('old', cache.get(1, 'k', slow_build)))
+    thread.start()
+    assert building.wait(5)
+    new = cache.get(2, 'k', lambda: {'versao': 2})
+    swapped.set()
+    thread.join(5)
+
+    assert json.loads(result['old'].body) == {'versao': 1}
+    assert cache.get(2, 'k', lambda: {'versao': 'outra'}) is new
+    assert cache.get(1, 'k', lambda: {'versao': 'reconstruido'}).body != result['old'].body
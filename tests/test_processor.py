@@ -0,0 +1,80 @@
+import os
+import sys
+
+from processor import StockProcessor
+from product_store import column
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from catalog_gen import make_raw_rows, write_raw_csv  # noqa: E402
+
+
+def test_current_returns_catalog_and_version_together(tmp_path):
+    path = str(tmp_path / 'estoque.csv')
+    write_raw_csv(path, make_raw_rows(20))
+    processor = StockProcessor(path)
+    data, version = processor.current()
+    assert len(data) == 20 and processor.process() is data
+
+    novo = str(tmp_path / 'novo.csv')
+    write_raw_csv(novo, make_raw_rows(30, seed=7))
+    swapped = processor.swap(novo, processor.load(novo))
+
+    data2, version2 = processor.current()
+    assert data2 is swapped and len(data2) == 30
+    assert version2 > version
+    assert processor.get_index(data2).find_sku(column(data2, 'SKU')[0]) is not None
+
+
+def test_load_keeps_parsed_catalog_when_snapshot_disappears(tmp_path, monkeypatch):
+    path = str(tmp_path / 'estoque.csv')
+    write_raw_csv(path, make_raw_rows(20))
+    processor = StockProcessor(path, snapshot_folder=str(tmp_path / 'snapshots'))
+    # Versão removida por outro processo entre o save() e a releitura
+    monkeypatch.setattr(processor.snapshots, 'load', lambda key, describe: None)
+    data = processor.load(path)
+    assert len(data) == 20
+    assert processor.last_read_info
+
+
+def test_detect_dialect_cache_follows_file_version(tmp_path):
+    path = str(tmp_path / 'estoque.csv')
+    write_raw_csv(path, make_raw_rows(5))
+    processor = StockProcessor(path)
+    dialect = processor.detect_dialect(path)
+    assert processor.detect_dialect(path) is dialect
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('SKU;Name;Price\n1;Caneta;2,50\n')
+    changed = processor.detect_dialect(path)
+    assert changed['format'] == 'standard' and changed['delimiter'] == ';'
+    assert processor._dialect_cache[1] is changed
+
+
+def test_parallel_read_matches_serial(tmp_path):
+    path = str(tmp_path / 'estoque.csv')
+    write_raw_csv(path, make_raw_rows(300))
+    serial = StockProcessor(path).process_raw_csv(path)
+    parallel = StockProcessor(path, parallel=True, workers=2, chunk_size=50,
+                              min_parallel_rows=100).process_raw_csv(path)
+    assert len(parallel) == len(serial) == 300
+    assert list(column(parallel, 'SKU')) == list(column(serial, 'SKU'))
+    assert list(column(parallel, 'Name')) == list(column(serial, 'Name'))
+
+
+def test_parallel_reads_rows_lazily(tmp_path):
+    path = str(tmp_path / 'estoque.csv')
+    write_raw_csv(path, make_raw_rows(300))
+    processor = StockProcessor(path, parallel=True, workers=2, chunk_size=50, min_parallel_rows=100)
+    read = []
+
+    def rows():
+        for row in processor.iter_raw_rows(path):
+            read.append(row)
+            yield row
+
+    products = processor.enrich_rows_parallel(rows())
+    assert not read
+    next(products)
+    # Só o necessário para decidir o caminho e encher o pool, não o arquivo todo
+    assert len(read) < 300
+    assert len(list(products)) == 299
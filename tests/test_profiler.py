@@ -0,0 +1,87 @@
+import threading
+
+import cProfile
+
+from profiler import RequestProfiler
+
+
+def _request(profiler, route, entered, release, handles):
+    handle = profiler.start(route, route)
+    handles.append(handle)
+    entered.set()
+    release.wait(5)
+    if handle is not None:
+        profiler.finish(handle, route, 'GET', route, '', 200)
+
+
+def test_overlapping_requests_profile_one_at_a_time():
+    profiler = RequestProfiler()
+    profiler.configure(route='/api/produtos', count=2)
+    first_in, second_in, release = threading.Event(), threading.Event(), threading.Event()
+    first, second = [], []
+
+    a = threading.Thread(target=_request, args=(profiler, '/api/produtos', first_in, release, first))
+    a.start()
+    assert first_in.wait(5)
+    b = threading.Thread(target=_request, args=(profiler, '/api/produtos', second_in, release, second))
+    b.start()
+    assert second_in.wait(5)
+    release.set()
+    a.join(5)
+    b.join(5)
+
+    # A segunda requisição chegou com um perfil em andamento: segue sem perfil
+    assert first[0] is not None and second == [None]
+    assert [entry['route'] for entry in profiler.status()['profiles']] == ['/api/produtos']
+    # O alvo não foi consumido pela requisição ignorada, e o próximo perfil pode começar
+    assert profiler.status()['targets'] == {'/api/produtos': 1}
+    handle = profiler.start('/api/produtos', '/api/produtos')
+    assert handle is not None
+    profiler.finish(handle, '/api/produtos', 'GET', '/api/produtos', '', 200)
+    assert not profiler.active
+
+
+def test_profiler_already_active_skips_request(monkeypatch):
+    def busy(self):
+        raise ValueError('Another profiling tool is already active')
+
+    monkeypatch.setattr(cProfile.Profile, 'enable', busy)
+    profiler = RequestProfiler()
+    profiler.configure(route='/api/produtos', count=2)
+    assert profiler.start('/api/produtos', '/api/produtos') is None
+    # A trava foi liberada: nada fica preso depois da falha
+    monkeypatch.undo()
+    handle = profiler.start('/api/produtos', '/api/produtos')
+    assert handle is not None
+    profiler.finish(handle, '/api/produtos', 'GET', '/api/produtos', '', 200)
+
+
+def test_overlapping_requests_in_app(app_module):
+    app = app_module.app
+    app_module.profiler.configure(route='/api/check-auth', count=2)
+    started, release = threading.Event(), threading.Event()
+    results = {}
+
+    def slow_request():
+        with app.test_request_context('/api/check-auth'):
+            app_module.start_request_profile()
+            results['first'] = 'profile' in app_module.g
+            started.set()
+            release.wait(5)
+            app_module.discard_request_profile(None)
+
+    thread = threading.Thread(target=slow_request)
+    thread.start()
+    try:
+        assert started.wait(5)
+        with app.test_client() as client:
+            response = client.get('/api/check-auth')
+            results['second'] = 'profile' in app_module.g
+        assert response.status_code == 200
+    finally:
+        release.set()
+        thread.join(5)
+        app_module.profiler.configure(enabled=False)
+        app_module.profiler.clear()
+
+    assert results == {'first': True, 'second': False}
@@ -0,0 +1,42 @@
+import os
+import sys
+
+from processor import StockProcessor
+from snapshot_store import META
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from catalog_gen import make_raw_rows, write_raw_csv  # noqa: E402
+
+
+def _processor(tmp_path, rows=20, seed=1):
+    path = str(tmp_path / f'estoque{seed}.csv')
+    write_raw_csv(path, make_raw_rows(rows, seed=seed))
+    return StockProcessor(path, snapshot_folder=str(tmp_path / 'snapshots')), path
+
+
+def test_save_replaces_half_deleted_version(tmp_path):
+    processor, path = _processor(tmp_path)
+    store = processor.snapshots
+    key = store.key_for(path, processor.rules_fingerprint())
+    # rmtree interrompido: a pasta ficou, sem meta.json e sem parte das colunas
+    os.makedirs(store._path(key))
+    open(store._path(key, 'sku.bin'), 'wb').close()
+
+    data = processor.load(path)
+    assert len(data) == 20
+    assert store.exists(key) and store.current() == key
+    assert store.load(key, processor.describe) is not None
+
+
+def test_prune_removes_whole_versions(tmp_path):
+    processor, _ = _processor(tmp_path)
+    store = processor.snapshots
+    for seed in range(1, 6):
+        _, path = _processor(tmp_path, seed=seed)
+        processor.load(path)
+
+    names = [entry.name for entry in os.scandir(store.folder) if entry.is_dir()]
+    versions = [name for name in names if not name.startswith('.')]
+    assert len(versions) == store.keep
+    assert all(os.path.exists(store._path(name, META)) for name in versions)
+    assert not [name for name in names if name.startswith('.trash-')]
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from thumbnails import PIL_AVAILABLE, ThumbnailPipeline
+
+pytestmark = pytest.mark.skipif(not PIL_AVAILABLE, reason='Pillow não instalado')
+
+
+def _image(path):
+    from PIL import Image
+    Image.new('RGB', (40, 30), 'red').save(path)
+
+
+def _files(folder):
+    return sorted(os.path.relpath(os.path.join(root, name), folder)
+                  for root, _, names in os.walk(folder) for name in names)
+
+
+def test_variant_is_generated_for_image_in_folder(tmp_path):
+    images = tmp_path / 'images'
+    images.mkdir()
+    _image(images / '123.png')
+    pipeline = ThumbnailPipeline(str(images), workers=1)
+
+    assert pipeline.variant('123.png', 'grid', 'webp') is None
+    pipeline._executor.shutdown(wait=True)
+
+    assert pipeline.generated == 1
+    assert pipeline.variant('123.png', 'grid', 'webp') == '123.grid.webp'
+
+
+@pytest.mark.parametrize('filename', ['../evil.png', '../../evil.png', 'sub/../../evil.png', '..', '',
+                                      '..\\evil.png' if os.altsep else '../evil.png'])
+def test_traversal_names_are_rejected(tmp_path, filename):
+    images = tmp_path / 'images'
+    images.mkdir()
+    _image(tmp_path / 'evil.png')
+    before = _files(str(tmp_path))
+    pipeline = ThumbnailPipeline(str(images), workers=1)
+
+    assert pipeline.variant(filename, 'grid', 'webp') is None
+    assert pipeline.submit(filename) is False
+    pipeline._executor.shutdown(wait=True)
+
+    # Nada foi lido nem gravado fora (nem dentro) da pasta de imagens
+    assert pipeline.generated == 0 and pipeline.failed == 0
+    assert _files(str(tmp_path)) == before
+    with pytest.raises(ValueError):
+        pipeline.render(filename)
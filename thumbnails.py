@@ -0,0 +1,140 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import safe_join
+
+# Pillow é opcional: sem ele as imagens são servidas no tamanho original
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Lado maior (px) de cada variante
+SIZES = {
+    'grid': 320,
+    'detail': 1024,
+}
+
+# Formato -> (extensão, argumentos do Image.save)
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+VARIANTS_DIR = '_variants'
+
+
+class ThumbnailPipeline:
+    """Gera as variantes (grid/detalhe, JPEG/WebP) das imagens em segundo plano.
+
+    As variantes ficam em `_variants/` dentro da pasta de imagens, com o nome
+    `SKU.tamanho.ext`. O trabalho roda em um pool de threads pequeno com fila
+    limitada: se a fila estiver cheia o pedido é descartado e a imagem original
+    continua sendo servida até a próxima tentativa.
+    """
+
+    def __init__(self, folder, workers=2, max_pending=64):
+        self.folder = folder
+        self.variants_folder = os.path.join(folder, VARIANTS_DIR)
+        self.enabled = PIL_AVAILABLE
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbs') if self.enabled else None
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.generated = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def source_path(self, filename):
+        """Caminho da imagem original, ou None se o nome não for um arquivo direto da pasta.
+
+        O nome vem da URL (/imagens/<filename>): nomes com separador ou '..'
+        são recusados para não ler nem gravar fora da pasta de imagens.
+        """
+        if not filename or os.path.basename(filename) != filename or filename in ('.', '..'):
+            return None
+        if os.altsep and os.altsep in filename:
+            return None
+        return safe_join(self.folder, filename)
+
+    def variant_name(self, filename, size, fmt):
+        stem = os.path.splitext(filename)[0]
+        return f"{stem}.{size}.{FORMATS[fmt][0]}"
+
+    def _is_fresh(self, source, variant):
+        try:
+            return os.stat(variant).st_mtime_ns >= os.stat(source).st_mtime_ns
+        except OSError:
+            return False
+
+    def variant(self, filename, size, fmt):
+        """Nome da variante (relativo a variants_folder) se já estiver pronta.
+
+        Se não estiver (ou for mais antiga que a original), agenda a geração e
+        devolve None para que a original seja servida desta vez.
+        """
+        if not self.enabled or size not in SIZES or fmt not in FORMATS:
+            return None
+        source = self.source_path(filename)
+        if source is None:
+            return None
+        name = self.variant_name(filename, size, fmt)
+        if self._is_fresh(source, os.path.join(self.variants_folder, name)):
+            return name
+        self.submit(filename)
+        return None
+
+    def submit(self, filename):
+        """Agenda a geração de todas as variantes de uma imagem"""
+        if not self.enabled or self.source_path(filename) is None:
+            return False
+        with self._lock:
+            if filename in self._pending:
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.add(filename)
+        self._executor.submit(self._run, filename)
+        return True
+
+    def _run(self, filename):
+        try:
+            self.render(filename)
+            self.generated += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"Erro ao gerar miniaturas de {filename}: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(filename)
+
+    def render(self, filename):
+        """Gera as variantes de uma imagem (escrita atômica: temporário + os.replace)"""
+        source = self.source_path(filename)
+        if source is None:
+            raise ValueError(f"nome de imagem inválido: {filename!r}")
+        os.makedirs(self.variants_folder, exist_ok=True)
+        with Image.open(source) as original:
+            # Fotos de celular vêm giradas via EXIF
+            image = ImageOps.exif_transpose(original).convert('RGB')
+
+        for size, pixels in SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((pixels, pixels), Image.LANCZOS)
+            for fmt, (_, options) in FORMATS.items():
+                target = os.path.join(self.variants_folder, self.variant_name(filename, size, fmt))
+                tmp = f"{target}.{threading.get_ident()}.tmp"
+                resized.save(tmp, **options)
+                os.replace(tmp, target)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'pending': len(self._pending),
+            'generated': self.generated,
+            'failed': self.failed,
+            'dropped': self.dropped
+        }